@@ -0,0 +1,96 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.google_docs_html import generate_google_docs_html  # noqa: E402
+from src.clipboard_backend import (  # noqa: E402
+    BACKENDS,
+    ClipboardBackend,
+    TextClipboardBackend,
+    create_backend,
+)
+from src.slack_list_generator import SlackListGenerator  # noqa: E402
+
+
+def percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def time_calls(func: Callable[[], object], repeat: int) -> dict:
+    """
+    funcをrepeat回呼び出し、呼び出しごとのレイテンシの中央値・p99・最小値を返します。
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return {
+        "p50": percentile(samples, 0.5),
+        "p99": percentile(samples, 0.99),
+        "min": min(samples),
+    }
+
+
+def measure_backend(backend: TextClipboardBackend, items: int, repeat: int) -> dict:
+    """
+    items個の<li>を持つHTMLをクリップボードに置き、読み込みと書き込みのレイテンシを計測します。
+    """
+    html = generate_google_docs_html(items)
+    result = SlackListGenerator().generate(html)
+    results = {}
+
+    # HTMLの読み込みはHTMLを置けるバックエンドでのみ計測する
+    if hasattr(backend, "copy_html"):
+        backend.copy_html(html)  # type: ignore
+        results["read_bytes"] = time_calls(backend.read_bytes, repeat)  # type: ignore
+        results["read_html"] = time_calls(backend.read_html, repeat)  # type: ignore
+    results["write_text"] = time_calls(
+        lambda: backend.write_text(result.plain_text), repeat
+    )
+    results["read_text"] = time_calls(backend.read_text, repeat)
+    if isinstance(backend, ClipboardBackend):
+        results["write_rich_text"] = time_calls(
+            lambda: backend.write_rich_text(result.binary_data, result.plain_text),
+            repeat,
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="クリップボードのバックエンドごとの読み書きのレイテンシを比較します"
+    )
+    default_backends = ["memory"]
+    if sys.platform == "darwin":
+        default_backends = ["appkit", "subprocess", "memory"]
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=sorted(BACKENDS),
+        default=default_backends,
+        help="比較するバックエンド",
+    )
+    parser.add_argument("--items", type=int, default=100, help="生成する<li>の数")
+    parser.add_argument("--repeat", type=int, default=100, help="計測の繰り返し回数")
+    args = parser.parse_args()
+
+    for name in args.backends:
+        results = measure_backend(create_backend(name), args.items, args.repeat)
+        for operation, stats in results.items():
+            print(
+                f"{name + '/' + operation:<28}"
+                f"p50 {stats['p50'] * 1e6:10.1f} us"
+                f"  p99 {stats['p99'] * 1e6:10.1f} us"
+                f"  min {stats['min'] * 1e6:10.1f} us",
+                flush=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import random
+
+from benchmarks.google_docs_html import WORDS
+
+WORD_HEAD = (
+    '<html xmlns:v="urn:schemas-microsoft-com:vml"\n'
+    'xmlns:o="urn:schemas-microsoft-com:office:office"\n'
+    'xmlns:w="urn:schemas-microsoft-com:office:word"\n'
+    'xmlns="http://www.w3.org/TR/REC-html40">\n'
+    '<head>\n<meta http-equiv=Content-Type content="text/html; charset=utf-8">\n'
+    "<meta name=ProgId content=Word.Document>\n"
+    '<meta name=Generator content="Microsoft Word 15">\n'
+    "<style>\n<!--\n p.MsoListParagraph\n\t{mso-style-priority:34;\n\tmargin-left:36.0pt;}\n"
+    "@list l0\n\t{mso-list-id:1200431530;\n\tmso-list-type:hybrid;}\n-->\n</style>\n"
+    "</head>\n<body lang=JA style='tab-interval:36.0pt'>\n<!--StartFragment-->\n"
+)
+WORD_TAIL = "<!--EndFragment-->\n</body>\n</html>"
+WORD_BULLETS = ["·", "o", "§"]
+
+
+def _text(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 12)))
+
+
+def _levels(rng: random.Random, items: int, max_depth: int) -> list[int]:
+    # 直前の項目より2段以上深くならない階層 (0始まり) の並び
+    levels = []
+    level = 0
+    for _ in range(items):
+        level = rng.randint(0, min(level + 1, max_depth - 1))
+        levels.append(level)
+    return levels
+
+
+def generate_word_html(
+    items: int, max_depth: int = 4, seed: int = 0, ordered_ratio: float = 0.2
+) -> str:
+    """
+    Microsoft Wordからコピーしたときと同じ構造のHTMLを生成します。
+    - Officeの名前空間・Generatorのmeta・条件付きコメントのstyleを含むhead
+    - mso-list:lN levelK lfoM を持つ <p> と、<![if !supportLists]> に囲まれた行頭記号
+    - ソースの折り返しを含む長いstyle属性
+
+    Args:
+        items: 生成するリストの段落の数
+        max_depth: 最大の階層 (1始まり)
+        seed: 乱数のシード
+        ordered_ratio: 番号付きリストにする割合
+    """
+    rng = random.Random(seed)
+    parts = [WORD_HEAD]
+    list_id = 0
+    ordered = False
+    counters: list[int] = []
+    for level in _levels(rng, items, max_depth):
+        if level == 0 and rng.random() < 0.1:
+            # 新しいリストを始める
+            list_id += 1
+            ordered = rng.random() < ordered_ratio
+            counters = []
+            parts.append(f"<p class=MsoNormal>{_text(rng)}<o:p></o:p></p>\n")
+        del counters[level + 1 :]
+        while len(counters) <= level:
+            counters.append(0)
+        counters[level] += 1
+        marker = f"{counters[level]}." if ordered else WORD_BULLETS[level % 3]
+        parts.append(
+            f"<p class=MsoListParagraphCxSpMiddle style='margin-left:{36 * (level + 1)}.0pt;"
+            f"mso-add-space:\nauto;text-indent:-18.0pt;mso-list:l{list_id} level{level + 1} "
+            f"lfo{list_id + 1}'><![if !supportLists]><span\nstyle='font-family:Symbol;"
+            f"mso-fareast-font-family:Symbol'><span style='mso-list:Ignore'>{marker}<span\n"
+            f"style='font:7.0pt \"Times New Roman\"'>&nbsp;&nbsp;&nbsp;&nbsp;\n"
+            f"</span></span></span><![endif]>{_text(rng)}<o:p></o:p></p>\n"
+        )
+    parts.append(WORD_TAIL)
+    return "".join(parts)
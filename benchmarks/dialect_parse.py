@@ -0,0 +1,83 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.dialect_html import generate_word_html  # noqa: E402
+from benchmarks.google_docs_html import generate_google_docs_html  # noqa: E402
+from src.dialects import (  # noqa: E402
+    GOOGLE_DOCS,
+    WORD,
+    parse_dialect_items,
+    sniff_dialect,
+)
+from src.stream_list_parser import StreamListParser  # noqa: E402
+
+GENERATORS: dict[str, Callable[[int], str]] = {
+    GOOGLE_DOCS: generate_google_docs_html,
+    WORD: generate_word_html,
+}
+
+
+def best_of(func: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="エディタごとのHTMLで、専用のパーサーと汎用のパーサーの解析時間を比較します"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[100, 1000, 10000],
+        help="生成するリストの項目の数",
+    )
+    parser.add_argument(
+        "--dialects",
+        nargs="+",
+        choices=list(GENERATORS),
+        default=list(GENERATORS),
+        help="計測するエディタ",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="計測の繰り返し回数")
+    args = parser.parse_args()
+
+    for dialect in args.dialects:
+        print(f"[{dialect}]")
+        for size in args.sizes:
+            html = GENERATORS[dialect](size)
+            if sniff_dialect(html) != dialect:
+                raise SystemExit(f"判定に失敗しました: {dialect}, {size} items")
+            generic_items = StreamListParser().parse_items(html)
+            items = parse_dialect_items(html, dialect)
+            if dialect == GOOGLE_DOCS and items != generic_items:
+                raise SystemExit(f"結果が一致しません: {dialect}, {size} items")
+            sniff = best_of(lambda: sniff_dialect(html), args.repeat)
+            generic = best_of(lambda: StreamListParser().parse_items(html), args.repeat)
+            special = best_of(lambda: parse_dialect_items(html, dialect), args.repeat)
+            # Google Docsは汎用のパーサーと同じ結果、Wordは階層を保った結果になる
+            nested = sum(1 for level in items.levels if level > 0)
+            generic_nested = sum(1 for level in generic_items.levels if level > 0)
+            print(
+                f"{size:>7} items {len(html) / (1024 * 1024):7.2f} MB"
+                f"  sniff {sniff * 1e6:7.1f} us"
+                f"  generic {generic * 1000:9.1f} ms"
+                f"  {dialect} {special * 1000:9.1f} ms"
+                f"  {generic / special:5.2f}x"
+                f"  nested items {generic_nested}/{nested}",
+                flush=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import random
+
+LIST_STYLE = "margin-top:0;margin-bottom:0;padding-inline-start:48px;"
+ITEM_STYLE = (
+    "list-style-type:{marker};font-size:11pt;font-family:Arial,sans-serif;"
+    "color:#000000;background-color:transparent;font-weight:400;font-style:normal;"
+    "font-variant:normal;text-decoration:none;vertical-align:baseline;"
+    "white-space:pre;"
+)
+PARAGRAPH_STYLE = "line-height:1.38;margin-top:0pt;margin-bottom:0pt;"
+SPAN_STYLE = (
+    "font-size:11pt;font-family:Arial,sans-serif;color:#000000;"
+    "background-color:transparent;font-weight:{weight};font-style:normal;"
+    "font-variant:normal;text-decoration:none;vertical-align:baseline;"
+    "white-space:pre;white-space:pre-wrap;"
+)
+WORDS = [
+    "議事録",
+    "対応",
+    "確認",
+    "リリース",
+    "Slack",
+    "Google",
+    "Docs",
+    "bullet",
+    "item",
+    "review",
+    "&amp;",
+    "deploy",
+]
+
+
+def _span(rng: random.Random) -> str:
+    text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 8)))
+    weight = "700" if rng.random() < 0.2 else "400"
+    return f'<span style="{SPAN_STYLE.format(weight=weight)}">{text}</span>'
+
+
+def generate_google_docs_html(
+    items: int, max_depth: int = 4, seed: int = 0, ordered_ratio: float = 0.2
+) -> str:
+    """
+    Google Docsからコピーしたときと同じ構造のHTMLを生成します。
+    - <meta charset> と docs-internal-guid 付きの <b> ラッパー
+    - aria-level 付きの <li> と、長いインラインstyleを持つ <p>/<span>
+    - 深い階層は <ul> の直下に兄弟として置かれた <ul> で表現
+
+    Args:
+        items: 生成する <li> の数
+        max_depth: 最大の階層 (1始まり)
+        seed: 乱数のシード
+        ordered_ratio: 番号付きリストにする割合
+    """
+    rng = random.Random(seed)
+    parts = [
+        '<meta charset="utf-8">'
+        f'<b style="font-weight:normal;" id="docs-internal-guid-{rng.getrandbits(64):016x}">'
+    ]
+    # 開いているリストのタグ (stack[i] が aria-level=i+1 のリスト)
+    stack: list[str] = []
+    for _ in range(items):
+        if not stack:
+            level = 1
+        else:
+            level = rng.randint(1, min(len(stack) + 1, max_depth))
+        while len(stack) > level:
+            parts.append(f"</{stack.pop()}>")
+        while len(stack) < level:
+            tag = "ol" if rng.random() < ordered_ratio else "ul"
+            parts.append(f'<{tag} style="{LIST_STYLE}">')
+            stack.append(tag)
+        marker = "decimal" if stack[-1] == "ol" else "disc"
+        spans = "".join(_span(rng) for _ in range(rng.randint(1, 3)))
+        parts.append(
+            f'<li dir="ltr" style="{ITEM_STYLE.format(marker=marker)}" '
+            f'aria-level="{level}"><p dir="ltr" style="{PARAGRAPH_STYLE}" '
+            f'role="presentation">{spans}</p></li>'
+        )
+    while stack:
+        parts.append(f"</{stack.pop()}>")
+    parts.append("</b>")
+    return "".join(parts)
@@ -0,0 +1,121 @@
+import argparse
+import http.client
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.clipboard_latency import percentile  # noqa: E402
+from benchmarks.google_docs_html import generate_google_docs_html  # noqa: E402
+
+
+def run_client(
+    host: str,
+    port: int,
+    body: bytes,
+    accept: str,
+    deadline: float,
+    latencies: list[float],
+    errors: list[str],
+) -> None:
+    """
+    1つのkeep-aliveの接続でdeadlineまでリクエストを送り続けます。
+    """
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    headers = {"Content-Type": "text/html; charset=utf-8", "Accept": accept}
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            connection.request("POST", "/convert", body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(str(response.status))
+                if response.will_close:
+                    connection.close()
+                continue
+            latencies.append(time.perf_counter() - start)
+    except (OSError, http.client.HTTPException) as e:
+        errors.append(repr(e))
+    finally:
+        connection.close()
+
+
+def load_test(
+    host: str, port: int, body: bytes, accept: str, concurrency: int, duration: float
+) -> dict:
+    latencies: list[float] = []
+    errors: list[str] = []
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(
+            target=run_client,
+            args=(host, port, body, accept, deadline, latencies, errors),
+        )
+        for _ in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "requests_per_second": len(latencies) / elapsed,
+        "p50": percentile(latencies, 0.5) if latencies else 0.0,
+        "p99": percentile(latencies, 0.99) if latencies else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="変換サーバーの負荷試験")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=None,
+        help="試験するサーバーのポート。省略時はこのプロセス内でサーバーを起動します",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=4, help="起動するサーバーのワーカー数"
+    )
+    parser.add_argument("--items", type=int, default=100, help="生成する<li>の数")
+    parser.add_argument("--concurrency", type=int, default=8, help="同時接続数")
+    parser.add_argument("--duration", type=float, default=5.0, help="試験する秒数")
+    parser.add_argument(
+        "--accept", default="application/json", help="リクエストのAcceptヘッダ"
+    )
+    args = parser.parse_args()
+
+    server = None
+    port = args.port
+    if port is None:
+        from src.http_server import ConversionHTTPServer
+
+        server = ConversionHTTPServer((args.host, 0), workers=args.workers)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_address[1]
+
+    body = generate_google_docs_html(args.items).encode("utf-8")
+    try:
+        result = load_test(
+            args.host, port, body, args.accept, args.concurrency, args.duration
+        )
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    print(
+        f"requests={result['requests']} errors={result['errors']} "
+        f"{result['requests_per_second']:.1f} req/s "
+        f"p50={result['p50'] * 1000:.2f} ms p99={result['p99'] * 1000:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.google_docs_html import generate_google_docs_html  # noqa: E402
+from src.parallel_parser import ParallelListParser  # noqa: E402
+from src.stream_list_parser import StreamListParser  # noqa: E402
+
+
+def best_of(func: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="文書を分割した並列解析と1プロセスでの解析を比較します"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1000, 5000, 10000, 50000],
+        help="生成する<li>の数",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[2, 4, os.cpu_count() or 1],
+        help="比較するワーカープロセス数",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="計測の繰り返し回数")
+    args = parser.parse_args()
+
+    print(f"CPU: {os.cpu_count()}")
+    crossover: dict[int, int] = {}
+    for size in args.sizes:
+        html = generate_google_docs_html(size)
+        expected = StreamListParser().parse_items(html)
+        serial = best_of(lambda: StreamListParser().parse_items(html), args.repeat)
+        print(
+            f"{size:>7} items {len(html) / (1024 * 1024):8.2f} MB"
+            f"  serial       {serial * 1000:10.1f} ms",
+            flush=True,
+        )
+        for workers in sorted(set(args.workers)):
+            # 分割の下限を外し、文書の大きさに関わらずworkers個に分割する
+            with ParallelListParser(workers=workers, min_chunk_chars=1) as parallel:
+                # プロセスの起動は計測に含めない
+                if parallel.parse_items(html) != expected:
+                    raise SystemExit(f"結果が一致しません: {size} items, {workers}")
+                seconds = best_of(lambda: parallel.parse_items(html), args.repeat)
+            print(
+                f"{'':>28}  parallel x{workers:<2} {seconds * 1000:10.1f} ms"
+                f"  {serial / seconds:5.2f}x",
+                flush=True,
+            )
+            if seconds < serial:
+                crossover.setdefault(workers, size)
+
+    for workers in sorted(set(args.workers)):
+        if workers in crossover:
+            print(f"x{workers}: {crossover[workers]} items 以上で並列の方が速い")
+        else:
+            print(f"x{workers}: 計測した大きさでは並列の方が遅い")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Callable
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.google_docs_html import generate_google_docs_html  # noqa: E402
+from src.slack_list_generator import SlackListGenerator  # noqa: E402
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+# マシンの速さを測るための、このリポジトリのコードを使わない処理
+_CALIBRATION_HTML = "<ul>" + "<li><span>item</span> &amp; text</li>" * 1000 + "</ul>"
+
+
+def calibrate(repeat: int = 3) -> float:
+    """
+    標準ライブラリのhtml.parserで固定のHTMLを解析する時間 (repeat回のうち最速) を返します。
+    ベースラインと異なるマシンで比較するときに、計測時間をこの比で換算します。
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        HTMLParser().feed(_CALIBRATION_HTML)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure(func: Callable[[], object], repeat: int) -> dict:
+    """
+    関数の実行時間 (repeat回のうち最速) と、tracemallocで計測したピークメモリを返します。
+    最初の呼び出しは遅延importなどを含むため、計測の前に1回実行します。
+    """
+    func()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": best, "peak_bytes": peak}
+
+
+def run(engines: list[str], sizes: list[int], repeat: int) -> dict:
+    """
+    各計測の結果と、計測の合間に測ったcalibrateの最小値を返します。
+    """
+    results = {}
+    calibrations = []
+    for size in sizes:
+        html = generate_google_docs_html(size)
+        for engine in engines:
+            generator = SlackListGenerator(engine=engine)
+            plain_text, texty_json = generator._parse_html(html)
+            phases = {
+                "parse": lambda: generator._parse_html(html),
+                "chromium": lambda: generator._create_chromium_data(
+                    plain_text, texty_json
+                ),
+                # 結果は遅延生成されるため、全ての表現を生成させて計測する
+                "generate": lambda: generator.generate(html).binary_data,
+            }
+            if engine == "stream":
+                # 1語だけ編集した文書を、変更前の文書を変換した直後の状態から解析し直す
+                incremental = SlackListGenerator(engine=engine, incremental=True)
+                incremental._parse_html(html)
+                entries = incremental.item_memo.entries
+                edited = html.replace("review", "reviewed", 1)
+
+                def reparse(incremental=incremental, entries=entries, edited=edited):
+                    incremental.item_memo.entries = entries
+                    return incremental._parse_html(edited)
+
+                phases["incremental"] = reparse
+            for phase, func in phases.items():
+                key = f"{engine}/{size}/{phase}"
+                results[key] = measure(func, repeat)
+                # 一時的な負荷の影響を受けにくいよう、計測の合間に何度も測って最速の値を使う
+                calibrations.append(calibrate())
+                print(
+                    f"{key:<28}{results[key]['seconds'] * 1000:12.3f} ms"
+                    f"{results[key]['peak_bytes'] / 1024:12.1f} KiB",
+                    flush=True,
+                )
+    return {"calibration_seconds": min(calibrations), "results": results}
+
+
+def compare(
+    current: dict, baseline: dict, threshold: float, min_seconds: float
+) -> list[str]:
+    """
+    ベースラインよりthresholdの割合以上遅く、またはメモリが多くなった計測を返します。
+    実行時間はベースラインを保存したときとのcalibrateの比で換算し、
+    差がmin_seconds未満のものは誤差として扱います。
+    """
+    scale = baseline["calibration_seconds"] / current["calibration_seconds"]
+    regressions = []
+    for key, result in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        seconds = result["seconds"] * scale
+        if (
+            base["seconds"] > 0
+            and seconds > base["seconds"] * (1 + threshold)
+            and seconds - base["seconds"] >= min_seconds
+        ):
+            ratio = seconds / base["seconds"]
+            regressions.append(f"{key} seconds: {ratio:.2f}x of baseline")
+        peak = result["peak_bytes"]
+        if base["peak_bytes"] > 0 and peak > base["peak_bytes"] * (1 + threshold):
+            ratio = peak / base["peak_bytes"]
+            regressions.append(f"{key} peak_bytes: {ratio:.2f}x of baseline")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SlackListGeneratorのベンチマーク")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="生成する<li>の数",
+    )
+    parser.add_argument(
+        "--engines", nargs="+", default=["stream", "bs4"], help="比較するエンジン"
+    )
+    parser.add_argument("--repeat", type=int, default=7, help="計測の繰り返し回数")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="回帰とみなす悪化の割合",
+    )
+    parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=0.001,
+        help="回帰とみなす実行時間の差の最小値 (短い計測の誤差を無視する)",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="計測結果をベースラインとして保存します",
+    )
+    args = parser.parse_args()
+
+    results = run(args.engines, args.sizes, args.repeat)
+    print(f"{'calibration':<28}{results['calibration_seconds'] * 1000:12.3f} ms")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline saved to: {args.baseline}")
+        return
+
+    if args.baseline.exists():
+        regressions = compare(
+            results,
+            json.loads(args.baseline.read_text()),
+            args.threshold,
+            args.min_seconds,
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
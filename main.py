@@ -1,9 +1,57 @@
-import click
-from src.slack_list_generator import SlackListGenerator
-from src.clipboard_util import ClipboardUtil
+import sys
+import time
+from contextlib import contextmanager
+from typing import Iterator
 
+_PROCESS_START = time.perf_counter()
 
-@click.command()
+if __name__ == "__main__" and sys.argv[1:] in ([], ["-t"], ["--text"]):
+    # 変換サーバー (serve-socket) が起動していれば、clickや変換のモジュールを読み込まずに
+    # クリップボードの変換を依頼する。接続できなければこのプロセスで変換する。
+    # 依頼した後はサーバーだけがクリップボードに書き込むため、失敗してもこのプロセスでは変換しない
+    from src.socket_client import convert_clipboard as _convert_with_server
+
+    try:
+        if _convert_with_server(text=bool(sys.argv[1:])) is not None:
+            sys.exit(0)
+    except RuntimeError as e:
+        sys.exit(f"Error: {e}")
+
+import click  # noqa: E402
+
+_CLI_IMPORTED = time.perf_counter()
+
+
+class StartupTiming:
+    """
+    起動時間の内訳 (モジュールのimport時間と変換処理の時間) を計測します。
+    """
+
+    def __init__(self, enabled: bool) -> None:
+        self.enabled = enabled
+        self.sections: list[tuple[str, str, float]] = [
+            ("import", "click", _CLI_IMPORTED - _PROCESS_START)
+        ]
+
+    def measure(self, kind: str, label: str, start: float) -> None:
+        if self.enabled:
+            self.sections.append((kind, label, time.perf_counter() - start))
+
+    def report(self) -> str:
+        lines = ["----起動時間-----------------"]
+        totals: dict[str, float] = {}
+        for kind, label, elapsed in self.sections:
+            totals[kind] = totals.get(kind, 0.0) + elapsed
+            lines.append(f"{kind:<8}{label:<24}{elapsed * 1000:9.2f} ms")
+        for kind, elapsed in totals.items():
+            lines.append(f"{kind + ' total':<32}{elapsed * 1000:9.2f} ms")
+        lines.append(
+            f"{'wall':<32}{(time.perf_counter() - _PROCESS_START) * 1000:9.2f} ms"
+        )
+        return "\n".join(lines)
+
+
+@click.group(invoke_without_command=True)
 @click.option("-d", "--debug", is_flag=True, help="デバッグ出力を有効にします")
 @click.option(
     "-t",
@@ -11,30 +59,466 @@ from src.clipboard_util import ClipboardUtil
     is_flag=True,
     help="プレーンテキスト形式のみをクリップボードにコピーします",
 )
-def main(debug: bool, text: bool) -> None:
+@click.option(
+    "--timing",
+    is_flag=True,
+    help="import時間と変換時間の内訳を標準エラー出力に表示します",
+)
+@click.option(
+    "--cache",
+    is_flag=True,
+    help="変換結果をディスクにキャッシュし、同じHTMLの再変換を省略します",
+)
+@click.option(
+    "--trace",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="各フェーズの実行時間・メモリ確保量・件数をJSONで書き出します",
+)
+@click.pass_context
+def main(
+    ctx: click.Context,
+    debug: bool,
+    text: bool,
+    timing: bool,
+    cache: bool,
+    trace: str | None,
+) -> None:
+    if ctx.invoked_subcommand is not None:
+        return
+
+    # 重いモジュールは必要になった時点で読み込む
+    timer = StartupTiming(timing)
+
+    if not (debug or trace):
+        convert_clipboard(debug, text, cache, timer)
+    else:
+        from src.tracer import Tracer, use_tracer
+
+        tracer = Tracer(trace_memory=trace is not None)
+        with use_tracer(tracer):
+            convert_clipboard(debug, text, cache, timer)
+        if debug:
+            print(f"----フェーズ-----------------\n{tracer.summary()}")
+        if trace:
+            with open(trace, "w", encoding="utf-8") as f:
+                f.write(tracer.to_json())
+
+    if timing:
+        click.echo(timer.report(), err=True)
+
+
+def convert_clipboard(
+    debug: bool, text: bool, cache: bool, timer: StartupTiming
+) -> None:
+    """
+    クリップボードのHTMLを変換してクリップボードに書き戻します。
+    """
+    start = time.perf_counter()
+    from src.clipboard_util import ClipboardUtil
+
+    timer.measure("import", "src.clipboard_util", start)
+
     if debug:
         print("クリップボードから読み込んでいます...")
+    start = time.perf_counter()
     html_content = ClipboardUtil.get_clipboard_html()
+    timer.measure("io", "clipboard read", start)
 
     if debug:
-        print(f"----変換前(html)-----------------\n{html_content}")
-    generator = SlackListGenerator()
-    result = generator.generate(html_content)
+        from src.tracer import DebugDump
+
+        # 巨大なHTMLでも出力が遅くならないよう切り詰めて表示する
+        print(f"----変換前(html)-----------------\n{DebugDump(html_content)}")
+
+    start = time.perf_counter()
+    from src.slack_list_generator import SlackListGenerator
+
+    timer.measure("import", "src.slack_list_generator", start)
+
+    conversion_cache = None
+    if cache and not text:
+        from src.conversion_cache import DEFAULT_CACHE_DIR, ConversionCache
+
+        conversion_cache = ConversionCache(directory=DEFAULT_CACHE_DIR)
+    generator = SlackListGenerator(cache=conversion_cache)
+    start = time.perf_counter()
+    if text:
+        # -t ではリッチテキスト (slack/texty, Chromium形式) を生成しない
+        plain_text = generator.generate_plain_text(html_content)
+        timer.measure("convert", "plain text", start)
+    else:
+        result = generator.generate(html_content)
+        timer.measure("convert", "rich text", start)
 
     if debug:
         if text:
             print(
-                f"----変換後(text)-----------------\n{result.plain_text}\n-----------------\n"
+                f"----変換後(text)-----------------\n{DebugDump(plain_text)}\n-----------------\n"
             )
         else:
             print(
-                f"----変換後(slack/texty)-----------------\n{result.texty_json}\n-----------------\n"
+                f"----変換後(slack/texty)-----------------\n{DebugDump(result.texty_json)}\n-----------------\n"
             )
 
+    start = time.perf_counter()
     if text:
-        ClipboardUtil.set_text(result.plain_text)
+        ClipboardUtil.set_text(plain_text)
     else:
         ClipboardUtil.set_rich_text(result.binary_data, result.plain_text)
+    timer.measure("io", "clipboard write", start)
+
+    if debug and conversion_cache is not None:
+        print(f"----キャッシュ-----------------\n{conversion_cache.stats.format()}")
+
+
+@main.command()
+@click.option("-d", "--debug", is_flag=True, help="変換した内容を表示します")
+@click.option(
+    "-t",
+    "--text",
+    is_flag=True,
+    help="プレーンテキスト形式のみをクリップボードにコピーします",
+)
+@click.option(
+    "--interval",
+    type=float,
+    default=0.25,
+    show_default=True,
+    help="クリップボードを確認する間隔 (秒)",
+)
+@click.option(
+    "--metrics-port",
+    type=int,
+    default=None,
+    help="指定したポートの /metrics でPrometheus形式のメトリクスを公開します",
+)
+@click.option(
+    "--metrics-file",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Prometheus形式のメトリクスを定期的に書き出すファイル",
+)
+def watch(
+    debug: bool,
+    text: bool,
+    interval: float,
+    metrics_port: int | None,
+    metrics_file: str | None,
+) -> None:
+    """クリップボードを監視し、Google Docsの箇条書きがコピーされたら自動で変換します"""
+    from src.clipboard_backend import AppKitClipboardBackend
+    from src.clipboard_watcher import ClipboardWatcher
+    from src.conversion_cache import ConversionCache
+    from src.slack_list_generator import SlackListGenerator
+
+    def on_convert(plain_text: str) -> None:
+        if debug:
+            print(
+                f"----変換しました-----------------\n{plain_text}\n-----------------\n"
+            )
+
+    # 同じ内容を繰り返しコピーした場合に備えてメモリ上にキャッシュする
+    conversion_cache = ConversionCache()
+    watcher = ClipboardWatcher(
+        AppKitClipboardBackend(),
+        # 編集しながらコピーし直した文書は、変更のない <li> の結果を再利用して変換する
+        generator=SlackListGenerator(cache=conversion_cache, incremental=True),
+        text=text,
+        interval=interval,
+        on_convert=on_convert,
+    )
+    print("クリップボードを監視しています... (Ctrl+Cで終了)")
+    with _metrics(conversion_cache, metrics_port, metrics_file):
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            pass
+    print(f"{watcher.conversions}件変換しました")
+    if debug:
+        print(conversion_cache.stats.format())
+
+
+@main.command()
+@click.argument("paths", nargs=-1, required=True)
+@click.option(
+    "-j",
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="ワーカープロセス数 (デフォルトはCPU数)",
+)
+@click.option(
+    "--chunksize",
+    type=click.IntRange(min=1),
+    default=None,
+    help="1回のタスクでワーカーに渡すファイル数",
+)
+@click.option(
+    "--verify",
+    is_flag=True,
+    help="変換後に .bin を読み戻して .txt / .texty.json と一致するか検証します",
+)
+def batch(
+    paths: tuple[str, ...], workers: int | None, chunksize: int | None, verify: bool
+) -> None:
+    """HTMLファイル・globパターン・ディレクトリをまとめて変換します
+
+    各入力ファイルの隣に .txt / .texty.json / .bin を書き出します。
+    出力ファイルが入力ファイルや他の入力の出力と重なる場合は、何も変換せずにエラーにします。
+    """
+    from src.batch_converter import (
+        collect_inputs,
+        convert_files,
+        find_output_conflicts,
+    )
+
+    try:
+        inputs = collect_inputs(list(paths))
+    except FileNotFoundError as e:
+        raise click.ClickException(str(e))
+    if not inputs:
+        raise click.ClickException("変換対象のHTMLファイルが見つかりません")
+    conflicts = find_output_conflicts(inputs)
+    if conflicts:
+        raise click.ClickException(
+            "出力ファイルが重なるため変換しません: "
+            + ", ".join(
+                f"{path} の出力が {other} と重なります" for path, other in conflicts
+            )
+        )
+
+    summary = convert_files(inputs, workers=workers, chunksize=chunksize)
+    for path, error in summary.errors:
+        click.echo(f"Error: {path}: {error}", err=True)
+    click.echo(summary.format())
+    if verify:
+        from src.batch_converter import verify_file
+
+        failed = {path for path, _ in summary.errors}
+        for path in inputs:
+            if str(path) in failed:
+                continue
+            problem = verify_file(path)
+            if problem is not None:
+                summary.errors.append((str(path), problem))
+                click.echo(f"Verify error: {path}: {problem}", err=True)
+    if summary.errors:
+        raise SystemExit(1)
+
+
+@main.command()
+@click.argument("inputs", nargs=-1)
+@click.option(
+    "-f",
+    "--format",
+    "output_format",
+    type=click.Choice(["text", "texty", "chromium"]),
+    default="text",
+    show_default=True,
+    help="標準出力に書き出す形式",
+)
+def convert(inputs: tuple[str, ...], output_format: str) -> None:
+    """HTMLを変換して標準出力に書き出します (クリップボードは使いません)
+
+    INPUTSを省略するか "-" を指定すると標準入力から読み込みます。
+    text・textyは1件ごとに改行で区切り、chromiumはサイズ付きのバイナリを続けて書き出すため、
+    find | xargs などで複数のファイルを渡せます。
+    """
+    from src.filter_mode import (
+        open_stdout,
+        read_html_file,
+        read_html_stream,
+        write_result,
+    )
+    from src.slack_list_generator import SlackListGenerator
+
+    generator = SlackListGenerator()
+    out = open_stdout()
+    failed = False
+    try:
+        for path in inputs or ("-",):
+            try:
+                if path == "-":
+                    html_content = read_html_stream(sys.stdin.buffer)
+                else:
+                    html_content = read_html_file(path)
+            except (OSError, UnicodeDecodeError) as e:
+                click.echo(f"Error: {path}: {e}", err=True)
+                failed = True
+                continue
+            write_result(generator.generate(html_content), output_format, out)
+    finally:
+        out.flush()
+    if failed:
+        raise SystemExit(1)
+
+
+@main.command()
+@click.option("--host", default="127.0.0.1", show_default=True, help="待ち受けるホスト")
+@click.option(
+    "--port", type=int, default=8765, show_default=True, help="待ち受けるポート"
+)
+@click.option(
+    "-j",
+    "--workers",
+    type=int,
+    default=4,
+    show_default=True,
+    help="ワーカースレッド数",
+)
+@click.option(
+    "--queue-depth",
+    type=int,
+    default=64,
+    show_default=True,
+    help="ワーカーの空きを待つ接続の数の上限。超えた場合は503を返します",
+)
+@click.option(
+    "--max-body",
+    type=int,
+    default=8 * 1024 * 1024,
+    show_default=True,
+    help="リクエストボディのサイズの上限 (バイト)",
+)
+@click.option("-v", "--verbose", is_flag=True, help="リクエストごとにログを出力します")
+@click.option(
+    "--metrics",
+    "enable_metrics",
+    is_flag=True,
+    help="GET /metrics でPrometheus形式のメトリクスを公開します",
+)
+@click.option(
+    "--metrics-file",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Prometheus形式のメトリクスを定期的に書き出すファイル",
+)
+def serve(
+    host: str,
+    port: int,
+    workers: int,
+    queue_depth: int,
+    max_body: int,
+    verbose: bool,
+    enable_metrics: bool,
+    metrics_file: str | None,
+) -> None:
+    """HTMLをHTTPで受け取って変換するサーバーを起動します
+
+    POST /convert にHTMLを送ると、Acceptヘッダに応じて
+    text/plain・application/json (texty)・application/x-chromium-web-custom-data
+    のいずれかで変換結果を返します。
+    """
+    from src.http_server import ConversionHTTPServer
+
+    metrics = None
+    if enable_metrics or metrics_file:
+        from src.metrics import MetricsTracer
+
+        metrics = MetricsTracer()
+    server = ConversionHTTPServer(
+        (host, port),
+        workers=workers,
+        queue_depth=queue_depth,
+        max_body_bytes=max_body,
+        verbose=verbose,
+        metrics=metrics.registry if metrics is not None else None,
+    )
+    print(
+        f"http://{host}:{server.server_address[1]}/convert で待ち受けています... (Ctrl+Cで終了)"
+    )
+    try:
+        with _metrics(None, None, metrics_file, metrics):
+            server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+@main.command()
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="待ち受けるUnixドメインソケットのパス "
+    "(デフォルトは環境変数 DOCS_TO_SLACK_SOCKET か ~/.cache/docs_to_slack/server.sock)",
+)
+@click.option("-v", "--verbose", is_flag=True, help="リクエストごとにログを出力します")
+def serve_socket(socket_path: str | None, verbose: bool) -> None:
+    """変換を常駐させ、main.py の変換をUnixドメインソケット経由で受け付けます
+
+    起動している間は、main.py (オプションなし、または -t) がclickや変換のモジュールを
+    読み込まずにこのサーバーへ変換を依頼するため、ショートカットからの実行が速くなります。
+    クリップボードにはChromium形式のデータを書き込むため、NSPasteboardを直接操作します。
+    """
+    from src.clipboard_backend import AppKitClipboardBackend
+    from src.conversion_cache import ConversionCache
+    from src.slack_list_generator import SlackListGenerator
+    from src.socket_client import default_socket_path
+    from src.socket_server import ConversionSocketServer
+
+    path = socket_path or default_socket_path()
+    try:
+        server = ConversionSocketServer(
+            path,
+            # 同じ内容を繰り返しコピーした場合に備えてメモリ上にキャッシュする
+            generator=SlackListGenerator(cache=ConversionCache()),
+            backend=AppKitClipboardBackend(),
+            verbose=verbose,
+        )
+    except OSError as e:
+        raise click.ClickException(str(e))
+    server.warm_up()
+    print(f"{path} で待ち受けています... (Ctrl+Cで終了)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+@contextmanager
+def _metrics(
+    conversion_cache,
+    port: int | None,
+    path: str | None,
+    tracer=None,
+) -> Iterator[None]:
+    """
+    withブロックの間、変換のメトリクスを集計し、portの /metrics とpathのファイルに出力します。
+    どちらも指定されずtracerも無い場合は何もせず、変換のコストは増えません。
+    """
+    if tracer is None and port is None and path is None:
+        yield
+        return
+
+    from src.metrics import MetricsFileWriter, MetricsTracer, start_metrics_server
+    from src.tracer import use_tracer
+
+    if tracer is None:
+        tracer = MetricsTracer()
+    if conversion_cache is not None:
+        tracer.watch_cache(conversion_cache)
+    server = None
+    if port is not None:
+        server = start_metrics_server(tracer.registry, port=port)
+        print(
+            f"http://127.0.0.1:{server.server_address[1]}/metrics でメトリクスを公開しています"
+        )
+    writer = MetricsFileWriter(tracer.registry, path).start() if path else None
+    try:
+        with use_tracer(tracer):
+            yield
+    finally:
+        if writer is not None:
+            writer.stop()
+        if server is not None:
+            server.shutdown()
+            server.server_close()
 
 
 if __name__ == "__main__":
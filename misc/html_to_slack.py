@@ -21,7 +21,7 @@ def main() -> None:
         print("Generated Plain Text:")
         print(result.plain_text)
 
-        ClipboardUtil.set_clipboard_data(result.binary_data, result.plain_text)
+        ClipboardUtil.set_rich_text(result.binary_data, result.plain_text)
 
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
@@ -0,0 +1,148 @@
+import asyncio
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import AsyncIterator, Iterable
+
+from src.generate_result import GenerateResult
+from src.slack_list_generator import SlackListGenerator
+
+
+def _generate_all(generator: SlackListGenerator, html_content: str) -> GenerateResult:
+    # 結果の各表現は遅延生成されるため、イベントループに戻る前にexecutor内で生成しておく
+    return generator.generate_uncached(html_content).materialize()
+
+
+class AsyncSlackListGenerator:
+    """
+    SlackListGeneratorのasyncio用のラッパーです。
+    パースとシリアライズをexecutorで実行するため、変換中もイベントループが止まりません。
+    同時に実行する変換の数はmax_concurrencyで制限され、上限に達すると
+    agenerateの呼び出し側は空きが出るまで待たされます。
+
+    ジェネレータにキャッシュがある場合、キャッシュの参照と保存はイベントループのスレッドで行い、
+    executorには解析とシリアライズだけを渡します。そのためProcessPoolExecutorでもキャッシュが効きます。
+    executorを省略した場合に作るスレッドのexecutorは、aclose()かasync withの終わりで終了します。
+    """
+
+    def __init__(
+        self,
+        generator: SlackListGenerator | None = None,
+        executor: Executor | None = None,
+        max_concurrency: int = 4,
+    ) -> None:
+        """
+        Args:
+            generator: 変換に使用するジェネレータ
+            executor: 変換を実行するexecutor。Noneの場合はmax_concurrency個のスレッドのexecutor。
+                ProcessPoolExecutorを渡すとGILに縛られずに並列に変換できます
+            max_concurrency: 同時に実行する変換の数の上限
+        """
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrencyは1以上にしてください: {max_concurrency}")
+        self.generator = generator or SlackListGenerator()
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        # セマフォはイベントループごとに作り直す
+        self._semaphore: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._own_executor: ThreadPoolExecutor | None = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    def _get_executor(self) -> Executor:
+        if self.executor is not None:
+            return self.executor
+        if self._own_executor is None:
+            self._own_executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix="agenerate"
+            )
+        return self._own_executor
+
+    async def agenerate(self, html_content: str) -> GenerateResult:
+        """
+        generateと同じGenerateResultを、イベントループを止めずに返します。
+
+        キャンセルされた場合、まだexecutorで開始していない変換は実行されません。
+        スレッドで実行中の変換は中断できないため、完了後に結果が破棄されます。
+        この場合も変換が終わるまでは同時に実行する変換の数に含めます。
+        """
+        key, cached = self.generator.cache_lookup(html_content)
+        if cached is not None:
+            return cached
+        result = await self._run(html_content)
+        if key is not None:
+            self.generator.cache.put(key, result)  # type: ignore
+        return result
+
+    async def _run(self, html_content: str) -> GenerateResult:
+        loop = asyncio.get_running_loop()
+        semaphore = self._get_semaphore()
+        await semaphore.acquire()
+        try:
+            future = self._get_executor().submit(
+                _generate_all, self.generator, html_content
+            )
+        except BaseException:
+            semaphore.release()
+            raise
+
+        # キャンセルされても実行中の変換は止まらないため、executorでの変換が終わった
+        # (または開始前にキャンセルされた) 時点で枠を返す
+        def release(_: Future) -> None:
+            try:
+                loop.call_soon_threadsafe(semaphore.release)
+            except RuntimeError:
+                # イベントループが既に閉じている
+                pass
+
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future)
+
+    async def agenerate_iter(
+        self, html_contents: Iterable[str]
+    ) -> AsyncIterator[GenerateResult]:
+        """
+        複数のHTMLを並行して変換し、結果を入力と同じ順序で返します。
+        未完了の変換はmax_concurrency個までしか作らないため、入力が大量でも
+        メモリを使い切りません。イテレーションを途中で止めると残りの変換はキャンセルされます。
+        """
+        pending: list[asyncio.Task[GenerateResult]] = []
+        inputs = iter(html_contents)
+        try:
+            for html_content in inputs:
+                pending.append(asyncio.ensure_future(self.agenerate(html_content)))
+                if len(pending) >= self.max_concurrency:
+                    yield await pending.pop(0)
+            while pending:
+                yield await pending.pop(0)
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def agenerate_batch(
+        self, html_contents: Iterable[str]
+    ) -> list[GenerateResult]:
+        """
+        複数のHTMLを並行して変換し、結果を入力と同じ順序のリストで返します。
+        """
+        return [result async for result in self.agenerate_iter(html_contents)]
+
+    async def aclose(self) -> None:
+        """
+        executorを省略した場合に作成したスレッドのexecutorを、実行中の変換の完了を待って終了します。
+        """
+        if self._own_executor is not None:
+            executor, self._own_executor = self._own_executor, None
+            await asyncio.to_thread(executor.shutdown)
+
+    async def __aenter__(self) -> "AsyncSlackListGenerator":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
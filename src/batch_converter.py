@@ -0,0 +1,196 @@
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from src.slack_list_generator import SlackListGenerator
+
+HTML_SUFFIXES = (".html", ".htm")
+
+
+@dataclass
+class BatchSummary:
+    files: int = 0
+    input_bytes: int = 0
+    seconds: float = 0.0
+    errors: list[tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def megabytes_per_second(self) -> float:
+        if self.seconds <= 0:
+            return 0.0
+        return self.input_bytes / (1024 * 1024) / self.seconds
+
+    def format(self) -> str:
+        return (
+            f"{self.files} files, {self.input_bytes / (1024 * 1024):.2f} MB "
+            f"in {self.seconds:.2f} s "
+            f"({self.files_per_second:.1f} files/s, "
+            f"{self.megabytes_per_second:.2f} MB/s), "
+            f"{len(self.errors)} errors"
+        )
+
+
+def collect_inputs(patterns: list[str]) -> list[Path]:
+    """
+    ファイル・globパターン・ディレクトリから変換対象のHTMLファイルを列挙します。
+    ディレクトリは再帰的に探索します。
+
+    Raises:
+        FileNotFoundError: 存在せず、globパターンとしても何にも一致しない入力がある場合
+    """
+    found: dict[Path, None] = {}
+    missing = []
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True)
+        if not matches and os.path.exists(pattern):
+            # "[a].html" のようにglobの記号を含む名前のファイル
+            matches = [pattern]
+        if not matches:
+            missing.append(pattern)
+        for match in matches:
+            path = Path(match)
+            if path.is_dir():
+                for root, _, names in os.walk(path):
+                    for name in sorted(names):
+                        if name.lower().endswith(HTML_SUFFIXES):
+                            found[Path(root) / name] = None
+            elif path.is_file():
+                found[path] = None
+    if missing:
+        raise FileNotFoundError(f"入力が見つかりません: {', '.join(missing)}")
+    return list(found)
+
+
+def output_paths(path: Path) -> tuple[Path, Path, Path]:
+    """
+    入力ファイルと同じ場所に出力する .txt / .texty.json / .bin のパスを返します。
+    """
+    return (
+        path.with_suffix(".txt"),
+        path.with_suffix(".texty.json"),
+        path.with_suffix(".bin"),
+    )
+
+
+def find_output_conflicts(paths: list[Path]) -> list[tuple[Path, Path]]:
+    """
+    出力ファイルが入力ファイルか、他の入力の出力ファイルと同じになる (入力, 重なる相手の入力) を返します。
+    自身の出力で上書きされる場合、相手は入力自身です。
+    notes.txt (自身の出力で上書きされる) や、a.html と a.htm (同じ a.txt に書き出す) が該当します。
+    """
+
+    def key(path: Path) -> str:
+        # macOSの標準のファイルシステムは大文字と小文字を区別しないため、区別せずに比較する
+        return str(path.resolve()).lower()
+
+    inputs = {key(path): path for path in paths}
+    written: dict[str, Path] = {}
+    conflicts = []
+    for path in paths:
+        for output in output_paths(path):
+            output_key = key(output)
+            other = inputs.get(output_key) or written.get(output_key)
+            if other is not None:
+                conflicts.append((path, other))
+                break
+            written[output_key] = path
+    return conflicts
+
+
+def convert_file(path: Path, generator: SlackListGenerator | None = None) -> int:
+    """
+    1つのHTMLファイルを変換して出力ファイルを書き込み、入力のバイト数を返します。
+    """
+    generator = generator or SlackListGenerator()
+    raw = path.read_bytes()
+    result = generator.generate(raw.decode("utf-8"))
+
+    text_path, texty_path, binary_path = output_paths(path)
+    text_path.write_text(result.plain_text, encoding="utf-8")
+    texty_path.write_text(
+        json.dumps(result.texty_json, separators=(",", ":")), encoding="utf-8"
+    )
+    with binary_path.open("wb") as f:
+        # バイナリデータはメモリ上にまとめず、エンコードしながら書き込む
+        result.write_binary(f)
+    return len(raw)
+
+
+def verify_file(path: Path) -> str | None:
+    """
+    出力済みの .bin を読み戻し、.txt / .texty.json と一致するか検証します。
+    不一致の場合はその内容を、一致した場合はNoneを返します。
+    """
+    from src.pickle_reader import PickleReader
+
+    text_path, texty_path, binary_path = output_paths(path)
+    reader = PickleReader(binary_path.read_bytes())
+    if reader.plain_text() != text_path.read_text(encoding="utf-8"):
+        return "public.utf8-plain-text does not match .txt"
+    if reader.get("slack/texty") != texty_path.read_text(encoding="utf-8"):
+        return "slack/texty does not match .texty.json"
+    return None
+
+
+def _convert_chunk(paths: list[str]) -> list[tuple[str, int, str | None]]:
+    # ワーカープロセスではジェネレータを使い回す
+    generator = SlackListGenerator()
+    results = []
+    for path in paths:
+        try:
+            results.append((path, convert_file(Path(path), generator), None))
+        except Exception as e:
+            results.append((path, 0, str(e)))
+    return results
+
+
+def convert_files(
+    paths: list[Path], workers: int | None = None, chunksize: int | None = None
+) -> BatchSummary:
+    """
+    複数のHTMLファイルをプロセスプールで並列に変換します。
+
+    Args:
+        paths: 変換するファイル
+        workers: ワーカープロセス数。1の場合はプールを使わずに変換します
+        chunksize: 1回のタスクでワーカーに渡すファイル数
+    """
+    workers = workers or os.cpu_count() or 1
+    if chunksize is not None and chunksize < 1:
+        raise ValueError(f"chunksizeは1以上を指定してください: {chunksize}")
+    if chunksize is None:
+        # ワーカーごとに数回に分けて渡し、タスク投入のオーバーヘッドと偏りを抑える
+        chunksize = max(1, len(paths) // (workers * 4))
+    chunks = [
+        [str(p) for p in paths[i : i + chunksize]]
+        for i in range(0, len(paths), chunksize)
+    ]
+
+    start = time.perf_counter()
+    if workers == 1 or len(chunks) <= 1:
+        summary = _summarize(map(_convert_chunk, chunks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            summary = _summarize(executor.map(_convert_chunk, chunks))
+    summary.seconds = time.perf_counter() - start
+    return summary
+
+
+def _summarize(chunk_results) -> BatchSummary:
+    summary = BatchSummary()
+    for results in chunk_results:
+        for path, size, error in results:
+            if error is None:
+                summary.files += 1
+                summary.input_bytes += size
+            else:
+                summary.errors.append((path, error))
+    return summary
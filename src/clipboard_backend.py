@@ -0,0 +1,178 @@
+import subprocess
+from abc import ABC, abstractmethod
+
+from src.tracer import CLIPBOARD_READ, CLIPBOARD_WRITE, get_tracer
+
+# カスタムクリップボードタイプの定義
+CHROMIUM_WEB_CUSTOM_DATA_TYPE = "org.chromium.web-custom-data"
+HTML_TYPE = "public.html"
+PLAIN_TEXT_TYPE = "public.utf8-plain-text"
+
+
+class TextClipboardBackend(ABC):
+    """
+    クリップボードのプレーンテキストだけを読み書きするインターフェースです。
+    """
+
+    @abstractmethod
+    def read_text(self) -> str | None:
+        """
+        クリップボードのプレーンテキストを返します。テキストが無い場合はNoneを返します。
+        """
+
+    @abstractmethod
+    def write_text(self, plain_text: str) -> None:
+        """
+        クリップボードにプレーンテキストのみを設定します。
+        """
+
+
+class ClipboardBackend(TextClipboardBackend):
+    """
+    クリップボード (ペーストボード) の任意のタイプと変更カウンタにアクセスするインターフェースです。
+    """
+
+    @abstractmethod
+    def change_count(self) -> int:
+        """
+        クリップボードの内容が変更されるたびに増加するカウンタを返します。
+        """
+
+    @abstractmethod
+    def read_bytes(self, type_: str = HTML_TYPE) -> bytes | None:
+        """
+        クリップボードから指定したタイプのデータをデコードせずに返します。
+        データが無い場合はNoneを返します。
+        """
+
+    def read_html(self) -> str | None:
+        """
+        クリップボードのHTMLコンテンツを返します。HTMLが無い場合はNoneを返します。
+        """
+        data = self.read_bytes(HTML_TYPE)
+        return data.decode("utf-8") if data is not None else None
+
+    def read_text(self) -> str | None:
+        data = self.read_bytes(PLAIN_TEXT_TYPE)
+        return data.decode("utf-8") if data is not None else None
+
+    @abstractmethod
+    def write_rich_text(self, data: bytes, plain_text: str) -> None:
+        """
+        カスタムChromium形式とプレーンテキストをクリップボードに設定します。
+        """
+
+
+class AppKitClipboardBackend(ClipboardBackend):
+    """
+    NSPasteboardをプロセス内で直接操作するmacOS用のバックエンドです。
+    """
+
+    def __init__(self) -> None:
+        from AppKit import NSPasteboard  # type: ignore
+
+        self._pb = NSPasteboard.generalPasteboard()
+
+    def change_count(self) -> int:
+        return int(self._pb.changeCount())
+
+    def read_bytes(self, type_: str = HTML_TYPE) -> bytes | None:
+        with get_tracer().phase(CLIPBOARD_READ) as record:
+            data = self._pb.dataForType_(type_)
+            if data is None:
+                return None
+            data = bytes(data)
+            record.count(bytes=len(data))
+        return data
+
+    def copy_html(self, html: str, plain_text: str = "") -> None:
+        """
+        HTMLとプレーンテキストをクリップボードに設定します。ベンチマークで使用します。
+        """
+        self._pb.clearContents()
+        self._pb.setString_forType_(plain_text, PLAIN_TEXT_TYPE)
+        self._pb.setString_forType_(html, HTML_TYPE)
+
+    def write_text(self, plain_text: str) -> None:
+        with get_tracer().phase(CLIPBOARD_WRITE):
+            self._pb.clearContents()
+            self._pb.setString_forType_(plain_text, PLAIN_TEXT_TYPE)
+
+    def write_rich_text(self, data: bytes, plain_text: str) -> None:
+        with get_tracer().phase(CLIPBOARD_WRITE) as record:
+            self._pb.clearContents()
+            # 互換性のためにプレーンテキストを設定
+            self._pb.setString_forType_(plain_text, PLAIN_TEXT_TYPE)
+            # カスタムバイナリデータを設定
+            self._pb.setData_forType_(data, CHROMIUM_WEB_CUSTOM_DATA_TYPE)
+            record.count(bytes=len(data))
+
+
+class SubprocessClipboardBackend(TextClipboardBackend):
+    """
+    pbpaste / pbcopy を子プロセスとして起動するバックエンドです。
+    読み書きのたびにfork/execのコストがかかるため、比較用に残しています。
+    pbpaste / pbcopy はHTMLやカスタム形式と変更カウンタを扱えないため、プレーンテキストだけを読み書きします。
+    """
+
+    def read_text(self) -> str | None:
+        p = subprocess.run(
+            ["pbpaste", "-Prefer", "txt"], stdout=subprocess.PIPE, check=True
+        )
+        # テキストが無い場合、pbpasteは何も出力しない
+        return p.stdout.decode("utf-8") if p.stdout else None
+
+    def write_text(self, plain_text: str) -> None:
+        subprocess.run(["pbcopy"], input=plain_text.encode("utf-8"), check=True)
+
+
+class MemoryClipboardBackend(ClipboardBackend):
+    """
+    メモリ上のクリップボードです。macOS以外でのテストに使用します。
+    """
+
+    def __init__(self) -> None:
+        self.contents: dict[str, str | bytes] = {}
+        self._change_count = 0
+
+    def _replace(self, contents: dict[str, str | bytes]) -> None:
+        self.contents = contents
+        self._change_count += 1
+
+    def copy_html(self, html: str, plain_text: str = "") -> None:
+        """
+        ユーザーがブラウザからHTMLをコピーした状態を再現します。
+        """
+        self._replace({HTML_TYPE: html, PLAIN_TEXT_TYPE: plain_text})
+
+    def change_count(self) -> int:
+        return self._change_count
+
+    def read_bytes(self, type_: str = HTML_TYPE) -> bytes | None:
+        value = self.contents.get(type_)
+        if isinstance(value, str):
+            return value.encode("utf-8")
+        return value
+
+    def write_text(self, plain_text: str) -> None:
+        self._replace({PLAIN_TEXT_TYPE: plain_text})
+
+    def write_rich_text(self, data: bytes, plain_text: str) -> None:
+        self._replace(
+            {PLAIN_TEXT_TYPE: plain_text, CHROMIUM_WEB_CUSTOM_DATA_TYPE: data}
+        )
+
+
+BACKENDS: dict[str, type[TextClipboardBackend]] = {
+    "appkit": AppKitClipboardBackend,
+    "subprocess": SubprocessClipboardBackend,
+    "memory": MemoryClipboardBackend,
+}
+
+
+def create_backend(name: str) -> TextClipboardBackend:
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"未対応のバックエンドです: {name}") from None
+    return backend_class()
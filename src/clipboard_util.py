@@ -1,23 +1,39 @@
-import subprocess
-from AppKit import NSPasteboard, NSPasteboardTypeString  # type: ignore
-
-# カスタムクリップボードタイプの定義
-CHROMIUM_WEB_CUSTOM_DATA_TYPE = "org.chromium.web-custom-data"
+from src.clipboard_backend import (
+    CHROMIUM_WEB_CUSTOM_DATA_TYPE,  # noqa: F401
+    HTML_TYPE,
+    PLAIN_TEXT_TYPE,
+    AppKitClipboardBackend,
+)
+from src.tracer import DECODE, get_tracer
 
 
 class ClipboardUtil:
+    """
+    macOSのクリップボードの読み書きです。AppKitClipboardBackendに委譲します。
+    """
+
+    @staticmethod
+    def get_clipboard_bytes() -> bytes:
+        """
+        macOSのクリップボードからHTMLコンテンツをデコードせずに取得します。
+        pbpasteを起動せず、NSPasteboardからプロセス内で直接読み込みます。
+        HTMLが無い場合は pbpaste と同様にプレーンテキストを返します。
+        """
+        backend = AppKitClipboardBackend()
+        data = backend.read_bytes(HTML_TYPE)
+        if data is None:
+            data = backend.read_bytes(PLAIN_TEXT_TYPE)
+        return data if data is not None else b""
+
     @staticmethod
     def get_clipboard_html() -> str:
         """
-        macOSのクリップボードからpbpasteを使用してHTMLコンテンツを取得します。
+        macOSのクリップボードからHTMLコンテンツを取得します。
         """
         try:
-            # 'public.html' はmacOSクリップボード上のHTMLデータの標準タイプです
-            p = subprocess.Popen(
-                ["pbpaste", "-prefer", "public.html"], stdout=subprocess.PIPE
-            )
-            data, _ = p.communicate()
-            return data.decode("utf-8")
+            data = ClipboardUtil.get_clipboard_bytes()
+            with get_tracer().phase(DECODE):
+                return data.decode("utf-8")
         except Exception as e:
             raise RuntimeError(f"クリップボードの読み込みエラー: {e}") from e
 
@@ -26,20 +42,11 @@ class ClipboardUtil:
         """
         クリップボードにプレーンテキストのみを設定します。
         """
-        pb = NSPasteboard.generalPasteboard()
-        pb.clearContents()
-        pb.setString_forType_(plain_text, NSPasteboardTypeString)
+        AppKitClipboardBackend().write_text(plain_text)
 
     @staticmethod
     def set_rich_text(data: bytes, plain_text: str) -> None:
         """
         カスタムChromium形式とプレーンテキストのフォールバックを使用してクリップボードデータを設定します。
         """
-        pb = NSPasteboard.generalPasteboard()
-        pb.clearContents()
-
-        # 互換性のためにプレーンテキストを設定
-        pb.setString_forType_(plain_text, NSPasteboardTypeString)
-
-        # カスタムバイナリデータを設定
-        pb.setData_forType_(data, CHROMIUM_WEB_CUSTOM_DATA_TYPE)
+        AppKitClipboardBackend().write_rich_text(data, plain_text)
@@ -0,0 +1,88 @@
+import time
+from typing import Callable
+
+from src.clipboard_backend import ClipboardBackend
+from src.slack_list_generator import SlackListGenerator
+
+# Google Docsからコピーしたときに付与されるラッパー要素のid
+GOOGLE_DOCS_MARKER = "docs-internal-guid"
+
+
+def is_google_docs_html(html: str | None) -> bool:
+    return bool(html) and GOOGLE_DOCS_MARKER in html  # type: ignore
+
+
+class ClipboardWatcher:
+    """
+    クリップボードの変更カウンタを監視し、Google DocsのHTMLがコピーされたら
+    自動的にSlack形式に変換して書き戻します。
+    インタープリタとパーサーを読み込んだまま常駐するため、変換ごとの起動コストがかかりません。
+    """
+
+    def __init__(
+        self,
+        backend: ClipboardBackend,
+        generator: SlackListGenerator | None = None,
+        text: bool = False,
+        interval: float = 0.25,
+        on_convert: Callable[[str], None] | None = None,
+    ) -> None:
+        """
+        Args:
+            backend: 監視するクリップボード
+            generator: 変換に使用するジェネレータ
+            text: Trueの場合はプレーンテキストのみを書き込みます
+            interval: 変更カウンタを確認する間隔 (秒)
+            on_convert: 変換するたびにプレーンテキストを受け取るコールバック
+        """
+        self.backend = backend
+        self.generator = generator or SlackListGenerator()
+        self.text = text
+        self.interval = interval
+        self.on_convert = on_convert
+        self.conversions = 0
+        # 起動時点でクリップボードにある内容は変換しない
+        self._last_change_count = backend.change_count()
+        self._running = False
+
+    def poll_once(self) -> bool:
+        """
+        クリップボードを一度確認し、変換した場合はTrueを返します。
+        """
+        change_count = self.backend.change_count()
+        if change_count == self._last_change_count:
+            return False
+        self._last_change_count = change_count
+
+        html = self.backend.read_html()
+        if not is_google_docs_html(html):
+            return False
+
+        if self.text:
+            plain_text = self.generator.generate_plain_text(html)  # type: ignore
+            self.backend.write_text(plain_text)
+        else:
+            result = self.generator.generate(html)  # type: ignore
+            plain_text = result.plain_text
+            self.backend.write_rich_text(result.binary_data, plain_text)
+
+        # 自分自身の書き込みによる変更は無視する
+        self._last_change_count = self.backend.change_count()
+        self.conversions += 1
+        if self.on_convert:
+            self.on_convert(plain_text)
+        return True
+
+    def run(self, max_polls: int | None = None) -> None:
+        """
+        stop()が呼ばれるか、max_polls回確認するまで監視を続けます。
+        """
+        self._running = True
+        polls = 0
+        while self._running and (max_polls is None or polls < max_polls):
+            self.poll_once()
+            polls += 1
+            time.sleep(self.interval)
+
+    def stop(self) -> None:
+        self._running = False
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import os
+import struct
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.generate_result import GenerateResult
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "docs_to_slack"
+CACHE_SUFFIX = ".cache"
+# 変換結果の形式のバージョン。同じ入力の変換結果が変わる変更をしたら増やし、
+# アップグレード前にディスクに書かれたエントリを使わないようにする
+CACHE_FORMAT_VERSION = 4
+
+
+def cache_key(html_content: str, **options) -> str:
+    """
+    入力HTMLと変換オプションから、キャッシュのキーとなるハッシュ値を計算します。
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"v{CACHE_FORMAT_VERSION}\0".encode("ascii"))
+    h.update(json.dumps(options, sort_keys=True).encode("utf-8"))
+    h.update(b"\0")
+    h.update(html_content.encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+
+@dataclass
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def format(self) -> str:
+        return (
+            f"hits={self.hits} (memory={self.memory_hits}, disk={self.disk_hits}) "
+            f"misses={self.misses} evictions={self.evictions} "
+            f"hit_rate={self.hit_rate:.1%}"
+        )
+
+
+def _encode(result: GenerateResult) -> bytes:
+    # ヘッダ(uint32) + plain_text/texty_jsonのJSON + binary_data
+    header = json.dumps(
+        {"plain_text": result.plain_text, "texty_json": result.texty_json},
+        separators=(",", ":"),
+    ).encode("utf-8")
+    return struct.pack("<I", len(header)) + header + result.binary_data
+
+
+def _decode(data: bytes) -> GenerateResult:
+    (header_size,) = struct.unpack_from("<I", data)
+    header = json.loads(data[4 : 4 + header_size])
+    return GenerateResult(
+        binary_data=data[4 + header_size :],
+        plain_text=header["plain_text"],
+        texty_json=header["texty_json"],
+    )
+
+
+class ConversionCache:
+    """
+    変換結果のキャッシュです。
+    メモリ上のLRUと、サイズ上限付きのディスク上のキャッシュの2段構成です。
+    サーバーのハンドラのスレッドから共有できるよう、各操作はロックを取って実行します。
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 128,
+        directory: str | Path | None = None,
+        max_disk_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        """
+        Args:
+            max_entries: メモリ上に保持する変換結果の数
+            directory: ディスクキャッシュのディレクトリ。Noneの場合はメモリのみ
+            max_disk_bytes: ディスクキャッシュの合計サイズの上限
+        """
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, GenerateResult] = OrderedDict()
+        self.directory = Path(directory) if directory is not None else None
+        # ディスク上のエントリ (古い順) とそのサイズ
+        self._disk: OrderedDict[str, int] = OrderedDict()
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._load_disk_index()
+
+    def _load_disk_index(self) -> None:
+        entries = []
+        for path in self.directory.glob(f"*{CACHE_SUFFIX}"):  # type: ignore
+            stat = path.stat()
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{CACHE_SUFFIX}"  # type: ignore
+
+    def get(self, key: str) -> GenerateResult | None:
+        with self._lock:
+            return self._get(key)
+
+    def _get(self, key: str) -> GenerateResult | None:
+        result = self._memory.get(key)
+        if result is not None:
+            self._memory.move_to_end(key)
+            self.stats.memory_hits += 1
+            return result
+
+        if key in self._disk:
+            path = self._path(key)
+            try:
+                result = _decode(path.read_bytes())
+                os.utime(path)
+            except (OSError, ValueError, KeyError, struct.error):
+                # 壊れたエントリや外部から削除されたエントリはミス扱いにする
+                self._disk.pop(key, None)
+            else:
+                self._disk.move_to_end(key)
+                self.stats.disk_hits += 1
+                self._put_memory(key, result)
+                return result
+
+        self.stats.misses += 1
+        return None
+
+    def put(self, key: str, result: GenerateResult) -> None:
+        with self._lock:
+            self._put(key, result)
+
+    def _put(self, key: str, result: GenerateResult) -> None:
+        self._put_memory(key, result)
+        if self.directory is None:
+            return
+        data = _encode(result)
+        if len(data) > self.max_disk_bytes:
+            return
+        path = self._path(key)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        self._disk[key] = len(data)
+        self._disk.move_to_end(key)
+        self._evict_disk()
+
+    def _put_memory(self, key: str, result: GenerateResult) -> None:
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _evict_disk(self) -> None:
+        total = sum(self._disk.values())
+        while total > self.max_disk_bytes and self._disk:
+            key, size = self._disk.popitem(last=False)
+            total -= size
+            self.stats.evictions += 1
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            for key in list(self._disk):
+                try:
+                    self._path(key).unlink()
+                except FileNotFoundError:
+                    pass
+            self._disk.clear()
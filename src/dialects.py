@@ -0,0 +1,89 @@
+import re
+from typing import TYPE_CHECKING
+
+from src.list_items import ListItems
+
+if TYPE_CHECKING:
+    from src.google_docs_parser import ItemMemo
+
+# HTMLを生成したエディタ
+GENERIC = "generic"
+GOOGLE_DOCS = "google_docs"
+WORD = "word"
+DIALECTS = (GENERIC, GOOGLE_DOCS, WORD)
+# HTMLの先頭から判定する
+AUTO = "auto"
+
+# 判定に使う先頭の文字数。クリップボードのHTMLでは生成元の目印はいずれも先頭付近にある
+SNIFF_CHARS = 4096
+
+# Wordの名前空間の宣言・Generatorのmeta・リストの段落のstyle
+_WORD_MARKERS = ("urn:schemas-microsoft-com:office:word", "Microsoft Word", "mso-list")
+_WORD_RE = re.compile(
+    r"urn:schemas-microsoft-com:office:word"
+    r"|content=[\"']?Microsoft Word"
+    r"|mso-list\s*:\s*l\d"
+)
+# Wordがリストの段落のstyleに書き込むmso-list (mso-list:l0 level1 lfo1)
+_MSO_LIST_RE = re.compile(r"mso-list\s*:\s*l\d")
+
+
+def sniff_dialect(html_content: str) -> str:
+    """
+    HTMLの先頭SNIFF_CHARS文字だけを見て、生成したエディタを判定します。
+
+    Returns:
+        GOOGLE_DOCS・WORDのいずれか。判定できない場合はGENERIC
+    """
+    head = html_content[:SNIFF_CHARS]
+    if "docs-internal-guid" in head:
+        return GOOGLE_DOCS
+    # 正規表現は目印の文字列を含む場合だけ使う
+    if any(marker in head for marker in _WORD_MARKERS) and _WORD_RE.search(head):
+        return WORD
+    return GENERIC
+
+
+def has_word_lists(html_content: str) -> bool:
+    """
+    WordのHTMLがリストを mso-list の段落で表現しているかを返します。
+    <ul>/<ol> でリストを書き出したWordのHTMLは汎用のパーサーで解析します。
+    """
+    return "mso-list" in html_content and _MSO_LIST_RE.search(html_content) is not None
+
+
+def resolve_dialect(html_content: str, dialect: str = AUTO) -> str:
+    """
+    HTMLの解析に使うdialectを決めます。"auto" の場合は先頭から判定し、
+    mso-list の段落を含まないWordのHTMLは汎用のパーサーで解析するためGENERICを返します。
+    """
+    if dialect == AUTO:
+        dialect = sniff_dialect(html_content)
+    if dialect == WORD and not has_word_lists(html_content):
+        # <ul>/<ol> で書き出されたリストは汎用の解析で変換する
+        return GENERIC
+    return dialect
+
+
+def parse_dialect_items(
+    html_content: str, dialect: str, memo: "ItemMemo | None" = None
+) -> ListItems:
+    """
+    dialectに特化したパーサーでHTMLコンテンツを解析し、出力順の項目を返します。
+    dialectはresolve_dialectで決めたものを渡します。
+    memoを渡すと、Google Docsと汎用のHTMLは前回の解析の <li> の結果を再利用して解析します。
+    """
+    if dialect == WORD:
+        from src.word_list_parser import WordListParser
+
+        return WordListParser().parse_items(html_content)
+    if dialect == GOOGLE_DOCS or (dialect == GENERIC and memo is not None):
+        # Google Docs向けのパーサーは汎用のHTMLでもStreamListParserと同じ結果を返す
+        from src.google_docs_parser import GoogleDocsListParser
+
+        return GoogleDocsListParser(memo).parse_items(html_content)
+    if dialect == GENERIC:
+        from src.stream_list_parser import StreamListParser
+
+        return StreamListParser().parse_items(html_content)
+    raise ValueError(f"未対応のdialectです: {dialect}")
@@ -0,0 +1,97 @@
+import fcntl
+import mmap
+import os
+import sys
+from typing import BinaryIO
+
+from src.generate_result import GenerateResult
+
+FORMATS = ("text", "texty", "chromium")
+# 標準出力への書き込みをまとめるバッファのサイズ
+OUTPUT_BUFFER_SIZE = 1024 * 1024
+
+
+def _decode_mapped(fileno: int) -> str | None:
+    """
+    通常のファイルをメモリマップし、バイト列にコピーせずにUTF-8として直接デコードします。
+    パイプなどマップできない場合はNoneを返します。
+    """
+    try:
+        if os.fstat(fileno).st_size == 0:
+            return ""
+        mapped = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        # パイプや端末など、マップできないファイル
+        return None
+    with mapped:
+        # デコードのエラーは読み直しても変わらないため、そのまま呼び出し元に伝える
+        return str(mapped, "utf-8")
+
+
+def read_html_file(path: str) -> str:
+    """
+    HTMLファイルをメモリマップして読み込みます。
+    """
+    with open(path, "rb") as f:
+        html_content = _decode_mapped(f.fileno())
+        if html_content is None:
+            html_content = f.read().decode("utf-8")
+    return html_content
+
+
+def read_html_stream(stream: BinaryIO) -> str:
+    """
+    標準入力などのストリームからHTMLを読み込みます。
+    ファイルがリダイレクトされている場合はメモリマップして読み込みます。
+    """
+    try:
+        # 読み込みが始まっていない場合のみ、ファイルの先頭からマップできる
+        fileno = stream.fileno() if stream.tell() == 0 else None
+    except (OSError, ValueError, AttributeError):
+        fileno = None
+    if fileno is not None:
+        html_content = _decode_mapped(fileno)
+        if html_content is not None:
+            return html_content
+    return stream.read().decode("utf-8")
+
+
+def open_stdout() -> BinaryIO:
+    """
+    標準出力に大きなバッファで書き込むバイナリストリームを返します。
+    ファイルディスクリプタを持たない場合 (テストなど) はsys.stdout.bufferを返します。
+    """
+    sys.stdout.flush()
+    try:
+        fileno = sys.stdout.fileno()
+    except (OSError, ValueError, AttributeError):
+        return sys.stdout.buffer
+    return open(fileno, "wb", buffering=OUTPUT_BUFFER_SIZE, closefd=False)
+
+
+def _can_backpatch(out: BinaryIO) -> bool:
+    if not out.seekable():
+        return False
+    try:
+        # 追記モードでは書き戻しが末尾への書き込みになってしまう
+        return not fcntl.fcntl(out.fileno(), fcntl.F_GETFL) & os.O_APPEND
+    except (OSError, ValueError, AttributeError):
+        return True
+
+
+def write_result(result: GenerateResult, output_format: str, out: BinaryIO) -> int:
+    """
+    変換結果を指定した形式でoutに書き込み、書き込んだバイト数を返します。
+    text・textyは末尾に改行を付けるため、複数の入力を続けて書き込むと1行に1件ずつ並びます。
+    chromiumは先頭にペイロードのサイズを持つため、続けて書き込んでも区切れます。
+    """
+    if output_format == "text":
+        return result.write_plain_text(out) + out.write(b"\n")
+    if output_format == "texty":
+        return result.write_texty(out) + out.write(b"\n")
+    if output_format == "chromium":
+        if _can_backpatch(out):
+            # ファイルへのリダイレクトでは、サイズを後から書き戻しながら書き込む
+            return result.write_binary(out)
+        return out.write(result.binary_data)
+    raise ValueError(f"未対応の出力形式です: {output_format}")
@@ -1,8 +1,170 @@
-from dataclasses import dataclass
+from typing import TYPE_CHECKING, BinaryIO, Iterable
+
+# 各表現の生成に使うモジュールは、-t のように使わない表現のimportを省略できるよう
+# その表現が初めて必要になった時点で読み込む
+if TYPE_CHECKING:
+    from src.list_items import ListItems
+
+
+def _write_utf8(sink: BinaryIO, text: str | Iterable[str]) -> int:
+    from src.pickle_writer import DEFAULT_CHUNK_CHARS, join_chunks
+
+    size = 0
+    for chunk in join_chunks(text, DEFAULT_CHUNK_CHARS):
+        size += sink.write(chunk.encode("utf-8"))
+    return size
 
 
-@dataclass
 class GenerateResult:
-    binary_data: bytes
-    plain_text: str
-    texty_json: dict
+    """
+    変換結果です。binary_data・plain_text・texty_json は最初にアクセスされたときに
+    解析済みの項目 (StreamListParser.parse_items の結果) から生成され、以降は使い回されます。
+    -t のようにプレーンテキストしか使わない場合は、JSONのシリアライズや
+    Chromium形式のエンコードを行いません。
+    """
+
+    def __init__(
+        self,
+        binary_data: bytes | None = None,
+        plain_text: str | None = None,
+        texty_json: dict | None = None,
+        items: "ListItems | None" = None,
+    ) -> None:
+        """
+        Args:
+            binary_data: Chromium形式のバイナリデータ。Noneの場合は必要になった時点で生成します
+            plain_text: プレーンテキスト。Noneの場合はitemsから生成します
+            texty_json: texty JSON。Noneの場合はitemsから生成します
+            items: 各表現の元になる解析済みの項目
+        """
+        if items is None and (plain_text is None or texty_json is None):
+            raise ValueError("itemsを省略する場合はplain_textとtexty_jsonが必要です")
+        self._binary_data = binary_data
+        self._plain_text = plain_text
+        self._texty_json = texty_json
+        self._items = items
+
+    @property
+    def plain_text(self) -> str:
+        if self._plain_text is None:
+            from src.stream_list_parser import render_plain_text
+            from src.tracer import OPS_BUILD, get_tracer
+
+            with get_tracer().phase(OPS_BUILD):
+                self._plain_text = render_plain_text(self._items)  # type: ignore
+        return self._plain_text
+
+    @property
+    def texty_json(self) -> dict:
+        if self._texty_json is None:
+            from src.stream_list_parser import render_texty_json
+            from src.tracer import OPS_BUILD, get_tracer
+
+            with get_tracer().phase(OPS_BUILD) as record:
+                self._texty_json = render_texty_json(self._items)  # type: ignore
+                record.count(ops=len(self._texty_json["ops"]))
+        return self._texty_json
+
+    @property
+    def binary_data(self) -> bytes:
+        if self._binary_data is None:
+            from src.texty_encoder import (
+                encode_chromium_data,
+                encode_texty_items,
+                encode_texty_json,
+            )
+            from src.tracer import JSON_SERIALIZE, PICKLE_WRITE, get_tracer
+
+            plain_text = self.plain_text
+            tracer = get_tracer()
+            with tracer.phase(JSON_SERIALIZE) as record:
+                if self._items is not None:
+                    # texty JSONの文字列は辞書を経由せず項目から直接組み立てる
+                    texty = encode_texty_items(self._items)
+                else:
+                    texty = encode_texty_json(self._texty_json)  # type: ignore
+                record.count(chars=len(texty))
+            with tracer.phase(PICKLE_WRITE) as record:
+                self._binary_data = encode_chromium_data(plain_text, texty)
+                record.count(bytes=len(self._binary_data))
+        return self._binary_data
+
+    def materialize(self) -> "GenerateResult":
+        """
+        binary_data・plain_text・texty_jsonをすべて生成して自身を返します。
+        結果を別のスレッドやプロセスに渡す前に、生成のコストを呼び出し側で払うために使います。
+        """
+        self._plain_text = self.plain_text
+        self._texty_json = self.texty_json
+        self._binary_data = self.binary_data
+        return self
+
+    def write_plain_text(self, sink: BinaryIO) -> int:
+        """
+        プレーンテキストをUTF-8でsinkに書き込み、書き込んだバイト数を返します。
+        plain_textが未生成の場合は項目から一定の文字数ずつ生成して書き込みます。
+        """
+        if self._plain_text is not None:
+            return _write_utf8(sink, self._plain_text)
+        from src.stream_list_parser import iter_plain_text
+        from src.tracer import OPS_BUILD, get_tracer
+
+        with get_tracer().phase(OPS_BUILD):
+            return _write_utf8(sink, iter_plain_text(self._items))  # type: ignore
+
+    def write_texty(self, sink: BinaryIO) -> int:
+        """
+        texty JSONをシリアライズしてUTF-8でsinkに書き込み、書き込んだバイト数を返します。
+        texty_jsonが未生成の場合は辞書を作らずに項目から直接書き込みます。
+        """
+        from src.texty_encoder import encode_texty_json, iter_texty_items
+        from src.tracer import JSON_SERIALIZE, get_tracer
+
+        with get_tracer().phase(JSON_SERIALIZE):
+            if self._texty_json is None:
+                return _write_utf8(sink, iter_texty_items(self._items))  # type: ignore
+            return _write_utf8(sink, encode_texty_json(self._texty_json))
+
+    def write_binary(self, sink: BinaryIO) -> int:
+        """
+        Chromium形式のバイナリデータをシーク可能なsinkに書き込み、書き込んだバイト数を返します。
+        binary_dataが未生成の場合は項目から直接エンコードしながら書き込むため、
+        ペイロード全体のバイト列をメモリ上に作りません。
+        """
+        if self._binary_data is not None:
+            return sink.write(self._binary_data)
+        from src.stream_list_parser import iter_plain_text
+        from src.texty_encoder import (
+            encode_texty_json,
+            iter_texty_items,
+            write_chromium_data,
+        )
+        from src.tracer import PICKLE_WRITE, get_tracer
+
+        if self._plain_text is not None:
+            plain_text = self._plain_text
+        else:
+            plain_text = iter_plain_text(self._items)  # type: ignore
+        if self._items is not None:
+            texty = iter_texty_items(self._items)
+        else:
+            texty = encode_texty_json(self._texty_json)  # type: ignore
+        with get_tracer().phase(PICKLE_WRITE) as record:
+            size = write_chromium_data(sink, plain_text, texty)
+            record.count(bytes=size)
+        return size
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, GenerateResult):
+            return NotImplemented
+        return (
+            self.binary_data == other.binary_data
+            and self.plain_text == other.plain_text
+            and self.texty_json == other.texty_json
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"GenerateResult(binary_data={self.binary_data!r}, "
+            f"plain_text={self.plain_text!r}, texty_json={self.texty_json!r})"
+        )
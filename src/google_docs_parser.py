@@ -0,0 +1,239 @@
+import re
+
+from src.list_items import ListItems
+from src.stream_list_parser import (
+    EMPTY_ELEMENT_TAGS,
+    FAST_TAG_RE,
+    LIST,
+    RAW_TEXT_TAGS,
+    StreamListParser,
+    parse_aria_level,
+    parse_fast_attrs,
+)
+
+# <li> の中に置かれていても、項目のテキストを取り込むだけのインライン要素
+_INLINE_TAGS = frozenset(
+    [
+        "a",
+        "abbr",
+        "b",
+        "bdi",
+        "bdo",
+        "big",
+        "br",
+        "cite",
+        "code",
+        "del",
+        "dfn",
+        "em",
+        "font",
+        "i",
+        "img",
+        "ins",
+        "kbd",
+        "mark",
+        "p",
+        "q",
+        "s",
+        "samp",
+        "small",
+        "span",
+        "strike",
+        "strong",
+        "sub",
+        "sup",
+        "time",
+        "tt",
+        "u",
+        "var",
+        "wbr",
+    ]
+)
+# Google Docsの <li> に付く aria-level="N"
+_ARIA_LEVEL_RE = re.compile(r'\saria-level\s*=\s*"(\d+)"', re.IGNORECASE)
+# <li> の中にリストや別の <li> があるかどうか
+_NESTED_LIST_RE = re.compile(r"</?(?:li|ul|ol)[\s/>]", re.IGNORECASE)
+
+
+def _aria_level(attrs: str) -> int | None:
+    """
+    <li> の属性の文字列からaria-levelに対応する0始まりの階層を返します。
+    aria-levelがない場合や数字でない場合はNoneを返します。
+    """
+    if not attrs or "aria-level" not in attrs.lower():
+        return None
+    match = _ARIA_LEVEL_RE.search(attrs)
+    if match is None or attrs.lower().count("aria-level") != 1:
+        # 引用符のない値や重複した属性は属性を解釈してから判定する
+        for key, value in reversed(parse_fast_attrs(attrs)):
+            if key == "aria-level":
+                return parse_aria_level(value)
+        return None
+    return parse_aria_level(match.group(1))
+
+
+class ItemMemo:
+    """
+    Google Docsの <li> ごとの切り出しの結果を、次の解析で再利用するために保持します。
+    キーは <li> の属性と終了タグまでの中身で、値は (閉じた空要素タグ, 項目のテキスト, 階層) か、
+    まとめて処理できない場合のNoneです。直前の解析に現れた <li> の結果だけを残すため、
+    保持するのは文書1つ分です。
+    """
+
+    def __init__(self) -> None:
+        self.entries: dict[tuple[str | None, str], tuple | None] = {}
+
+
+_MISSING = object()
+
+
+class GoogleDocsListParser(StreamListParser):
+    """
+    Google Docsからコピーしたリスト用のStreamListParserです。
+
+    Google Docsの <li> はネストしたリストを含まず (深い階層は兄弟の <ul> で表現される)、
+    中身は <p> と <span> だけで構成されます。そのような <li> は終了タグまでを
+    まとめて切り出し、中の要素をスタックに積まずにテキストだけを取り込みます。
+    条件を満たさない <li> は通常どおりタグごとに処理するため、結果はStreamListParserと同じです。
+
+    ItemMemoを渡すと、前回の解析と属性・中身が同じ <li> は切り出しを省略して結果を再利用します。
+    番号と、aria-levelのない項目の階層は再利用せずに文脈から求めるため、結果は変わりません。
+    """
+
+    def __init__(self, memo: ItemMemo | None = None) -> None:
+        """
+        Args:
+            memo: 前回の解析の <li> ごとの結果。解析が終わるとこの解析の結果に置き換えます
+        """
+        super().__init__()
+        self.memo = memo
+
+    def parse_items(self, html_content: str) -> ListItems:
+        if self.memo is None:
+            return super().parse_items(html_content)
+        self._previous = self.memo.entries
+        self._current: dict[tuple[str | None, str], tuple | None] = {}
+        items = super().parse_items(html_content)
+        self.memo.entries = self._current
+        return items
+
+    def _feed_fast(self, html_content: str) -> bool:
+        position = 0
+        search = FAST_TAG_RE.search
+        while True:
+            match = search(html_content, position)
+            if match is None:
+                break
+            start = match.start()
+            if start != position and not self._fast_text(html_content[position:start]):
+                return False
+            position = match.end()
+            end_name, name, attrs, self_closing = match.groups()
+            if end_name is not None:
+                self.handle_endtag(end_name.lower())
+                continue
+            name = name.lower()
+            if name in RAW_TEXT_TAGS:
+                return False
+            if name == "li" and not self_closing and self._stack[-1].role == LIST:
+                end = self._fast_item(html_content, position, attrs)
+                if end is not None:
+                    position = end
+                    continue
+            parsed_attrs = parse_fast_attrs(attrs) if name == "li" and attrs else []
+            if self_closing:
+                self.handle_startendtag(name, parsed_attrs)
+            else:
+                self.handle_starttag(name, parsed_attrs)
+        if position != len(html_content):
+            return self._fast_text(html_content[position:])
+        return True
+
+    def _fast_item(self, html_content: str, position: int, attrs: str) -> int | None:
+        """
+        positionから始まる <li> の中身を終了タグまでまとめて処理し、終了タグの直後の位置を返します。
+        インライン要素以外を含むなど、まとめて処理できない場合は何もせずにNoneを返します。
+        """
+        if self._preserve_depth or self._containers:
+            return None
+        end = html_content.find("</li>", position)
+        if end < 0:
+            return None
+        inner = html_content[position:end]
+
+        self._end_data()
+        if self.memo is None:
+            entry = self._scan_item(attrs, inner)
+        else:
+            key = (attrs, inner)
+            entry = self._previous.get(key, _MISSING)
+            if entry is _MISSING:
+                entry = self._scan_item(attrs, inner)
+            self._current[key] = entry
+        if entry is None:
+            return None
+
+        closed, item_text, level = entry
+        self._already_closed.extend(closed)
+        list_frame = self._stack[-1].frame
+        if level is None:
+            level = list_frame.level
+        if item_text:
+            list_frame.sink.append(
+                (item_text, list_frame.list_type, level, list_frame.index)
+            )
+            if list_frame.list_type == "ordered":
+                list_frame.index += 1
+        return end + len("</li>")
+
+    def _scan_item(self, attrs: str | None, inner: str) -> tuple | None:
+        """
+        <li> の中身を切り出し、(閉じた空要素タグ, 項目のテキスト, aria-levelの階層) を返します。
+        まとめて処理できない場合はNoneを返します。
+        """
+        if _NESTED_LIST_RE.search(inner):
+            return None
+        # タグの前後のテキストと各タグのグループを1回の分割でまとめて取り出す
+        # (segments[i::5] はテキスト・終了タグ名・開始タグ名・属性・自己終了の "/")
+        segments = FAST_TAG_RE.split(inner)
+        open_tags: list[str] = []
+        closed: list[str] = []
+        for end_name, name, self_closing in zip(
+            segments[1::5], segments[2::5], segments[4::5]
+        ):
+            if end_name is not None:
+                # 対応する開始タグがない終了タグは外側の要素を閉じるため、通常の処理に任せる
+                if not open_tags or open_tags.pop() != end_name.lower():
+                    return None
+                continue
+            name = name.lower()
+            if name not in _INLINE_TAGS:
+                return None
+            if name in EMPTY_ELEMENT_TAGS:
+                if not self_closing:
+                    closed.append(name)
+            elif not self_closing:
+                open_tags.append(name)
+        if open_tags:
+            return None
+        parts = self._take_texts(segments[::5])
+        if parts is None:
+            return None
+        return tuple(closed), "".join(parts).strip(), _aria_level(attrs)
+
+    def _take_texts(self, texts: list[str]) -> list[str] | None:
+        # html.parserではタグごとに区切られるため、空白だけのテキストは区切りごとにまとめる
+        parts = []
+        for text in texts:
+            if not text:
+                continue
+            if "<" in text or "&" in text:
+                if not self._fast_text(text):
+                    self._data = []
+                    return None
+                text = "".join(self._data)
+                self._data = []
+            if not text.strip(" \n\t\f\r"):
+                text = "\n" if "\n" in text else " "
+            parts.append(text)
+        return parts
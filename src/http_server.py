@@ -0,0 +1,265 @@
+import json
+import queue
+import socket
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from src.generate_result import GenerateResult
+from src.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from src.metrics import CallbackMetric, MetricsRegistry
+from src.slack_list_generator import SlackListGenerator
+
+PLAIN_TEXT_MEDIA_TYPE = "text/plain"
+TEXTY_MEDIA_TYPE = "application/json"
+CHROMIUM_MEDIA_TYPE = "application/x-chromium-web-custom-data"
+
+# Acceptヘッダで指定できるメディアタイプと、その別名・ワイルドカード
+_MEDIA_TYPES = {
+    PLAIN_TEXT_MEDIA_TYPE: PLAIN_TEXT_MEDIA_TYPE,
+    "text/*": PLAIN_TEXT_MEDIA_TYPE,
+    TEXTY_MEDIA_TYPE: TEXTY_MEDIA_TYPE,
+    "application/*": TEXTY_MEDIA_TYPE,
+    "*/*": TEXTY_MEDIA_TYPE,
+    CHROMIUM_MEDIA_TYPE: CHROMIUM_MEDIA_TYPE,
+    "application/octet-stream": CHROMIUM_MEDIA_TYPE,
+}
+
+
+def negotiate(accept: str | None) -> str | None:
+    """
+    Acceptヘッダから返すメディアタイプを選びます。対応するものが無い場合はNoneを返します。
+    Acceptヘッダが無い場合はtexty JSONを返します。
+    """
+    if not accept:
+        return TEXTY_MEDIA_TYPE
+    candidates = []
+    for position, part in enumerate(accept.split(",")):
+        media_type, *params = [p.strip() for p in part.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0 and media_type.lower() in _MEDIA_TYPES:
+            # 同じqの場合は先に書かれたものを優先する
+            candidates.append((-quality, position, _MEDIA_TYPES[media_type.lower()]))
+    return min(candidates)[2] if candidates else None
+
+
+def render_result(result: GenerateResult, media_type: str) -> tuple[bytes, str]:
+    """
+    変換結果をメディアタイプに応じたレスポンスボディとContent-Typeにします。
+    """
+    if media_type == PLAIN_TEXT_MEDIA_TYPE:
+        return result.plain_text.encode("utf-8"), "text/plain; charset=utf-8"
+    if media_type == CHROMIUM_MEDIA_TYPE:
+        return result.binary_data, CHROMIUM_MEDIA_TYPE
+    body = json.dumps(result.texty_json, ensure_ascii=False, separators=(",", ":"))
+    return body.encode("utf-8"), "application/json; charset=utf-8"
+
+
+class ConversionRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /convert でHTMLを受け取り、変換結果を返します。
+    HTTP/1.1のkeep-aliveに対応し、1つの接続で複数のリクエストを処理します。
+    """
+
+    protocol_version = "HTTP/1.1"
+    # ヘッダと本文を別々に書き込むため、Nagleのアルゴリズムで応答が遅れないようにする
+    disable_nagle_algorithm = True
+    server: "ConversionHTTPServer"
+
+    def setup(self) -> None:
+        # 次のリクエストを待つ時間。keep-aliveの接続がワーカーを占有し続けないようにする
+        self.timeout = self.server.keep_alive_timeout
+        super().setup()
+
+    def _send(
+        self, status: int, body: bytes, content_type: str = "text/plain; charset=utf-8"
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error_text(self, status: int, message: str) -> None:
+        self._send(status, (message + "\n").encode("utf-8"))
+
+    def do_GET(self) -> None:
+        if self.path == "/healthz":
+            self._send(200, b"ok\n")
+        elif (
+            self.path.split("?", 1)[0] == "/metrics" and self.server.metrics is not None
+        ):
+            body = self.server.metrics.render().encode("utf-8")
+            self._send(200, body, METRICS_CONTENT_TYPE)
+        else:
+            self._send_error_text(404, "Not Found")
+
+    def do_POST(self) -> None:
+        if self.path.split("?", 1)[0] != "/convert":
+            self._send_error_text(404, "Not Found")
+            return
+
+        length_header = self.headers.get("Content-Length")
+        if length_header is None:
+            self.close_connection = True
+            self._send_error_text(411, "Content-Length is required")
+            return
+        try:
+            length = int(length_header)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            self._send_error_text(400, "Invalid Content-Length")
+            return
+        if length > self.server.max_body_bytes:
+            # 本文を読まずに返すため、この接続は再利用できない
+            self.close_connection = True
+            self._send_error_text(
+                413, f"Request body exceeds {self.server.max_body_bytes} bytes"
+            )
+            return
+        body = self.rfile.read(length)
+
+        media_type = negotiate(self.headers.get("Accept"))
+        if media_type is None:
+            self._send_error_text(
+                406,
+                f"Acceptable types: {PLAIN_TEXT_MEDIA_TYPE}, {TEXTY_MEDIA_TYPE}, "
+                f"{CHROMIUM_MEDIA_TYPE}",
+            )
+            return
+        try:
+            html_content = body.decode(self.headers.get_content_charset("utf-8"))
+        except (LookupError, UnicodeDecodeError) as e:
+            self._send_error_text(400, f"Cannot decode request body: {e}")
+            return
+
+        try:
+            result = self.server.generator.generate(html_content)
+        except Exception as e:
+            self.log_error("Conversion failed: %r", e)
+            self._send_error_text(500, "Conversion failed")
+            return
+        response, content_type = render_result(result, media_type)
+        self._send(200, response, content_type)
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class ConversionHTTPServer(HTTPServer):
+    """
+    固定数のワーカースレッドで接続を処理する変換サーバーです。
+    受け付けた接続はキューに積まれ、キューが一杯の場合は503を返して切断します。
+    keep-aliveの接続は閉じられるまで1つのワーカーが担当します。
+    """
+
+    def __init__(
+        self,
+        server_address: tuple[str, int],
+        generator: SlackListGenerator | None = None,
+        workers: int = 4,
+        queue_depth: int = 64,
+        max_body_bytes: int = 8 * 1024 * 1024,
+        keep_alive_timeout: float = 5.0,
+        verbose: bool = False,
+        metrics: MetricsRegistry | None = None,
+    ) -> None:
+        """
+        Args:
+            server_address: 待ち受けるホストとポート
+            generator: 変換に使用するジェネレータ。ワーカー間で共有されます
+            workers: ワーカースレッドの数
+            queue_depth: ワーカーの空きを待つ接続の数の上限
+            max_body_bytes: リクエストボディのサイズの上限
+            keep_alive_timeout: keep-aliveの接続で次のリクエストを待つ秒数
+            verbose: Trueの場合はリクエストごとにログを出力します
+            metrics: 指定した場合は GET /metrics でPrometheusのテキスト形式で返します
+        """
+        if workers < 1:
+            raise ValueError(f"workersは1以上にしてください: {workers}")
+        super().__init__(server_address, ConversionRequestHandler)
+        self.generator = generator or SlackListGenerator()
+        self.max_body_bytes = max_body_bytes
+        self.keep_alive_timeout = keep_alive_timeout
+        self.verbose = verbose
+        self.rejected = 0
+        self.metrics = metrics
+        if metrics is not None:
+            metrics.register(
+                CallbackMetric(
+                    "slack_list_http_rejected_total",
+                    "Connections rejected with 503 because the queue was full.",
+                    "counter",
+                    lambda: [((), self.rejected)],
+                )
+            )
+        self._queue: queue.Queue[tuple[socket.socket, tuple] | None] = queue.Queue(
+            maxsize=queue_depth
+        )
+        self._workers = [
+            threading.Thread(target=self._work, name=f"convert-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def process_request(self, request, client_address) -> None:  # type: ignore
+        try:
+            self._queue.put_nowait((request, client_address))
+        except queue.Full:
+            self.rejected += 1
+            self._reject(request)
+            self.shutdown_request(request)
+
+    def _reject(self, request: socket.socket) -> None:
+        try:
+            request.sendall(
+                b"HTTP/1.1 503 Service Unavailable\r\n"
+                b"Content-Length: 0\r\n"
+                b"Retry-After: 1\r\n"
+                b"Connection: close\r\n\r\n"
+            )
+        except OSError:
+            pass
+
+    def _work(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            request, client_address = item
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    def handle_error(self, request, client_address) -> None:  # type: ignore
+        if self.verbose:
+            super().handle_error(request, client_address)
+        else:
+            print(
+                f"Error while handling a request from {client_address}: "
+                f"{sys.exc_info()[1]!r}",
+                file=sys.stderr,
+            )
+
+    def server_close(self) -> None:
+        super().server_close()
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join(timeout=self.keep_alive_timeout + 1)
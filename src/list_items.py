@@ -0,0 +1,111 @@
+from array import array
+from typing import Iterator
+
+# list_typeの番号。0はリストの間の段落
+LIST_TYPES = (None, "bullet", "ordered")
+_LIST_TYPE_CODES = {list_type: code for code, list_type in enumerate(LIST_TYPES)}
+
+
+class ListItems:
+    """
+    解析済みの項目を保持する、コンパクトな中間表現です。
+    項目ごとのオブジェクトは作らず、list_type・level・序数を並列の配列に、
+    テキストを1つの文字列バッファとその終了位置の配列に保持します。
+
+    イテレートすると (text, list_type, level, index) のタプルを出力順に返すため、
+    プレーンテキストやtexty JSONなどの出力はすべてこの表現から生成できます。
+    """
+
+    __slots__ = ("types", "levels", "ordinals", "ends", "_buffer")
+
+    def __init__(self) -> None:
+        self.types = array("B")
+        self.levels = array("I")
+        self.ordinals = array("I")
+        # 各項目のテキストのバッファ上の終了位置
+        self.ends = array("Q")
+        # 追加されたテキスト。参照されたときに1つの文字列に結合する
+        self._buffer: list[str] = []
+
+    def append(self, text: str, list_type: str | None, level: int, index: int) -> None:
+        self.types.append(_LIST_TYPE_CODES[list_type])
+        self.levels.append(level)
+        self.ordinals.append(index)
+        self.ends.append((self.ends[-1] if self.ends else 0) + len(text))
+        self._buffer.append(text)
+
+    def extend(self, other: "ListItems") -> None:
+        """
+        別のListItemsの項目を末尾に追加します。
+        """
+        offset = self.ends[-1] if self.ends else 0
+        self.types.extend(other.types)
+        self.levels.extend(other.levels)
+        self.ordinals.extend(other.ordinals)
+        self.ends.extend(array("Q", [end + offset for end in other.ends]))
+        self._buffer.append(other.text)
+
+    @property
+    def text(self) -> str:
+        """
+        全項目のテキストを連結した文字列バッファです。
+        """
+        if len(self._buffer) != 1:
+            self._buffer[:] = ["".join(self._buffer)]
+        return self._buffer[0]
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def __getitem__(self, i: int) -> tuple[str, str | None, int, int]:
+        if i < 0:
+            i += len(self)
+        start = self.ends[i - 1] if i > 0 else 0
+        return (
+            self.text[start : self.ends[i]],
+            LIST_TYPES[self.types[i]],
+            self.levels[i],
+            self.ordinals[i],
+        )
+
+    def __iter__(self) -> Iterator[tuple[str, str | None, int, int]]:
+        text = self.text
+        start = 0
+        for code, level, index, end in zip(
+            self.types, self.levels, self.ordinals, self.ends
+        ):
+            yield text[start:end], LIST_TYPES[code], level, index
+            start = end
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ListItems):
+            return (
+                self.types == other.types
+                and self.levels == other.levels
+                and self.ordinals == other.ordinals
+                and self.ends == other.ends
+                and self.text == other.text
+            )
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ListItems({list(self)!r})"
+
+    def __getstate__(self) -> tuple:
+        return self.types, self.levels, self.ordinals, self.ends, self.text
+
+    def __setstate__(self, state: tuple) -> None:
+        self.types, self.levels, self.ordinals, self.ends, text = state
+        self._buffer = [text]
+
+    @classmethod
+    def from_tuples(cls, items) -> "ListItems":
+        """
+        (text, list_type, level, index) のタプルのイテラブルから生成します。
+        """
+        list_items = cls()
+        for item in items:
+            list_items.append(*item)
+        return list_items
@@ -0,0 +1,116 @@
+import re
+from html import unescape
+from html.parser import HTMLParser
+
+from src.stream_list_parser import FAST_TAG_RE, RAW_TEXT_TAGS, parse_fast_attrs
+
+# タグに加えて、中身に "--" を含まないコメントと、Wordの条件付きの範囲 (<![if ...]>) に一致する
+_FAST_MARKUP_RE = re.compile(
+    FAST_TAG_RE.pattern
+    + r"|<!--(?:[^-]|-(?!-))*-->"
+    + r"|<!\[((?:if|else|endif)\b[^\]<>]*)\]>",
+    re.IGNORECASE,
+)
+# 中身をテキストとして扱うタグ。html.parserのバージョンによって扱いが異なるタグも含む
+_CDATA_TAGS = frozenset(["script", "style"])
+
+
+class MarkupParser(HTMLParser):
+    """
+    文字参照を展開したテキスト (convert_charrefs=True) のイベントを受け取るパーサーの基底クラスです。
+
+    StreamListParserと同様に、属性の書き方が整ったHTMLではhtml.parserを通さずに
+    正規表現でタグ・コメント・条件付きの範囲を切り出します。属性はwants_attrsがTrueを返した
+    タグだけ解釈します。
+    html.parserと同じ結果になることを保証できない構文が見つかった場合は、
+    _begin()で状態を戻してからhtml.parserで解析し直します。
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+
+    def _begin(self) -> None:
+        """
+        解析の状態を初期化します。サブクラスで解析中の状態を作り直します。
+        """
+        self.reset()
+
+    def wants_attrs(self, tag: str, attrs: str) -> bool:
+        """
+        タグの属性を解釈する必要があるかどうかを、タグ名と属性の文字列から判定します。
+        """
+        return True
+
+    def _feed_markup(self, html_content: str) -> None:
+        self._begin()
+        if not self._feed_fast(html_content):
+            # 途中まで処理したイベントを捨てて、html.parserで解析し直す
+            self._begin()
+            self.feed(html_content)
+            self.close()
+
+    def _feed_fast(self, html_content: str) -> bool:
+        handle_starttag = self.handle_starttag
+        handle_endtag = self.handle_endtag
+        wants_attrs = self.wants_attrs
+        fast_text = self._fast_text
+        position = 0
+        restart = True
+        while restart:
+            restart = False
+            for match in _FAST_MARKUP_RE.finditer(html_content, position):
+                start = match.start()
+                if start != position and not fast_text(html_content[position:start]):
+                    return False
+                position = match.end()
+                end_name, name, attrs, self_closing, condition = match.groups()
+                if end_name is not None:
+                    handle_endtag(end_name.lower())
+                elif name is not None:
+                    name = name.lower()
+                    parsed_attrs = (
+                        parse_fast_attrs(attrs)
+                        if attrs and wants_attrs(name, attrs)
+                        else []
+                    )
+                    if self_closing:
+                        self.handle_startendtag(name, parsed_attrs)
+                        continue
+                    handle_starttag(name, parsed_attrs)
+                    if name in RAW_TEXT_TAGS:
+                        end = self._raw_text_end(html_content, position, name)
+                        if end < 0:
+                            return False
+                        if end != position:
+                            self.handle_data(html_content[position:end])
+                        handle_endtag(name)
+                        # 中身を読み飛ばした位置から切り出し直す
+                        position = end + len(name) + 3
+                        restart = True
+                        break
+                elif condition is not None:
+                    self.unknown_decl(condition)
+        if position < len(html_content):
+            return fast_text(html_content[position:])
+        return True
+
+    def _raw_text_end(self, html_content: str, position: int, name: str) -> int:
+        # 終了タグの書き方やhtml.parserのバージョンによって範囲が変わらない場合だけ、
+        # 中身をまとめて切り出す
+        end = html_content.find(f"</{name}>", position)
+        if end < 0:
+            return -1
+        content = html_content[position:end]
+        if name in _CDATA_TAGS:
+            if "</" in content:
+                return -1
+        elif "<" in content or "&" in content:
+            return -1
+        return end
+
+    def _fast_text(self, text: str) -> bool:
+        # タグとして切り出せなかった "<" が含まれる場合はhtml.parserに任せる
+        if "<" in text:
+            return False
+        self.handle_data(unescape(text) if "&" in text else text)
+        return True
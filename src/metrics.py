@@ -0,0 +1,445 @@
+import math
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Callable, Iterable
+
+from src.tracer import CACHE_LOOKUP, CLIPBOARD_READ, CLIPBOARD_WRITE, PARSE
+
+if TYPE_CHECKING:
+    from src.conversion_cache import ConversionCache
+
+# Prometheusのテキスト形式 (version 0.0.4) のContent-Type
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 秒単位のレイテンシのバケット。クリップボードの読み書きから巨大な文書の解析までを覆う
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+# 1文書あたりの項目数のバケット
+ITEM_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# (サンプル名, ラベル, 値) の並び
+Samples = Iterable[tuple[str, tuple[tuple[str, str], ...], float]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def _format_sample(name: str, labels: tuple[tuple[str, str], ...], value: float) -> str:
+    if labels:
+        label_text = ",".join(f'{key}="{_escape(str(v))}"' for key, v in labels)
+        return f"{name}{{{label_text}}} {_format_value(value)}"
+    return f"{name} {_format_value(value)}"
+
+
+class Counter:
+    """
+    単調に増加するカウンタです。ラベルの値の組ごとに値を保持します。
+    """
+
+    type_name = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, labels: tuple[str, ...] = ()) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, labels: tuple[str, ...] = ()) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> Samples:
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield self.name, tuple(zip(self.labelnames, labels)), value
+
+
+class Histogram:
+    """
+    観測値をバケットごとに数えるヒストグラムです。ラベルの値の組ごとに値を保持します。
+    """
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        buckets: tuple[float, ...],
+        labelnames: tuple[str, ...] = (),
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = labelnames
+        # ラベルの値の組ごとの [各バケットの件数 (累積しない)..., +Infの件数, 合計]
+        self._values: dict[tuple[str, ...], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: tuple[str, ...] = ()) -> None:
+        with self._lock:
+            counts = self._values.get(labels)
+            if counts is None:
+                counts = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-2] += 1
+            counts[-1] += value
+
+    def count(self, labels: tuple[str, ...] = ()) -> int:
+        counts = self._values.get(labels)
+        return int(sum(counts[:-1])) if counts else 0
+
+    def samples(self) -> Samples:
+        with self._lock:
+            values = sorted(
+                (labels, list(counts)) for labels, counts in self._values.items()
+            )
+        for labels, counts in values:
+            label_pairs = tuple(zip(self.labelnames, labels))
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (math.inf,), counts[:-1]):
+                cumulative += count
+                yield (
+                    f"{self.name}_bucket",
+                    label_pairs + (("le", _format_value(bound)),),
+                    cumulative,
+                )
+            yield f"{self.name}_sum", label_pairs, counts[-1]
+            yield f"{self.name}_count", label_pairs, cumulative
+
+
+class CallbackMetric:
+    """
+    出力するたびにcallbackを呼んで値を取得するメトリクスです。
+    他のオブジェクトが数えている値 (キャッシュの統計など) を変換の経路に手を入れずに出力します。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        type_name: str,
+        callback: Callable[[], Iterable[tuple[tuple[tuple[str, str], ...], float]]],
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.type_name = type_name
+        self.callback = callback
+
+    def samples(self) -> Samples:
+        for labels, value in self.callback():
+            yield self.name, labels, value
+
+
+class MetricsRegistry:
+    """
+    メトリクスを登録し、Prometheusのテキスト形式で出力します。
+    """
+
+    def __init__(self) -> None:
+        self._metrics: list[Counter | Histogram | CallbackMetric] = []
+
+    def register(self, metric):
+        if any(m.name == metric.name for m in self._metrics):
+            raise ValueError(f"同じ名前のメトリクスが登録されています: {metric.name}")
+        self._metrics.append(metric)
+        return metric
+
+    def counter(
+        self, name: str, help: str, labelnames: tuple[str, ...] = ()
+    ) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        buckets: tuple[float, ...],
+        labelnames: tuple[str, ...] = (),
+    ) -> Histogram:
+        return self.register(Histogram(name, help, buckets, labelnames))
+
+    def render(self) -> str:
+        """
+        登録されたすべてのメトリクスをPrometheusのテキスト形式で返します。
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            for name, labels, value in metric.samples():
+                lines.append(_format_sample(name, labels, value))
+        return "\n".join(lines) + "\n"
+
+    def write_file(self, path: str) -> None:
+        """
+        メトリクスをファイルに書き出します。node_exporterのtextfile collectorなどが
+        書きかけのファイルを読まないよう、一時ファイルに書いてから置き換えます。
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(
+            dir=directory, prefix=".metrics-", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.render())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+class _MetricsPhase:
+    __slots__ = ("tracer", "name", "counts", "start")
+
+    def __init__(self, tracer: "MetricsTracer", name: str) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.counts: dict[str, int] = {}
+
+    def __enter__(self) -> "_MetricsPhase":
+        self.start = self.tracer.clock()
+        return self
+
+    def count(self, **counts: int) -> None:
+        self.counts.update(counts)
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.tracer._observe(self, self.tracer.clock() - self.start, exc_type)
+
+
+class MetricsTracer:
+    """
+    各フェーズの実行時間と件数を、Prometheusのカウンタとヒストグラムに集計するトレーサーです。
+    use_tracer()で有効にしている間だけ記録するため、無効な場合の変換のコストは
+    NullTracerと変わりません。複数のスレッドから同時に使用できます。
+
+    - slack_list_conversions_total: 変換した文書の数 (キャッシュから返したものを含む)
+    - slack_list_input_chars_total: 変換した文書の文字数の合計
+    - slack_list_items_per_document: 1文書あたりの項目数
+    - slack_list_phase_duration_seconds{phase}: 解析・シリアライズ・クリップボードの読み書きなどの時間
+    - slack_list_phase_errors_total{phase}: 例外で終わったフェーズの数
+    - slack_list_clipboard_bytes_total{direction}: クリップボードから読み書きしたバイト数
+    - slack_list_cache_*: watch_cache()で登録したキャッシュの統計
+    """
+
+    enabled = True
+
+    def __init__(
+        self,
+        registry: MetricsRegistry | None = None,
+        clock: Callable[[], float] | None = None,
+    ) -> None:
+        """
+        Args:
+            registry: メトリクスを登録するレジストリ。Noneの場合は新しく作ります
+            clock: 時間の計測に使う関数。Noneの場合はtime.perf_counter
+        """
+        import time
+
+        self.registry = registry or MetricsRegistry()
+        self.clock = clock or time.perf_counter
+        registry = self.registry
+        self.conversions = registry.counter(
+            "slack_list_conversions_total", "Number of converted documents."
+        )
+        self.input_chars = registry.counter(
+            "slack_list_input_chars_total",
+            "Total number of characters of the converted HTML.",
+        )
+        self.items = registry.histogram(
+            "slack_list_items_per_document",
+            "Number of list items and paragraphs per converted document.",
+            ITEM_BUCKETS,
+        )
+        self.phase_seconds = registry.histogram(
+            "slack_list_phase_duration_seconds",
+            "Time spent in each conversion phase.",
+            LATENCY_BUCKETS,
+            ("phase",),
+        )
+        self.phase_errors = registry.counter(
+            "slack_list_phase_errors_total",
+            "Number of phases that raised an exception.",
+            ("phase",),
+        )
+        self.clipboard_bytes = registry.counter(
+            "slack_list_clipboard_bytes_total",
+            "Bytes read from and written to the clipboard.",
+            ("direction",),
+        )
+
+    def phase(self, name: str) -> _MetricsPhase:
+        return _MetricsPhase(self, name)
+
+    def _observe(self, phase: _MetricsPhase, seconds: float, exc_type) -> None:
+        name = phase.name
+        labels = (name,)
+        self.phase_seconds.observe(seconds, labels)
+        if exc_type is not None:
+            self.phase_errors.inc(1, labels)
+            return
+        counts = phase.counts
+        if name == PARSE:
+            self.conversions.inc()
+            if "input_chars" in counts:
+                self.input_chars.inc(counts["input_chars"])
+            if "items" in counts:
+                self.items.observe(counts["items"])
+        elif name == CACHE_LOOKUP and counts.get("hit"):
+            # キャッシュから返した変換は解析しないため、ここで数える
+            self.conversions.inc()
+        elif name == CLIPBOARD_READ and "bytes" in counts:
+            self.clipboard_bytes.inc(counts["bytes"], ("read",))
+        elif name == CLIPBOARD_WRITE and "bytes" in counts:
+            self.clipboard_bytes.inc(counts["bytes"], ("write",))
+
+    def watch_cache(self, cache: "ConversionCache") -> None:
+        """
+        キャッシュのヒット・ミス・追い出しの数を出力するたびに読み取るよう登録します。
+        """
+        stats = cache.stats
+        self.registry.register(
+            CallbackMetric(
+                "slack_list_cache_requests_total",
+                "Conversion cache lookups by result.",
+                "counter",
+                lambda: [
+                    ((("result", "memory_hit"),), stats.memory_hits),
+                    ((("result", "disk_hit"),), stats.disk_hits),
+                    ((("result", "miss"),), stats.misses),
+                ],
+            )
+        )
+        self.registry.register(
+            CallbackMetric(
+                "slack_list_cache_evictions_total",
+                "Entries evicted from the in-memory or on-disk conversion cache.",
+                "counter",
+                lambda: [((), stats.evictions)],
+            )
+        )
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    server: "MetricsHTTPServer"
+
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class MetricsHTTPServer(ThreadingHTTPServer):
+    """
+    GET /metrics でレジストリの内容を返すHTTPサーバーです。
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self, server_address: tuple[str, int], registry: MetricsRegistry
+    ) -> None:
+        super().__init__(server_address, _MetricsRequestHandler)
+        self.registry = registry
+
+
+def start_metrics_server(
+    registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9464
+) -> MetricsHTTPServer:
+    """
+    /metrics を返すHTTPサーバーをデーモンスレッドで起動します。
+    停止する場合はshutdown()とserver_close()を呼んでください。
+    """
+    server = MetricsHTTPServer((host, port), registry)
+    thread = threading.Thread(
+        target=server.serve_forever, name="metrics-server", daemon=True
+    )
+    thread.start()
+    return server
+
+
+class MetricsFileWriter:
+    """
+    一定の間隔でメトリクスをファイルに書き出すデーモンスレッドです。
+    stop()で停止し、最後にもう一度書き出します。
+    書き出しに失敗した場合は標準エラー出力に記録し、次の間隔で書き出し直します。
+    """
+
+    def __init__(
+        self, registry: MetricsRegistry, path: str, interval: float = 15.0
+    ) -> None:
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        # 書き出しに失敗した回数
+        self.errors = 0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="metrics-file-writer", daemon=True
+        )
+
+    def start(self) -> "MetricsFileWriter":
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self._write()
+
+    def _write(self) -> None:
+        try:
+            self.registry.write_file(self.path)
+        except Exception as e:
+            # 出力先のディレクトリが一時的に無い場合なども、スレッドを止めずに次の間隔で書き出す
+            self.errors += 1
+            print(f"Error while writing metrics to {self.path}: {e!r}", file=sys.stderr)
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+        self._write()
@@ -0,0 +1,224 @@
+import os
+from array import array
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Iterator
+
+from src.list_items import ListItems
+from src.stream_list_parser import (
+    EMPTY_ELEMENT_TAGS,
+    FAST_TAG_RE,
+    IGNORED_TAGS,
+    LIST,
+    LIST_TAGS,
+    RAW_TEXT_TAGS,
+    StreamListParser,
+)
+
+# これより小さい文書は分割せずに1プロセスで解析する
+DEFAULT_MIN_CHUNK_CHARS = 1024 * 1024
+# 前の断片から続くリストの番号に加える値。連結するときに実際の番号に置き換える
+_CONTINUED_BASE = 1 << 31
+
+# 分割位置を探すときの要素の文脈
+_OUTSIDE = 0
+_ROOT_LIST = 1
+_OTHER = 2
+
+
+def iter_chunks(html_content: str, chunks: int) -> Iterator[tuple[str, bool]]:
+    """
+    文書をおおよそ同じ長さのchunks個以下の断片に分割し、(断片, 前の断片のリストの続きか) を
+    先頭から順に返します。分割位置が見つかるたびに返すため、呼び出し側は残りの走査と
+    並行して断片の解析を始められます。
+
+    分割するのはトップレベルの <ul>/<ol> の開始タグの前か、トップレベルのリストの
+    直下の <li>・<ul>・<ol> の開始タグの前です。分割位置で開いている要素の開始タグを
+    断片の先頭に補うため、各断片は文書全体と同じ文脈で解析できます。
+
+    Raises:
+        ValueError: タグの範囲をhtml.parserと同じように切り出せない文書の場合。
+            最後の断片を返す前に送出されることがあります
+    """
+    tags = html_content.count("<")
+    matched = 0
+    # 各要素は (タグ名, 文脈)
+    stack: list[tuple[str, int]] = []
+    already_closed: list[str] = []
+    targets = [len(html_content) * i // chunks for i in range(1, chunks)]
+    position = 0
+    prefix = ""
+    continued = False
+    # 直前のタグの終わりの位置。そこから分割位置までが断片の末尾のテキストになる
+    text_start = 0
+
+    for match in FAST_TAG_RE.finditer(html_content):
+        matched += 1
+        text, text_start = html_content[text_start : match.start()], match.end()
+        end_name, name, _, self_closing = match.groups()
+        if end_name is not None:
+            end_name = end_name.lower()
+            if end_name in already_closed:
+                already_closed.remove(end_name)
+                continue
+            for i in range(len(stack) - 1, -1, -1):
+                if stack[i][0] == end_name:
+                    del stack[i:]
+                    break
+            continue
+
+        name = name.lower()
+        if name in RAW_TEXT_TAGS:
+            raise ValueError(f"<{name}> を含む文書は分割できません")
+        context = stack[-1][1] if stack else _OUTSIDE
+        start = match.start()
+        # 断片の末尾の "&" は文書の終わりとして参照を解釈され、文書全体の解析と結果が変わるため、
+        # 直前のテキストに "&" がある位置では分割しない
+        if targets and start >= targets[0] and not self_closing and "&" not in text:
+            next_continued = context == _ROOT_LIST and (
+                name == "li" or name in LIST_TAGS
+            )
+            if next_continued or (context == _OUTSIDE and name in LIST_TAGS):
+                yield prefix + html_content[position:start], continued
+                # 分割位置で開いている要素を断片の先頭で開き直す
+                prefix = "".join(f"<{entry[0]}>" for entry in stack)
+                prefix += "".join(f"<{void}>" for void in already_closed)
+                position, continued = start, next_continued
+                while targets and targets[0] <= start:
+                    targets.pop(0)
+        if self_closing:
+            continue
+        if name in EMPTY_ELEMENT_TAGS:
+            already_closed.append(name)
+            continue
+        if context == _OUTSIDE:
+            if name in LIST_TAGS:
+                context = _ROOT_LIST
+            elif name in IGNORED_TAGS:
+                context = _OTHER
+        else:
+            context = _OTHER
+        stack.append((name, context))
+
+    if matched != tags:
+        raise ValueError("タグとして解釈できない '<' を含む文書は分割できません")
+    yield prefix + html_content[position:], continued
+
+
+class _ChunkParser(StreamListParser):
+    """
+    断片を解析するパーサーです。前の断片から続くリストの番号は_CONTINUED_BASEから数えます。
+    """
+
+    def __init__(self, continued: bool) -> None:
+        super().__init__()
+        self._continued = continued
+
+    def _begin(self) -> None:
+        super()._begin()
+        # 高速な経路を途中で諦めて解析し直すときは、最初のリストから数え直す
+        self._last_root = None
+
+    def _start(self, tag: str, attrs: list) -> None:
+        super()._start(tag, attrs)
+        element = self._stack[-1]
+        if (
+            element.role == LIST
+            and element.frame.level == 0
+            and element.frame.sink is self._output
+        ):
+            if self._continued and self._last_root is None:
+                element.frame.index = _CONTINUED_BASE + 1
+            self._last_root = element.frame
+
+    def parse_chunk(self, chunk: str) -> tuple[ListItems, int]:
+        """
+        断片を解析し、項目と、最後のトップレベルのリストで最後に使用した番号を返します。
+        """
+        items = self.parse_items(chunk)
+        last_index = self._last_root.index - 1 if self._last_root is not None else 0
+        return items, last_index
+
+
+def _parse_chunk(piece: tuple[str, bool]) -> tuple[ListItems, int]:
+    chunk, continued = piece
+    return _ChunkParser(continued).parse_chunk(chunk)
+
+
+def _resolve(index: int, carry: int) -> int:
+    return index - _CONTINUED_BASE + carry if index >= _CONTINUED_BASE else index
+
+
+class ParallelListParser:
+    """
+    巨大な文書をリストの境界で分割し、プロセスプールで並列に解析します。
+    結果はStreamListParser.parse_itemsで文書全体を解析した場合と同じです。
+
+    リストの途中で分割した場合、続きの断片の番号は前の断片までの項目数から振り直します。
+    プロセス間でHTMLと結果を受け渡すコストがあるため、min_chunk_charsより
+    短い文書や、分割できない文書は1プロセスで解析します。
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        executor: Executor | None = None,
+        min_chunk_chars: int = DEFAULT_MIN_CHUNK_CHARS,
+    ) -> None:
+        """
+        Args:
+            workers: 分割数とワーカープロセス数 (デフォルトはCPU数)
+            executor: 断片の解析に使用するexecutor。Noneの場合は最初に必要になった時点で
+                ProcessPoolExecutorを作成し、close()で終了します
+            min_chunk_chars: 1つの断片の最小の文字数
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.min_chunk_chars = min_chunk_chars
+        self._executor = executor
+        self._owns_executor = executor is None
+
+    def parse_items(self, html_content: str) -> ListItems:
+        """
+        HTMLコンテンツを解析し、出力順の (text, list_type, level, index) の項目を返します。
+        """
+        chunks = min(self.workers, len(html_content) // max(self.min_chunk_chars, 1))
+        if chunks < 2:
+            return StreamListParser().parse_items(html_content)
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        # 分割位置の走査と並行して、見つかった断片から解析を始める
+        futures: list[tuple[bool, Future]] = []
+        try:
+            for piece in iter_chunks(html_content, chunks):
+                futures.append((piece[1], self._executor.submit(_parse_chunk, piece)))
+        except ValueError:
+            for _, future in futures:
+                future.cancel()
+            return StreamListParser().parse_items(html_content)
+
+        items = ListItems()
+        carry = 0
+        for continued, future in futures:
+            chunk_items, last_index = future.result()
+            if continued:
+                chunk_items.ordinals = array(
+                    "I", [_resolve(index, carry) for index in chunk_items.ordinals]
+                )
+            carry = _resolve(last_index, carry)
+            # 何も変換できなかった断片は空のテキストの項目だけを返すため読み飛ばす
+            if chunk_items.text or len(chunk_items) > 1:
+                items.extend(chunk_items)
+        if not items:
+            items.append("", None, 0, 0)
+        return items
+
+    def close(self) -> None:
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> "ParallelListParser":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,89 @@
+import json
+import struct
+from typing import Iterator
+
+_UINT32 = struct.Struct("<I")
+
+
+class PickleReader:
+    """
+    Reads the 'org.chromium.web-custom-data' format written by
+    SlackListGenerator._create_chromium_data:
+    - Payload size: uint32 (bytes after this field)
+    - Entry count: uint32
+    - Entries: String16 key / String16 value pairs
+
+    The buffer is wrapped in a memoryview, so entries are located by
+    their length fields only and nothing is copied or decoded until asked.
+    """
+
+    def __init__(self, data: bytes | bytearray | memoryview) -> None:
+        self.view = memoryview(data).cast("B")
+        if len(self.view) < 8:
+            raise ValueError("Data is too short for a web custom data pickle")
+        self.payload_size = self._read_uint32(0)
+        if self.payload_size != len(self.view) - 4:
+            raise ValueError(
+                f"Payload size mismatch: header says {self.payload_size}, "
+                f"actual {len(self.view) - 4}"
+            )
+        self.entry_count = self._read_uint32(4)
+
+    def _read_uint32(self, offset: int) -> int:
+        if offset + 4 > len(self.view):
+            raise ValueError(f"Unexpected end of data at offset {offset}")
+        return _UINT32.unpack_from(self.view, offset)[0]
+
+    def _read_string16(self, offset: int) -> tuple[memoryview, int]:
+        """
+        Returns the UTF-16 LE bytes of the String16 at offset and the offset
+        of the next field (after the 4-byte alignment padding).
+        """
+        byte_len = self._read_uint32(offset) * 2
+        start = offset + 4
+        end = start + byte_len
+        if end > len(self.view):
+            raise ValueError(f"String16 at offset {offset} exceeds the data")
+        return self.view[start:end], end + (4 - byte_len % 4) % 4
+
+    def raw_entries(self) -> Iterator[tuple[memoryview, memoryview]]:
+        """
+        Yields (key, value) as undecoded UTF-16 LE memoryviews.
+        """
+        offset = 8
+        for _ in range(self.entry_count):
+            key, offset = self._read_string16(offset)
+            value, offset = self._read_string16(offset)
+            yield key, value
+
+    def entries(self) -> Iterator[tuple[str, memoryview]]:
+        """
+        Yields (key, value) with the key decoded and the value left as a
+        UTF-16 LE memoryview.
+        """
+        for key, value in self.raw_entries():
+            yield str(key, "utf-16-le"), value
+
+    def keys(self) -> list[str]:
+        return [key for key, _ in self.entries()]
+
+    def get_raw(self, key: str) -> memoryview | None:
+        """
+        Returns the undecoded value for key, comparing keys without decoding.
+        """
+        encoded_key = key.encode("utf-16-le")
+        for raw_key, value in self.raw_entries():
+            if raw_key == encoded_key:
+                return value
+        return None
+
+    def get(self, key: str) -> str | None:
+        value = self.get_raw(key)
+        return str(value, "utf-16-le") if value is not None else None
+
+    def plain_text(self) -> str | None:
+        return self.get("public.utf8-plain-text")
+
+    def texty_json(self) -> dict | None:
+        value = self.get("slack/texty")
+        return json.loads(value) if value is not None else None
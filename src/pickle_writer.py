@@ -1,29 +1,120 @@
 import struct
+from typing import BinaryIO, Iterable, Iterator
+
+_UINT32 = struct.Struct("<I")
+_PLACEHOLDER = b"\x00\x00\x00\x00"
+
+# sinkに書き込むとき、一度にUTF-16 LEへエンコードする文字数
+DEFAULT_CHUNK_CHARS = 64 * 1024
+
+
+def join_chunks(s: str | Iterable[str], chunk_chars: int) -> Iterator[str]:
+    """
+    文字列または断片のイテラブルを、おおよそchunk_chars文字ずつの文字列にまとめて返します。
+    UTF-16 LEやUTF-8のエンコードは文字ごとに独立しているため、どこで区切っても結果は同じです。
+    """
+    if isinstance(s, str):
+        for start in range(0, len(s), chunk_chars):
+            yield s[start : start + chunk_chars]
+        return
+    pending: list[str] = []
+    pending_chars = 0
+    for piece in s:
+        if len(piece) >= chunk_chars:
+            if pending:
+                yield "".join(pending)
+                pending, pending_chars = [], 0
+            yield from join_chunks(piece, chunk_chars)
+            continue
+        pending.append(piece)
+        pending_chars += len(piece)
+        if pending_chars >= chunk_chars:
+            yield "".join(pending)
+            pending, pending_chars = [], 0
+    if pending:
+        yield "".join(pending)
 
 
 class PickleWriter:
-    def __init__(self) -> None:
+    """
+    Chromiumのbase::Pickle形式でデータを書き込みます。
+
+    sinkを省略した場合はメモリ上に蓄積し、get_payload()でペイロードを返します。
+    sinkにシーク可能なバイナリストリーム (ファイル・BytesIO・mmap) を渡した場合は、
+    先頭にペイロード全体のサイズの領域を確保してから各値を順に書き込み、
+    finish()でシークしてサイズを書き戻します。文字列はchunk_chars文字ずつ
+    エンコードして書き込むため、巨大な文字列でも全体のバイト列を作りません。
+    """
+
+    def __init__(
+        self, sink: BinaryIO | None = None, chunk_chars: int = DEFAULT_CHUNK_CHARS
+    ) -> None:
         self.data = bytearray()
+        self.sink = sink
+        self.chunk_chars = chunk_chars
+        if sink is not None:
+            self._header_position = sink.tell()
+            sink.write(_PLACEHOLDER)
+
+    def _write(self, data: bytes) -> None:
+        if self.sink is None:
+            self.data.extend(data)
+        else:
+            self.sink.write(data)
 
     def write_uint32(self, value) -> None:
-        self.data.extend(struct.pack("<I", value))
+        self._write(_UINT32.pack(value))
 
-    def write_string16(self, s) -> None:
+    def write_string16(self, s: str | Iterable[str]) -> None:
         """
         Writes a String16:
         - Length: uint32 (Number of CHARACTERS)
         - Data: UTF-16 LE bytes
         - Padding: Align to 4 bytes
+
+        sinkに書き込む場合は、文字列の断片のイテラブルも受け付けます。
         """
-        encoded = s.encode("utf-16-le")
-        char_count = len(encoded) // 2
-        self.write_uint32(char_count)
-        self.data.extend(encoded)
+        if self.sink is None:
+            if not isinstance(s, str):
+                s = "".join(s)
+            encoded = s.encode("utf-16-le")
+            self.write_uint32(len(encoded) // 2)
+            self.data.extend(encoded)
+            self._write_padding(len(encoded))
+            return
+
+        # 文字数はエンコードするまで分からないため、後から書き戻す
+        sink = self.sink
+        length_position = sink.tell()
+        sink.write(_PLACEHOLDER)
+        size = 0
+        for chunk in join_chunks(s, self.chunk_chars):
+            encoded = chunk.encode("utf-16-le")
+            sink.write(encoded)
+            size += len(encoded)
+        self._write_padding(size)
+        end = sink.tell()
+        sink.seek(length_position)
+        sink.write(_UINT32.pack(size // 2))
+        sink.seek(end)
 
-        # Padding
-        padding = (4 - (len(encoded) % 4)) % 4
+    def _write_padding(self, size: int) -> None:
+        padding = (4 - (size % 4)) % 4
         if padding > 0:
-            self.data.extend(b"\x00" * padding)
+            self._write(b"\x00" * padding)
+
+    def finish(self) -> int:
+        """
+        sinkの先頭に確保した領域にペイロードのサイズを書き戻し、
+        サイズの領域を含めて書き込んだバイト数を返します。
+        """
+        if self.sink is None:
+            raise ValueError("finish()はsinkに書き込む場合のみ使用できます")
+        end = self.sink.tell()
+        self.sink.seek(self._header_position)
+        self.sink.write(_UINT32.pack(end - self._header_position - 4))
+        self.sink.seek(end)
+        return end - self._header_position
 
     def get_payload(self) -> bytes:
         return bytes(self.data)
@@ -1,128 +1,280 @@
-import json
-import struct
-from bs4 import BeautifulSoup, NavigableString, Tag  # type: ignore
+from typing import TYPE_CHECKING
+
+from src.dialects import (
+    AUTO,
+    DIALECTS,
+    WORD,
+    parse_dialect_items,
+    resolve_dialect,
+)
 from src.generate_result import GenerateResult
-from src.pickle_writer import PickleWriter
+from src.list_items import ListItems
+from src.tracer import CACHE_LOOKUP, OPS_BUILD, PARSE, get_tracer
+from src.stream_list_parser import (
+    BLOCK_TAGS,
+    IGNORED_TAGS,
+    LIST_TAGS,
+    list_type_for_tag,
+    parse_aria_level,
+    render_plain_text,
+    render_texty_json,
+)
+
+
+if TYPE_CHECKING:
+    from src.conversion_cache import ConversionCache
+    from src.google_docs_parser import ItemMemo
+    from src.parallel_parser import ParallelListParser
+
+ENGINES = ("stream", "bs4")
 
 
 class SlackListGenerator:
+    def __init__(
+        self,
+        engine: str = "stream",
+        cache: "ConversionCache | None" = None,
+        incremental: bool = False,
+        parallel: bool = False,
+        dialect: str = AUTO,
+    ) -> None:
+        """
+        Args:
+            engine: HTMLの解析エンジン。"stream" (イベント駆動) または "bs4" (BeautifulSoupのツリー)
+            cache: 変換結果のキャッシュ。Noneの場合はキャッシュしません
+            incremental: Trueの場合は前回変換した文書と同じ <li> の切り出しの結果を再利用します
+                ("stream" のみ)
+            parallel: Trueの場合は巨大な文書を分割してプロセスプールで並列に解析します ("stream" のみ)。
+                プロセスプールはclose()かwithブロックの終わりで終了します
+            dialect: HTMLを生成したエディタ。"auto" の場合は先頭から判定し、
+                mso-listの段落を含むWordはエンジンに関わらず専用のパーサーで、Google Docsは
+                "stream" エンジンのGoogle Docs向けの高速な経路で解析します
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"未対応のエンジンです: {engine}")
+        if incremental and engine != "stream":
+            raise ValueError(f"incrementalは {engine} エンジンでは使用できません")
+        if parallel and engine != "stream":
+            raise ValueError(f"parallelは {engine} エンジンでは使用できません")
+        if incremental and parallel:
+            raise ValueError("incrementalとparallelは同時に使用できません")
+        if dialect != AUTO and dialect not in DIALECTS:
+            raise ValueError(f"未対応のdialectです: {dialect}")
+        self.engine = engine
+        self.cache = cache
+        self.dialect = dialect
+        self.item_memo: "ItemMemo | None" = None
+        if incremental:
+            from src.google_docs_parser import ItemMemo
+
+            self.item_memo = ItemMemo()
+        self.parallel: "ParallelListParser | None" = None
+        if parallel:
+            from src.parallel_parser import ParallelListParser
+
+            self.parallel = ParallelListParser()
+
+    def close(self) -> None:
+        """
+        parallel=Trueの場合に作成したプロセスプールを終了します。
+        """
+        if self.parallel is not None:
+            self.parallel.close()
+
+    def __enter__(self) -> "SlackListGenerator":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
     def generate(self, html_content: str) -> GenerateResult:
         """
         HTMLコンテンツを解析し、'org.chromium.web-custom-data'のバイナリデータと
         プレーンテキスト表現を返します。
 
         Returns:
-            GenerateResult: binary_dataとplain_textを含むオブジェクト
+            GenerateResult: binary_data・plain_text・texty_jsonを最初のアクセス時に生成するオブジェクト
         """
-        plain_text, texty_json = self._parse_html(html_content)
-        binary_data = self._create_chromium_data(plain_text, texty_json)
-        return GenerateResult(
-            binary_data=binary_data, plain_text=plain_text, texty_json=texty_json
-        )
+        key, result = self.cache_lookup(html_content)
+        if result is None:
+            result = self.generate_uncached(html_content)
+            if key is not None:
+                self.cache.put(key, result)  # type: ignore
+        return result
+
+    def cache_lookup(
+        self, html_content: str
+    ) -> "tuple[str | None, GenerateResult | None]":
+        """
+        キャッシュからHTMLコンテンツの変換結果を探し、(キャッシュのキー, 結果) を返します。
+        見つからない場合の結果はNone、キャッシュを使わない場合は (None, None) です。
+        """
+        if self.cache is None:
+            return None, None
+        from src.conversion_cache import cache_key
+
+        with get_tracer().phase(CACHE_LOOKUP) as record:
+            options = {"engine": self.engine}
+            if self.dialect != AUTO:
+                options["dialect"] = self.dialect
+            key = cache_key(html_content, **options)
+            result = self.cache.get(key)
+            record.count(hit=int(result is not None))
+        return key, result
+
+    def generate_uncached(self, html_content: str) -> GenerateResult:
+        """
+        キャッシュを使わずにHTMLコンテンツを解析し、generateと同じ結果を返します。
+        """
+        # 各表現は結果にアクセスされた時点で項目から生成する
+        return GenerateResult(items=self._parse_items(html_content))
+
+    def __getstate__(self) -> dict:
+        # キャッシュはロックを持ち、プロセス間で共有もできないため、executorのプロセスには渡さない
+        # <li> の結果も親プロセスの次の解析には引き継がれないため、送らずに通常の解析をさせる
+        state = self.__dict__.copy()
+        state["cache"] = None
+        state["item_memo"] = None
+        return state
+
+    def _parse_items(self, html_content: str) -> ListItems:
+        with get_tracer().phase(PARSE) as record:
+            dialect = resolve_dialect(html_content, self.dialect)
+            if dialect == WORD:
+                # リストを <ul>/<ol> で表現しないため、汎用の解析では階層が失われる
+                items = parse_dialect_items(html_content, dialect)
+            elif self.parallel is not None:
+                items = self.parallel.parse_items(html_content)
+            elif self.engine == "stream":
+                items = parse_dialect_items(html_content, dialect, self.item_memo)
+            else:
+                items = self._parse_items_bs4(html_content)
+            record.count(input_chars=len(html_content), items=len(items))
+        return items
+
+    def generate_plain_text(self, html_content: str) -> str:
+        """
+        HTMLコンテンツを解析し、プレーンテキスト表現のみを返します。
+        Chromium形式のバイナリデータは生成しません。
+        """
+        items = self._parse_items(html_content)
+        with get_tracer().phase(OPS_BUILD):
+            return render_plain_text(items)
 
     def _parse_html(self, html_content) -> tuple[str, dict]:
+        items = self._parse_items(html_content)
+        return render_plain_text(items), render_texty_json(items)
+
+    def _parse_items_bs4(self, html_content) -> ListItems:
+        # bs4 は import に時間がかかるため、このエンジンを使う場合のみ読み込む
+        from bs4 import BeautifulSoup, CData, NavigableString, Tag  # type: ignore
+
         soup = BeautifulSoup(html_content, "html.parser")
 
-        ops = []
-        plain_text_lines = []
-
-        def process_list(list_element, level=0) -> None:
-            list_type = "bullet" if list_element.name == "ul" else "ordered"
-            index = 1
-
-            for child in list_element.children:
-                if not isinstance(child, Tag):
-                    continue
-
-                if child.name == "li":
-                    # Determine level from aria-level if present
-                    current_level = level
-                    aria_level = child.get("aria-level")
-                    if aria_level and aria_level.isdigit():  # type: ignore
-                        # aria-level is 1-based
-                        current_level = int(aria_level) - 1  # type: ignore
-
-                    # Extract text from this li, excluding nested lists for now
-                    item_text = ""
-                    nested_lists = []
-
-                    for content in child.contents:
-                        if isinstance(content, NavigableString):
-                            item_text += str(content)
-                        elif isinstance(content, Tag):
-                            if content.name in ["ul", "ol"]:
-                                nested_lists.append(content)
-                            else:
-                                item_text += content.get_text()
-
-                    item_text = item_text.strip()
-                    if item_text:
-                        # Add operation for this item
-                        ops.append({"insert": item_text})
-
-                        attributes = {"list": list_type}
-                        if current_level > 0:
-                            attributes["indent"] = current_level  # type: ignore
-
-                        ops.append({"attributes": attributes, "insert": "\n"})
-
-                        # Add to plain text
-                        indent_str = "    " * current_level
-                        prefix = "- " if list_type == "bullet" else f"{index}. "
-                        plain_text_lines.append(f"{indent_str}{prefix}{item_text}")
-
-                        if list_type == "ordered":
-                            index += 1
-
-                    # Process nested lists
-                    for nested in nested_lists:
-                        process_list(nested, current_level + 1)
-
-                elif child.name in ["ul", "ol"]:
-                    # Handle nested lists as siblings (Google Docs structure)
-                    process_list(child, level + 1)
-
-        # Find the first list to start processing
-        first_list = soup.find(["ul", "ol"])
-        if first_list:
-            process_list(first_list)
-        else:
-            # Fallback if no list found, just treat as text
-            text = soup.get_text().strip()
-            ops.append({"insert": text})
-            ops.append({"insert": "\n"})
-            plain_text_lines.append(text)
-
-        texty_json = {"ops": ops}
-        plain_text = "\n".join(plain_text_lines)
-
-        return plain_text, texty_json
+        items = ListItems()
 
-    def _create_chromium_data(self, plain_text, texty_json) -> bytes:
-        writer = PickleWriter()
+        def process_list(root_list) -> None:
+            # 深いネストでも再帰しないよう、明示的なスタックで走査する
+            # 各フレームは [子要素のイテレータ, list_type, level, index]
+            stack = [
+                [iter(root_list.children), list_type_for_tag(root_list.name), 0, 1]
+            ]
+            while stack:
+                frame = stack[-1]
+                children, list_type, level, _ = frame
+                for child in children:
+                    if not isinstance(child, Tag):
+                        continue
+
+                    if child.name == "li":
+                        # Determine level from aria-level if present
+                        current_level = level
+                        aria_level = parse_aria_level(child.get("aria-level"))  # type: ignore
+                        if aria_level is not None:
+                            current_level = aria_level
+
+                        # Extract text from this li, excluding nested lists for now
+                        text_parts = []
+                        nested_lists = []
 
-        # Entry Count (uint32)
-        writer.write_uint32(2)
+                        for content in child.contents:
+                            if isinstance(content, NavigableString):
+                                text_parts.append(str(content))
+                            elif isinstance(content, Tag):
+                                if content.name in LIST_TAGS:
+                                    nested_lists.append(content)
+                                else:
+                                    text_parts.append(content.get_text())
 
-        # --- Entry 1: public.utf8-plain-text ---
-        # Key
-        writer.write_string16("public.utf8-plain-text")
+                        item_text = "".join(text_parts).strip()
+                        if item_text:
+                            items.append(item_text, list_type, current_level, frame[3])
+                            if list_type == "ordered":
+                                frame[3] += 1
 
-        # Value: String16 (Length = Char Count)
-        writer.write_string16(plain_text)
+                        if nested_lists:
+                            # Process nested lists in order before the next sibling
+                            for nested in reversed(nested_lists):
+                                stack.append(
+                                    [
+                                        iter(nested.children),
+                                        list_type_for_tag(nested.name),
+                                        current_level + 1,
+                                        1,
+                                    ]
+                                )
+                            break
 
-        # --- Entry 2: slack/texty ---
-        # Key
-        writer.write_string16("slack/texty")
+                    elif child.name in LIST_TAGS:
+                        # Handle nested lists as siblings (Google Docs structure)
+                        stack.append(
+                            [
+                                iter(child.children),
+                                list_type_for_tag(child.name),
+                                level + 1,
+                                1,
+                            ]
+                        )
+                        break
+                else:
+                    stack.pop()
 
-        # Value: String16 (Length = Char Count)
-        # Content is JSON string
-        # Use compact separators
-        json_str = json.dumps(texty_json, separators=(",", ":"))
-        writer.write_string16(json_str)
+        paragraph: list[str] = []
 
-        payload = writer.get_payload()
+        def end_paragraph() -> None:
+            text = "".join(paragraph).strip()
+            paragraph.clear()
+            if text:
+                items.append(text, None, 0, 0)
+
+        # 文書を一度だけ走査し、トップレベルのリストとその間の段落を順に変換する
+        # None はブロック要素の終わりを表す
+        stack: list = list(reversed(soup.contents))
+        while stack:
+            node = stack.pop()
+            if node is None:
+                end_paragraph()
+            elif isinstance(node, Tag):
+                if node.name in LIST_TAGS:
+                    end_paragraph()
+                    process_list(node)
+                elif node.name not in IGNORED_TAGS:
+                    if node.name in BLOCK_TAGS:
+                        end_paragraph()
+                        stack.append(None)
+                    stack.extend(reversed(node.contents))
+            elif type(node) in (NavigableString, CData):
+                paragraph.append(str(node))
+        end_paragraph()
+
+        if not items:
+            # 何も変換できなかった場合は空のテキストとして扱う
+            items.append("", None, 0, 0)
+        return items
+
+    def _create_chromium_data(self, plain_text, texty_json) -> bytes:
+        # Entry Count (2) の後に 'public.utf8-plain-text' と 'slack/texty' を
+        # String16のキーと値の組で格納し、先頭にペイロード全体のサイズを置く
+        from src.texty_encoder import encode_chromium_data
 
-        # Prepend the total size (uint32)
-        final_data = struct.pack("<I", len(payload)) + payload
-        return final_data
+        return encode_chromium_data(plain_text, texty_json)
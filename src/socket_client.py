@@ -0,0 +1,115 @@
+# このモジュールはmain.pyの起動直後に読み込まれるため、標準ライブラリの軽いモジュールだけを使う。
+# socketモジュールはenumとselectorsの読み込みに時間がかかるため、_socketを直接使う
+import _socket
+import os
+import struct
+
+# リクエスト: コマンド, フラグ, ペイロードの長さ
+REQUEST_HEADER = struct.Struct("!BBI")
+# レスポンス: ステータス, プレーンテキストの長さ, Chromium形式のデータの長さ
+RESPONSE_HEADER = struct.Struct("!BII")
+
+# ペイロードのHTMLを変換する
+COMMAND_CONVERT_HTML = 1
+# サーバーのクリップボードのHTMLを変換して書き戻す
+COMMAND_CONVERT_CLIPBOARD = 2
+# プレーンテキストのみを生成する
+FLAG_TEXT = 1
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+SOCKET_ENV = "DOCS_TO_SLACK_SOCKET"
+
+# ショートカットからの実行を止めないよう、接続できないサーバーは短い時間で諦めてこのプロセスで変換する
+CONNECT_TIMEOUT = 0.5
+# リクエストを送った後はサーバーがクリップボードに書き込むため、このプロセスでは変換し直さずに応答を待つ
+TIMEOUT = 60.0
+
+
+def default_socket_path() -> str:
+    """
+    変換サーバーのソケットのパスを返します。環境変数 DOCS_TO_SLACK_SOCKET で変更できます。
+    """
+    return os.environ.get(SOCKET_ENV) or os.path.join(
+        os.path.expanduser("~"), ".cache", "docs_to_slack", "server.sock"
+    )
+
+
+def _read_exactly(sock: _socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1024 * 1024))
+        if not chunk:
+            raise ConnectionError("変換サーバーとの接続が切断されました")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def request(
+    command: int,
+    payload: bytes = b"",
+    text: bool = False,
+    path: str | None = None,
+    timeout: float = TIMEOUT,
+    connect_timeout: float = CONNECT_TIMEOUT,
+) -> tuple[str, bytes] | None:
+    """
+    変換サーバーにリクエストを送り、(プレーンテキスト, Chromium形式のデータ) を返します。
+    サーバーが起動していないなど、接続に失敗した場合はNoneを返します。
+
+    Raises:
+        RuntimeError: サーバーで変換に失敗した場合や、リクエストを送った後に応答を受け取れなかった場合
+    """
+    sock = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+    try:
+        try:
+            sock.settimeout(connect_timeout)
+            sock.connect(path or default_socket_path())
+        except OSError:
+            # ソケットが無い・停止したサーバーのソケットが残っている・権限がない・
+            # サーバーが応答しないなど。いずれも呼び出し側がこのプロセスで変換する
+            return None
+        try:
+            sock.settimeout(timeout)
+            flags = FLAG_TEXT if text else 0
+            sock.sendall(REQUEST_HEADER.pack(command, flags, len(payload)) + payload)
+            status, text_length, data_length = RESPONSE_HEADER.unpack(
+                _read_exactly(sock, RESPONSE_HEADER.size)
+            )
+            plain_text = _read_exactly(sock, text_length).decode("utf-8")
+            data = _read_exactly(sock, data_length)
+        except (OSError, UnicodeDecodeError) as e:
+            # サーバーが変換を終えてクリップボードに書き込む可能性があるため、
+            # このプロセスで変換して書き込み直すことはしない
+            raise RuntimeError(
+                f"変換サーバーから応答を受け取れませんでした: {e}"
+            ) from e
+    finally:
+        sock.close()
+    if status != STATUS_OK:
+        raise RuntimeError(plain_text)
+    return plain_text, data
+
+
+def convert_clipboard(text: bool = False, path: str | None = None) -> str | None:
+    """
+    変換サーバーにクリップボードの変換を依頼し、変換後のプレーンテキストを返します。
+    サーバーに接続できなかった場合はNoneを返します。
+    """
+    response = request(COMMAND_CONVERT_CLIPBOARD, text=text, path=path)
+    return response[0] if response is not None else None
+
+
+def convert_html(
+    html_content: str, text: bool = False, path: str | None = None
+) -> tuple[str, bytes] | None:
+    """
+    変換サーバーでHTMLを変換し、(プレーンテキスト, Chromium形式のデータ) を返します。
+    textがTrueの場合、Chromium形式のデータは空になります。
+    サーバーに接続できなかった場合はNoneを返します。
+    """
+    return request(
+        COMMAND_CONVERT_HTML, html_content.encode("utf-8"), text=text, path=path
+    )
@@ -0,0 +1,189 @@
+import os
+import socket
+import socketserver
+import stat
+import sys
+import threading
+
+from src.clipboard_backend import ClipboardBackend
+from src.slack_list_generator import SlackListGenerator
+from src.socket_client import (
+    COMMAND_CONVERT_CLIPBOARD,
+    COMMAND_CONVERT_HTML,
+    FLAG_TEXT,
+    REQUEST_HEADER,
+    RESPONSE_HEADER,
+    STATUS_ERROR,
+    STATUS_OK,
+)
+
+# 起動時に変換して、遅延importされるパーサーとエンコーダーを読み込んでおくHTML
+_WARM_UP_HTML = (
+    '<meta charset="utf-8"><b id="docs-internal-guid-warm-up">'
+    '<ul><li aria-level="1"><p><span>a</span></p></li>'
+    '<ol><li aria-level="2"><p><span>b</span></p></li></ol></ul></b>'
+)
+
+
+class ConversionSocketRequestHandler(socketserver.StreamRequestHandler):
+    """
+    1つの接続で1つのリクエストを処理します。
+    """
+
+    server: "ConversionSocketServer"
+
+    def handle(self) -> None:
+        header = self.rfile.read(REQUEST_HEADER.size)
+        if len(header) < REQUEST_HEADER.size:
+            return
+        command, flags, length = REQUEST_HEADER.unpack(header)
+        if length > self.server.max_body_bytes:
+            self._send_error(f"Request body exceeds {self.server.max_body_bytes} bytes")
+            return
+        payload = self.rfile.read(length)
+        if len(payload) < length:
+            return
+        text = bool(flags & FLAG_TEXT)
+        try:
+            if command == COMMAND_CONVERT_HTML:
+                plain_text, data = self.server.convert(payload.decode("utf-8"), text)
+            elif command == COMMAND_CONVERT_CLIPBOARD:
+                plain_text, data = self.server.convert_clipboard(text)
+            else:
+                self._send_error(f"Unknown command: {command}")
+                return
+        except Exception as e:
+            self.server.log(f"Conversion failed: {e!r}")
+            self._send_error(f"Conversion failed: {e}")
+            return
+        if self.server.verbose:
+            self.server.log(
+                f"Converted {length} bytes of HTML into {len(plain_text)} chars"
+            )
+        self._send(STATUS_OK, plain_text.encode("utf-8"), data)
+
+    def _send(self, status: int, text: bytes, data: bytes = b"") -> None:
+        self.wfile.write(RESPONSE_HEADER.pack(status, len(text), len(data)))
+        self.wfile.write(text)
+        self.wfile.write(data)
+
+    def _send_error(self, message: str) -> None:
+        self._send(STATUS_ERROR, message.encode("utf-8"))
+
+
+class ConversionSocketServer(socketserver.ThreadingUnixStreamServer):
+    """
+    Unixドメインソケットで変換を受け付けるサーバーです。
+    SlackListGeneratorとパーサーを読み込んだまま常駐するため、main.pyはimportを省略して
+    ソケットの読み書きだけで変換できます。
+    クリップボードの変換ではサーバー側でクリップボードを読み書きするため、
+    クライアントはAppKitも読み込みません。
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        path: str,
+        generator: SlackListGenerator | None = None,
+        backend: ClipboardBackend | None = None,
+        max_body_bytes: int = 8 * 1024 * 1024,
+        verbose: bool = False,
+    ) -> None:
+        """
+        Args:
+            path: 待ち受けるソケットのパス
+            generator: 変換に使用するジェネレータ。リクエスト間で共有されます
+            backend: クリップボードの変換で読み書きするクリップボード。
+                Noneの場合はクリップボードの変換を受け付けません
+            max_body_bytes: リクエストのHTMLのサイズの上限
+            verbose: Trueの場合はリクエストごとにログを出力します
+        """
+        self.generator = generator or SlackListGenerator()
+        self.backend = backend
+        self.max_body_bytes = max_body_bytes
+        self.verbose = verbose
+        # クリップボードの読み書きが他のリクエストと交互にならないようにする
+        self._clipboard_lock = threading.Lock()
+        # server_bindに失敗した場合も呼ばれるserver_closeで、他のファイルを削除しないようにする
+        self._bound = False
+        super().__init__(path, ConversionSocketRequestHandler)
+
+    def server_bind(self) -> None:
+        path = self.server_address
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        if os.path.exists(path):
+            if not stat.S_ISSOCK(os.stat(path).st_mode):
+                raise OSError(f"ソケット以外のファイルが存在します: {path}")
+            if _is_listening(path):
+                raise OSError(f"変換サーバーは既に起動しています: {path}")
+            # 停止したサーバーのソケットが残っている
+            os.unlink(path)
+        # 他のユーザーがクリップボードを書き換えられないよう、所有者だけが接続できるようにする
+        previous = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(previous)
+        self._bound = True
+
+    def server_close(self) -> None:
+        super().server_close()
+        if self._bound:
+            self._bound = False
+            try:
+                os.unlink(self.server_address)
+            except FileNotFoundError:
+                pass
+
+    def warm_up(self) -> None:
+        """
+        小さなHTMLを変換して、最初のリクエストまでに遅延importされるモジュールを読み込みます。
+        """
+        self.generator.generate(_WARM_UP_HTML).materialize()
+        self.generator.generate_plain_text(_WARM_UP_HTML)
+
+    def convert(self, html_content: str, text: bool) -> tuple[str, bytes]:
+        if text:
+            return self.generator.generate_plain_text(html_content), b""
+        result = self.generator.generate(html_content)
+        return result.plain_text, result.binary_data
+
+    def convert_clipboard(self, text: bool) -> tuple[str, bytes]:
+        """
+        クリップボードのHTMLを変換して書き戻します。
+        HTMLが無い場合は、main.pyと同様にプレーンテキストを変換します。
+        """
+        if self.backend is None:
+            raise RuntimeError("このサーバーはクリップボードを使用しません")
+        with self._clipboard_lock:
+            html_content = self.backend.read_html()
+            if html_content is None:
+                html_content = self.backend.read_text() or ""
+            plain_text, data = self.convert(html_content, text)
+            if text:
+                self.backend.write_text(plain_text)
+            else:
+                self.backend.write_rich_text(data, plain_text)
+        return plain_text, data
+
+    def log(self, message: str) -> None:
+        print(message, file=sys.stderr)
+
+    def handle_error(self, request, client_address) -> None:  # type: ignore
+        if self.verbose:
+            super().handle_error(request, client_address)
+        else:
+            self.log(f"Error while handling a request: {sys.exc_info()[1]!r}")
+
+
+def _is_listening(path: str) -> bool:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
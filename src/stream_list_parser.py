@@ -0,0 +1,586 @@
+import re
+from html import unescape
+from html.entities import html5
+from html.parser import HTMLParser
+from typing import Iterator
+
+from src.list_items import ListItems
+from src.texty_ops import coalesce_items
+
+# BeautifulSoup(html.parser) と同じ扱いをするためのタグ定義
+EMPTY_ELEMENT_TAGS = frozenset(
+    [
+        "area",
+        "base",
+        "basefont",
+        "bgsound",
+        "br",
+        "col",
+        "command",
+        "embed",
+        "frame",
+        "hr",
+        "image",
+        "img",
+        "input",
+        "isindex",
+        "keygen",
+        "link",
+        "menuitem",
+        "meta",
+        "nextid",
+        "param",
+        "source",
+        "spacer",
+        "track",
+        "wbr",
+    ]
+)
+PRESERVE_WHITESPACE_TAGS = frozenset(["pre", "textarea"])
+STRING_CONTAINER_TAGS = frozenset(["rt", "rp", "style", "script", "template"])
+LIST_TAGS = frozenset(["ul", "ol"])
+# リストの外側で段落の区切りとなるタグ
+BLOCK_TAGS = frozenset(
+    [
+        "address",
+        "article",
+        "aside",
+        "blockquote",
+        "body",
+        "br",
+        "caption",
+        "dd",
+        "div",
+        "dl",
+        "dt",
+        "figcaption",
+        "figure",
+        "footer",
+        "form",
+        "h1",
+        "h2",
+        "h3",
+        "h4",
+        "h5",
+        "h6",
+        "header",
+        "hr",
+        "html",
+        "li",
+        "main",
+        "nav",
+        "p",
+        "pre",
+        "section",
+        "table",
+        "tbody",
+        "td",
+        "tfoot",
+        "th",
+        "thead",
+        "tr",
+    ]
+)
+# リストの外側で内容を出力しないタグ
+IGNORED_TAGS = frozenset(["head", "title", "script", "style", "template"])
+
+# html.parserのタグ名の規則
+_TAG_NAME = r"[a-zA-Z][^\t\n\r\f />\x00]*"
+# 属性の書き方が整っているタグだけに一致する。html.parserとタグの範囲が必ず一致する。
+# 各エディタ向けのパーサーと並列解析の分割でも、html.parserを通さない字句解析に使う
+FAST_TAG_RE = re.compile(
+    rf"<(?:/({_TAG_NAME})\s*"
+    rf"|({_TAG_NAME})((?:\s+[^\s\"'>/=]+"
+    r"""(?:\s*=\s*(?:"[^"]*"|'[^']*'|[^\s"'=<>`]+))?)*)\s*(/?))>"""
+)
+_FAST_ATTR_RE = re.compile(
+    r"""\s+([^\s"'>/=]+)(?:\s*=\s*("[^"]*"|'[^']*'|[^\s"'=<>`]+))?"""
+)
+# ";" で終わる文字参照。それ以外の "&" を含む文書はhtml.parserで解析する
+_FAST_REF_RE = re.compile(r"&(?:#([0-9]+|[xX][0-9a-fA-F]+)|([a-zA-Z][a-zA-Z0-9]*));")
+# 中身の字句解析の規則が変わるタグ。含まれる文書はhtml.parserで解析する
+RAW_TEXT_TAGS = frozenset(
+    [
+        "script",
+        "style",
+        "textarea",
+        "title",
+        "plaintext",
+        "xmp",
+        "noscript",
+        "iframe",
+        "noembed",
+        "noframes",
+    ]
+)
+
+# 文字列の種類 (bs4 の NavigableString のサブクラスに対応)
+TEXT = "text"
+CDATA = "cdata"
+COMMENT = "comment"
+DECLARATION = "declaration"
+MAIN_CONTENT_KINDS = frozenset([TEXT, CDATA])
+
+# 開いている要素ごとの役割
+OUTSIDE = 0  # リストの外側 (段落のテキスト)
+LIST = 1  # <ul>/<ol>
+ITEM = 2  # リスト直下の <li>
+CAPTURE = 3  # <li> 内のインライン要素 (テキストを取り込む)
+SKIP = 4  # 変換対象外
+
+_WINDOWS_1252 = {
+    0x80: "€",
+    0x82: "‚",
+    0x83: "ƒ",
+    0x84: "„",
+    0x85: "…",
+    0x86: "†",
+    0x87: "‡",
+    0x88: "ˆ",
+    0x89: "‰",
+    0x8A: "Š",
+    0x8B: "‹",
+    0x8C: "Œ",
+    0x8E: "Ž",
+    0x91: "‘",
+    0x92: "’",
+    0x93: "“",
+    0x94: "”",
+    0x95: "•",
+    0x96: "–",
+    0x97: "—",
+    0x98: "˜",
+    0x99: "™",
+    0x9A: "š",
+    0x9B: "›",
+    0x9C: "œ",
+    0x9E: "ž",
+    0x9F: "Ÿ",
+}
+
+
+def parse_fast_attrs(attrs: str) -> list[tuple[str, str | None]]:
+    """
+    FAST_TAG_RE で切り出した属性の文字列を、html.parserと同じ (名前, 値) のリストにします。
+    """
+    parsed_attrs = []
+    for attr in _FAST_ATTR_RE.finditer(attrs):
+        value = attr.group(2)
+        if value is not None:
+            if value[:1] in ("'", '"'):
+                value = value[1:-1]
+            if value:
+                value = unescape(value)
+        parsed_attrs.append((attr.group(1).lower(), value))
+    return parsed_attrs
+
+
+def parse_aria_level(value: str | None) -> int | None:
+    """
+    aria-level の値 (1始まり) を0始まりの階層にします。数字でない場合はNoneを返します。
+    aria-level="0" のような1未満の値は最上位の階層として扱います。
+    """
+    if value and value.isdigit():
+        return max(int(value) - 1, 0)
+    return None
+
+
+class _ListFrame:
+    __slots__ = ("list_type", "level", "index", "sink")
+
+    def __init__(self, list_type: str, level: int, sink: list) -> None:
+        self.list_type = list_type
+        self.level = level
+        self.index = 1
+        self.sink = sink
+
+
+class _ItemFrame:
+    __slots__ = ("list_frame", "level", "parts", "nested")
+
+    def __init__(self, list_frame: _ListFrame, level: int) -> None:
+        self.list_frame = list_frame
+        self.level = level
+        self.parts: list[str] = []
+        # ネストされたリストの出力。<li> 自身の行の後に出力する
+        self.nested: list = []
+
+
+class _Element:
+    __slots__ = ("name", "role", "frame", "kinds")
+
+    def __init__(self, name: str, role: int, frame=None, kinds=None) -> None:
+        self.name = name
+        self.role = role
+        self.frame = frame
+        self.kinds = kinds
+
+
+def _flatten(sink: list) -> ListItems:
+    """
+    入れ子になったシンクを出力順の項目に平坦化します。
+    再帰を使わずに明示的なスタックで走査します。
+    """
+    items = ListItems()
+    stack = [iter(sink)]
+    while stack:
+        for entry in stack[-1]:
+            if isinstance(entry, list):
+                stack.append(iter(entry))
+                break
+            items.append(*entry)
+        else:
+            stack.pop()
+    return items
+
+
+def render_texty_json(items: ListItems) -> dict:
+    """
+    (text, list_type, level, index) の項目からtexty JSONを生成します。
+    list_typeがNoneの項目はリストの間の段落です。
+    出力はnormalize_opsで正規化したものと同じで、同じ属性の辞書は共有されます。
+    """
+    ops = []
+    shared: dict[tuple[str, int], dict] = {}
+    for text, list_type, level in coalesce_items(items):
+        if text:
+            ops.append({"insert": text})
+        if list_type is None:
+            continue
+        attributes = shared.get((list_type, level))
+        if attributes is None:
+            attributes = {"list": list_type}
+            if level > 0:
+                attributes["indent"] = level  # type: ignore
+            shared[(list_type, level)] = attributes
+        ops.append({"attributes": attributes, "insert": "\n"})
+    return {"ops": ops}
+
+
+def _plain_text_lines(items: ListItems) -> Iterator[str]:
+    for text, list_type, level, index in items:
+        if list_type is None:
+            yield text
+            continue
+        indent_str = "    " * level
+        prefix = "- " if list_type == "bullet" else f"{index}. "
+        yield f"{indent_str}{prefix}{text}"
+
+
+def render_plain_text(items: ListItems) -> str:
+    """
+    (text, list_type, level, index) の項目からプレーンテキストを生成します。
+    """
+    return "\n".join(_plain_text_lines(items))
+
+
+def iter_plain_text(items: ListItems) -> Iterator[str]:
+    """
+    render_plain_textの結果を、連結すると同じ文字列になる断片として先頭から順に返します。
+    """
+    lines = _plain_text_lines(items)
+    for line in lines:
+        yield line
+        break
+    for line in lines:
+        yield "\n"
+        yield line
+
+
+class StreamListParser(HTMLParser):
+    """
+    DOMを構築せずに、開始/終了タグのイベントから直接リストを変換するパーサーです。
+    文書中のすべてのトップレベルのリストと、その間の段落を出現順に変換します。
+    BeautifulSoup(html.parser) による変換と同一の結果を返します。
+
+    属性の書き方が整ったHTMLでは、html.parserの字句解析を通さずに正規表現で
+    タグを切り出し、<li> 以外の属性は解釈しません。
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=False)
+
+    def parse(self, html_content: str) -> tuple[str, dict]:
+        """
+        HTMLコンテンツを解析し、プレーンテキストとtexty JSONを返します。
+        """
+        items = self.parse_items(html_content)
+        return render_plain_text(items), render_texty_json(items)
+
+    def parse_items(self, html_content: str) -> ListItems:
+        """
+        HTMLコンテンツを解析し、出力順の (text, list_type, level, index) の項目を返します。
+        """
+        self._begin()
+        if not self._feed_fast(html_content):
+            # 途中まで処理したイベントを捨てて、html.parserで解析し直す
+            self._begin()
+            self.feed(html_content)
+            self.close()
+        # 閉じられていない要素を文書の末尾で閉じる
+        self._end_data()
+        while len(self._stack) > 1:
+            self._pop()
+        self._end_paragraph()
+        if not self._output:
+            # 何も変換できなかった場合は空のテキストとして扱う
+            self._output.append(("", None, 0, 0))
+        return _flatten(self._output)
+
+    def _begin(self) -> None:
+        self.reset()
+        self._stack = [_Element("[document]", OUTSIDE)]
+        self._output: list = []
+        self._paragraph: list[str] = []
+        self._data: list[str] = []
+        self._already_closed: list[str] = []
+        self._preserve_depth = 0
+        self._containers: list[str] = []
+
+    def _feed_fast(self, html_content: str) -> bool:
+        """
+        正規表現でタグとテキストを切り出し、html.parserを通さずにイベントを処理します。
+        パーサーは <li> 以外の属性を参照しないため、Google Docsのspanなどに付く
+        長いstyle属性は解釈しません。
+        コメントや属性の書き方が崩れたタグなど、html.parserと同じ結果になることを
+        保証できない構文が見つかった場合はFalseを返します。
+        """
+        position = 0
+        for match in FAST_TAG_RE.finditer(html_content):
+            start = match.start()
+            if start != position and not self._fast_text(html_content[position:start]):
+                return False
+            position = match.end()
+            end_name, name, attrs, self_closing = match.groups()
+            if end_name is not None:
+                self.handle_endtag(end_name.lower())
+                continue
+            name = name.lower()
+            if name in RAW_TEXT_TAGS:
+                return False
+            parsed_attrs = parse_fast_attrs(attrs) if name == "li" and attrs else []
+            if self_closing:
+                self.handle_startendtag(name, parsed_attrs)
+            else:
+                self.handle_starttag(name, parsed_attrs)
+        if position != len(html_content):
+            return self._fast_text(html_content[position:])
+        return True
+
+    def _fast_text(self, text: str) -> bool:
+        # タグとして切り出せなかった "<" が含まれる場合はhtml.parserに任せる
+        if "<" in text:
+            return False
+        if "&" not in text:
+            self._data.append(text)
+            return True
+        position = 0
+        refs = 0
+        for match in _FAST_REF_RE.finditer(text):
+            if match.start() != position:
+                self._data.append(text[position : match.start()])
+            number, name = match.groups()
+            if number is not None:
+                self.handle_charref(number)
+            else:
+                self.handle_entityref(name)
+            position = match.end()
+            refs += 1
+        if refs != text.count("&"):
+            return False
+        if position != len(text):
+            self._data.append(text[position:])
+        return True
+
+    # --- 文字列の処理 ---
+
+    def _end_data(self, kind: str = TEXT) -> None:
+        if not self._data:
+            return
+        data = "".join(self._data)
+        self._data = []
+        if not self._preserve_depth and not data.strip(" \n\t\f\r"):
+            data = "\n" if "\n" in data else " "
+        if kind == TEXT and self._containers:
+            kind = self._containers[-1]
+
+        parent = self._stack[-1]
+        if parent.role == ITEM:
+            parent.frame.parts.append(data)
+        elif parent.role == CAPTURE:
+            if kind in parent.kinds:
+                parent.frame.parts.append(data)
+        elif parent.role == OUTSIDE:
+            if kind in MAIN_CONTENT_KINDS:
+                self._paragraph.append(data)
+
+    def _end_paragraph(self) -> None:
+        text = "".join(self._paragraph).strip()
+        self._paragraph = []
+        if text:
+            self._output.append((text, None, 0, 0))
+
+    def handle_data(self, data: str) -> None:
+        self._data.append(data)
+
+    def handle_charref(self, name: str) -> None:
+        base = 10
+        digits = name
+        if name[:1] in ("x", "X"):
+            base = 16
+            digits = name[1:]
+        end = 0
+        valid = "0123456789abcdefABCDEF" if base == 16 else "0123456789"
+        while end < len(digits) and digits[end] in valid:
+            end += 1
+        if end == 0:
+            self._data.append(name)
+            return
+        code = int(digits[:end], base)
+        if code in _WINDOWS_1252:
+            char = _WINDOWS_1252[code]
+        elif code == 0 or 0xD800 <= code <= 0xDFFF or code > 0x10FFFF:
+            # NUL・サロゲート・範囲外の値は、BeautifulSoupと同様にU+FFFDにする
+            char = "\ufffd"
+        else:
+            char = chr(code)
+        self._data.append(char)
+        if digits[end:]:
+            self._data.append(digits[end:])
+
+    def handle_entityref(self, name: str) -> None:
+        char = html5.get(name + ";")
+        self._data.append(char if char is not None else f"&{name}")
+
+    def _handle_special(self, data: str, kind: str) -> None:
+        self._end_data()
+        self._data.append(data)
+        self._end_data(kind)
+
+    def handle_comment(self, data: str) -> None:
+        self._handle_special(data, COMMENT)
+
+    def handle_decl(self, decl: str) -> None:
+        self._handle_special(decl[len("DOCTYPE ") :], DECLARATION)
+
+    def unknown_decl(self, data: str) -> None:
+        if data.upper().startswith("CDATA["):
+            self._handle_special(data[len("CDATA[") :], CDATA)
+        else:
+            self._handle_special(data, DECLARATION)
+
+    def handle_pi(self, data: str) -> None:
+        self._handle_special(data, DECLARATION)
+
+    # --- タグの処理 ---
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        self._start(tag, attrs)
+        if tag in EMPTY_ELEMENT_TAGS:
+            self._end(tag)
+            self._already_closed.append(tag)
+
+    def handle_startendtag(self, tag: str, attrs: list) -> None:
+        self._start(tag, attrs)
+        self._end(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self._already_closed:
+            self._already_closed.remove(tag)
+        else:
+            self._end(tag)
+
+    def _start(self, tag: str, attrs: list) -> None:
+        self._end_data()
+        parent = self._stack[-1]
+        role = parent.role
+
+        if role == OUTSIDE:
+            if tag in LIST_TAGS:
+                # トップレベルのリストごとにレベル0から変換する
+                self._end_paragraph()
+                frame = _ListFrame(list_type_for_tag(tag), 0, self._output)
+                element = _Element(tag, LIST, frame)
+            elif tag in IGNORED_TAGS:
+                element = _Element(tag, SKIP)
+            else:
+                if tag in BLOCK_TAGS:
+                    self._end_paragraph()
+                element = _Element(tag, OUTSIDE)
+        elif role == LIST:
+            list_frame = parent.frame
+            if tag == "li":
+                level = list_frame.level
+                aria_level = None
+                for key, value in attrs:
+                    if key == "aria-level":
+                        aria_level = parse_aria_level(value)
+                if aria_level is not None:
+                    level = aria_level
+                element = _Element(tag, ITEM, _ItemFrame(list_frame, level))
+            elif tag in LIST_TAGS:
+                frame = _ListFrame(
+                    list_type_for_tag(tag), list_frame.level + 1, list_frame.sink
+                )
+                element = _Element(tag, LIST, frame)
+            else:
+                element = _Element(tag, SKIP)
+        elif role == ITEM:
+            item = parent.frame
+            if tag in LIST_TAGS:
+                frame = _ListFrame(list_type_for_tag(tag), item.level + 1, item.nested)
+                element = _Element(tag, LIST, frame)
+            else:
+                kinds = (
+                    frozenset([tag])
+                    if tag in STRING_CONTAINER_TAGS
+                    else MAIN_CONTENT_KINDS
+                )
+                element = _Element(tag, CAPTURE, item, kinds)
+        elif role == CAPTURE:
+            element = _Element(tag, CAPTURE, parent.frame, parent.kinds)
+        else:
+            element = _Element(tag, SKIP)
+
+        self._stack.append(element)
+        if tag in PRESERVE_WHITESPACE_TAGS:
+            self._preserve_depth += 1
+        if tag in STRING_CONTAINER_TAGS:
+            self._containers.append(tag)
+
+    def _end(self, tag: str) -> None:
+        self._end_data()
+        stack = self._stack
+        for i in range(len(stack) - 1, 0, -1):
+            if stack[i].name == tag:
+                break
+        else:
+            return
+        while len(stack) > i:
+            self._pop()
+
+    def _pop(self) -> None:
+        element = self._stack.pop()
+        if element.name in PRESERVE_WHITESPACE_TAGS:
+            self._preserve_depth -= 1
+        if element.name in STRING_CONTAINER_TAGS:
+            self._containers.pop()
+
+        if element.role == ITEM:
+            item = element.frame
+            list_frame = item.list_frame
+            item_text = "".join(item.parts).strip()
+            if item_text:
+                list_frame.sink.append(
+                    (item_text, list_frame.list_type, item.level, list_frame.index)
+                )
+                if list_frame.list_type == "ordered":
+                    list_frame.index += 1
+            if item.nested:
+                list_frame.sink.append(item.nested)
+        elif element.role == OUTSIDE and element.name in BLOCK_TAGS:
+            self._end_paragraph()
+
+
+def list_type_for_tag(tag: str) -> str:
+    return "bullet" if tag == "ul" else "ordered"
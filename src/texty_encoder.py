@@ -0,0 +1,135 @@
+import json
+import struct
+from json.encoder import encode_basestring_ascii  # type: ignore
+from typing import BinaryIO, Iterable, Iterator
+
+from src.list_items import ListItems
+from src.pickle_writer import PickleWriter
+from src.texty_ops import coalesce_items
+
+_UINT32 = struct.Struct("<I")
+_PADDING = (b"", b"\x00\x00")
+
+# (list_type, level) ごとの改行opのシリアライズ済みの断片
+_newline_fragments: dict[tuple[str, int], str] = {}
+
+
+def _newline_fragment(list_type: str, level: int) -> str:
+    fragment = _newline_fragments.get((list_type, level))
+    if fragment is None:
+        attributes = {"list": list_type}
+        if level > 0:
+            attributes["indent"] = level  # type: ignore
+        fragment = json.dumps(
+            {"attributes": attributes, "insert": "\n"}, separators=(",", ":")
+        )
+        _newline_fragments[(list_type, level)] = fragment
+    return fragment
+
+
+def _texty_ops(items: ListItems) -> Iterator[str]:
+    # 改行opはシリアライズ済みの断片を再利用し、opの辞書は作らない
+    for text, list_type, level in coalesce_items(items):
+        if text:
+            yield '{"insert":' + encode_basestring_ascii(text) + "}"
+        if list_type is not None:
+            yield _newline_fragment(list_type, level)
+
+
+def encode_texty_items(items: ListItems) -> str:
+    """
+    StreamListParser.parse_items の結果から、render_texty_json の結果を
+    json.dumps(..., separators=(",", ":")) したものと同じ文字列を直接組み立てます。
+    改行opはシリアライズ済みの断片を再利用し、opの辞書は作りません。
+    """
+    return '{"ops":[' + ",".join(_texty_ops(items)) + "]}"
+
+
+def iter_texty_items(items: ListItems) -> Iterator[str]:
+    """
+    encode_texty_itemsの結果を、連結すると同じ文字列になる断片として先頭から順に返します。
+    """
+    yield '{"ops":['
+    separator = ""
+    for op in _texty_ops(items):
+        yield separator
+        yield op
+        separator = ","
+    yield "]}"
+
+
+def encode_texty_json(texty_json: dict) -> str:
+    return json.dumps(texty_json, separators=(",", ":"))
+
+
+def _string16_header(encoded: bytes) -> tuple[bytes, bytes]:
+    """
+    UTF-16 LEでエンコード済みの文字列に対する、文字数のヘッダとパディングを返します。
+    """
+    return _UINT32.pack(len(encoded) // 2), _PADDING[(len(encoded) % 4) // 2]
+
+
+def _string16(s: str) -> bytes:
+    encoded = s.encode("utf-16-le")
+    header, padding = _string16_header(encoded)
+    return header + encoded + padding
+
+
+PLAIN_TEXT_KEY = _string16("public.utf8-plain-text")
+TEXTY_KEY = _string16("slack/texty")
+ENTRY_COUNT = _UINT32.pack(2)
+
+
+def encode_chromium_data(plain_text: str, texty: dict | str) -> bytes:
+    """
+    'org.chromium.web-custom-data' 形式のバイナリデータを生成します。
+    PickleWriterを使った場合と同一のバイト列を、各値を一度だけエンコードして
+    1つのバッファにまとめて書き出します。
+
+    Args:
+        plain_text: プレーンテキスト
+        texty: texty JSON、またはシリアライズ済みのJSON文字列
+    """
+    if not isinstance(texty, str):
+        texty = encode_texty_json(texty)
+    plain_bytes = plain_text.encode("utf-16-le")
+    plain_header, plain_padding = _string16_header(plain_bytes)
+    texty_bytes = texty.encode("utf-16-le")
+    texty_header, texty_padding = _string16_header(texty_bytes)
+
+    parts = [
+        ENTRY_COUNT,
+        PLAIN_TEXT_KEY,
+        plain_header,
+        plain_bytes,
+        plain_padding,
+        TEXTY_KEY,
+        texty_header,
+        texty_bytes,
+        texty_padding,
+    ]
+    payload_size = sum(len(part) for part in parts)
+    # 先頭にペイロード全体のサイズを置き、b"".join で一度だけコピーする
+    return b"".join([_UINT32.pack(payload_size), *parts])
+
+
+def write_chromium_data(
+    sink: BinaryIO, plain_text: str | Iterable[str], texty: dict | str | Iterable[str]
+) -> int:
+    """
+    encode_chromium_dataと同一のバイト列を、シーク可能なsinkに先頭から順に書き込みます。
+    値は文字列の断片のイテラブルでもよく、一定の文字数ずつエンコードして書き込むため、
+    ペイロード全体のバイト列をメモリ上に作りません。
+
+    Returns:
+        書き込んだバイト数
+    """
+    if isinstance(texty, dict):
+        texty = encode_texty_json(texty)
+    writer = PickleWriter(sink)
+    writer.write_uint32(2)
+    writer.write_string16("public.utf8-plain-text")
+    writer.write_string16(plain_text)
+    writer.write_string16("slack/texty")
+    writer.write_string16(texty)
+    return writer.finish()
@@ -0,0 +1,96 @@
+from typing import TYPE_CHECKING, Iterator
+
+if TYPE_CHECKING:
+    from src.list_items import ListItems
+
+
+def _is_noop_attribute(name: str, value: object) -> bool:
+    # null は書式を外す指定なので、insertでは何も付けないのと同じ
+    return value is None or (name == "indent" and value == 0)
+
+
+def _attributes_key(attributes: dict) -> tuple | None:
+    try:
+        key = tuple(sorted(attributes.items()))
+        hash(key)
+    except TypeError:
+        # 値がハッシュできない属性は共有しない
+        return None
+    return key
+
+
+def normalize_ops(ops: list[dict]) -> list[dict]:
+    """
+    texty JSONのopsを、Slackでの表示を変えずに小さくします。
+    - 空のinsertを取り除く
+    - 何も変えない属性 (null, indent: 0) を取り除き、空になった属性は省略する
+    - 属性の無い文字列のinsertが隣り合う場合は1つにまとめる
+    - 同じ内容の属性は1つの辞書を共有する
+
+    入力のopsは変更せず、新しいリストを返します。
+    """
+    normalized: list[dict] = []
+    shared: dict[tuple, dict] = {}
+    # まとめている途中の属性の無いinsert
+    pending: list[str] = []
+
+    def flush() -> None:
+        if pending:
+            normalized.append({"insert": "".join(pending)})
+            pending.clear()
+
+    for op in ops:
+        insert = op.get("insert")
+        if insert == "":
+            continue
+        attributes = op.get("attributes")
+        if attributes:
+            attributes = {
+                name: value
+                for name, value in attributes.items()
+                if not _is_noop_attribute(name, value)
+            }
+        if (
+            not attributes
+            and isinstance(insert, str)
+            and op.keys()
+            <= {
+                "insert",
+                "attributes",
+            }
+        ):
+            pending.append(insert)
+            continue
+
+        flush()
+        op = dict(op)
+        if attributes:
+            key = _attributes_key(attributes)
+            if key is not None:
+                attributes = shared.setdefault(key, attributes)
+            op["attributes"] = attributes
+        else:
+            op.pop("attributes", None)
+        normalized.append(op)
+    flush()
+    return normalized
+
+
+def coalesce_items(
+    items: "ListItems",
+) -> Iterator[tuple[str, str | None, int]]:
+    """
+    StreamListParser.parse_items の項目を、normalize_opsと同じ単位にまとめます。
+    リスト項目ごとに (直前の段落を含むテキスト, list_type, level) を返し、
+    最後のリスト項目より後ろの段落は (テキスト, None, 0) として返します。
+    """
+    pending: list[str] = []
+    for text, list_type, level, _ in items:
+        pending.append(text)
+        if list_type is None:
+            pending.append("\n")
+            continue
+        yield "".join(pending), list_type, level
+        pending.clear()
+    if pending:
+        yield "".join(pending), None, 0
@@ -0,0 +1,180 @@
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+# 変換パイプラインのフェーズ名
+CLIPBOARD_READ = "clipboard_read"
+DECODE = "decode"
+CACHE_LOOKUP = "cache_lookup"
+PARSE = "parse"
+OPS_BUILD = "ops_build"
+JSON_SERIALIZE = "json_serialize"
+PICKLE_WRITE = "pickle_write"
+CLIPBOARD_WRITE = "clipboard_write"
+
+
+class PhaseRecord:
+    __slots__ = ("allocated_bytes", "counts", "name", "seconds")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.seconds = 0.0
+        self.allocated_bytes: int | None = None
+        self.counts: dict[str, int] = {}
+
+    def count(self, **counts: int) -> None:
+        """
+        フェーズで処理した件数 (項目数・バイト数など) を記録します。
+        """
+        self.counts.update(counts)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "seconds": self.seconds,
+            "allocated_bytes": self.allocated_bytes,
+            "counts": self.counts,
+        }
+
+
+class Tracer:
+    """
+    変換パイプラインの各フェーズの実行時間・確保したメモリ・件数を記録します。
+    """
+
+    enabled = True
+
+    def __init__(self, trace_memory: bool = False) -> None:
+        """
+        Args:
+            trace_memory: Trueの場合はtracemallocで各フェーズのメモリ確保量を計測します
+        """
+        self.trace_memory = trace_memory
+        self.records: list[PhaseRecord] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[PhaseRecord]:
+        record = PhaseRecord(name)
+        started_tracing = False
+        if self.trace_memory:
+            # フェーズのフックは全プロセスで読み込まれるため、--trace の場合だけ読み込む
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = time.perf_counter() - start
+            if self.trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                record.allocated_bytes = peak - base
+                if started_tracing:
+                    tracemalloc.stop()
+            self.records.append(record)
+
+    def to_json(self) -> str:
+        import json
+
+        return json.dumps(
+            {
+                "total_seconds": sum(r.seconds for r in self.records),
+                "phases": [r.to_dict() for r in self.records],
+            },
+            indent=2,
+        )
+
+    def summary(self) -> str:
+        """
+        1フェーズ1行の簡潔な要約を返します。
+        """
+        lines = []
+        for r in self.records:
+            line = f"{r.name:<16}{r.seconds * 1000:10.2f} ms"
+            if r.allocated_bytes is not None:
+                line += f"{r.allocated_bytes / 1024:10.1f} KiB"
+            if r.counts:
+                line += "  " + " ".join(f"{k}={v}" for k, v in r.counts.items())
+            lines.append(line)
+        total = sum(r.seconds for r in self.records)
+        lines.append(f"{'total':<16}{total * 1000:10.2f} ms")
+        return "\n".join(lines)
+
+
+class _NullRecord:
+    __slots__ = ()
+
+    def count(self, **counts: int) -> None:
+        pass
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self) -> _NullRecord:
+        return _NULL_RECORD
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NULL_RECORD = _NullRecord()
+_NULL_PHASE = _NullPhase()
+
+
+class NullTracer:
+    """
+    何も記録しないトレーサーです。トレースが無効な場合のオーバーヘッドを最小にします。
+    """
+
+    enabled = False
+
+    def phase(self, name: str) -> _NullPhase:
+        return _NULL_PHASE
+
+
+NULL_TRACER = NullTracer()
+_current_tracer: Tracer | NullTracer = NULL_TRACER
+
+
+def get_tracer() -> Tracer | NullTracer:
+    """
+    現在有効なトレーサーを返します。
+    """
+    return _current_tracer
+
+
+@contextmanager
+def use_tracer(tracer: Tracer | NullTracer) -> Iterator[Tracer | NullTracer]:
+    """
+    withブロックの間、SlackListGeneratorとClipboardUtilがtracerに記録するようにします。
+    """
+    global _current_tracer
+    previous = _current_tracer
+    _current_tracer = tracer
+    try:
+        yield tracer
+    finally:
+        _current_tracer = previous
+
+
+class DebugDump:
+    """
+    デバッグ出力用の文字列を、表示されるときに初めて切り詰めて整形します。
+    """
+
+    def __init__(self, value: object, limit: int = 2000) -> None:
+        self.value = value
+        self.limit = limit
+
+    def __str__(self) -> str:
+        text = self.value if isinstance(self.value, str) else str(self.value)
+        if len(text) <= self.limit:
+            return text
+        half = self.limit // 2
+        omitted = len(text) - half * 2
+        return f"{text[:half]}\n... ({omitted} chars omitted) ...\n{text[-half:]}"
@@ -0,0 +1,153 @@
+import re
+
+from src.list_items import ListItems
+from src.markup_tokenizer import MarkupParser
+from src.stream_list_parser import BLOCK_TAGS, EMPTY_ELEMENT_TAGS
+
+# Wordが段落のstyleに書き込むリストの情報 (mso-list:l0 level2 lfo1)
+_MSO_LIST_RE = re.compile(r"mso-list\s*:\s*l(\d+)\s+level(\d+)\s+lfo(\d+)")
+# 行頭記号を囲むspanのstyle (mso-list:Ignore)
+_MSO_IGNORE_RE = re.compile(r"mso-list\s*:\s*Ignore")
+# 番号付きリストの行頭記号 ("1." "a)" "iv." "(3)" など)
+_ORDERED_MARKER_RE = re.compile(r"^\(?(?:[0-9]+|[a-zA-Z]|[ivxlcdmIVXLCDM]+)[.)]$")
+# ソースの折り返しは空白として扱う (&nbsp; は残す)
+_WHITESPACE_RE = re.compile(r"[ \t\n\r\f]+")
+# 内容を出力しない要素
+_SKIPPED_TAGS = frozenset(["head", "style", "script", "title", "xml", "template"])
+
+
+class WordListParser(MarkupParser):
+    """
+    Microsoft WordからコピーしたHTMLのリストを変換するパーサーです。
+
+    Wordはリストを <ul>/<ol> ではなく、styleに mso-list:lN levelK lfoM を持つ <p> の並びで表現し、
+    行頭記号を <![if !supportLists]> ... <![endif]> や mso-list:Ignore のspanの中に
+    テキストとして書き出します。このパーサーは要素の木を作らず、段落ごとに
+    styleの階層と行頭記号の種類だけを読み取って (text, list_type, level, index) の項目にします。
+    リスト以外の段落はリストの間の段落として出力します。
+    """
+
+    def parse_items(self, html_content: str) -> ListItems:
+        """
+        HTMLコンテンツを解析し、出力順の (text, list_type, level, index) の項目を返します。
+        """
+        self._feed_markup(html_content)
+        self._end_block()
+        if not self._items:
+            # 何も変換できなかった場合は空のテキストとして扱う
+            self._items.append("", None, 0, 0)
+        return self._items
+
+    def _begin(self) -> None:
+        super()._begin()
+        self._items = ListItems()
+        self._skip_depth = 0
+        # 行頭記号の中で開いている要素。空でない間は行頭記号として扱う
+        self._marker_tags: list[str] = []
+        self._in_support_lists = False
+        self._text: list[str] = []
+        self._marker: list[str] = []
+        # 現在の段落のリストの情報 (リストの番号, 階層, lfo)。リスト以外の段落ではNone
+        self._list: tuple[int, int, int] | None = None
+        self._last_list: tuple[int, int] | None = None
+        self._counters: list[int] = []
+
+    def wants_attrs(self, tag: str, attrs: str) -> bool:
+        # 参照するのはmso-listを含むstyleだけ
+        return "mso-list" in attrs or "&" in attrs
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth += 1
+            return
+        if self._skip_depth:
+            return
+        if self._marker_tags:
+            if tag not in EMPTY_ELEMENT_TAGS:
+                self._marker_tags.append(tag)
+            return
+        style = None
+        for key, value in attrs:
+            if key == "style":
+                style = value
+        if tag == "br" and self._list is not None:
+            # リストの項目内の改行は項目を区切らない
+            return
+        if tag in BLOCK_TAGS:
+            self._end_block()
+            if style:
+                match = _MSO_LIST_RE.search(style)
+                if match is not None:
+                    self._list = (
+                        int(match.group(1)),
+                        int(match.group(2)),
+                        int(match.group(3)),
+                    )
+        elif style and tag not in EMPTY_ELEMENT_TAGS and _MSO_IGNORE_RE.search(style):
+            self._marker_tags.append(tag)
+
+    def handle_startendtag(self, tag: str, attrs: list) -> None:
+        self.handle_starttag(tag, attrs)
+        self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in _SKIPPED_TAGS:
+            if self._skip_depth:
+                self._skip_depth -= 1
+            return
+        if self._skip_depth:
+            return
+        if self._marker_tags:
+            if tag in self._marker_tags:
+                while self._marker_tags.pop() != tag:
+                    pass
+            return
+        if tag in BLOCK_TAGS and not (tag == "br" and self._list is not None):
+            self._end_block()
+
+    def handle_data(self, data: str) -> None:
+        if self._skip_depth:
+            return
+        if self._marker_tags or self._in_support_lists:
+            self._marker.append(data)
+        else:
+            self._text.append(data)
+
+    def unknown_decl(self, data: str) -> None:
+        # 行頭記号はWord以外のアプリで表示するための条件付きの範囲に置かれる
+        condition = data.strip().lower()
+        if condition.startswith("if") and "supportlists" in condition:
+            self._in_support_lists = True
+        elif condition == "endif":
+            self._in_support_lists = False
+
+    def _end_block(self) -> None:
+        text = _WHITESPACE_RE.sub(" ", "".join(self._text)).strip()
+        marker = "".join(self._marker).strip()
+        self._text = []
+        self._marker = []
+        current = self._list
+        self._list = None
+        if current is None:
+            if text:
+                self._items.append(text, None, 0, 0)
+                # リストの間に段落があれば番号を振り直す
+                self._last_list = None
+            return
+        if not text:
+            return
+
+        list_id, level, lfo = current
+        level = max(level - 1, 0)
+        if self._last_list != (list_id, lfo):
+            self._counters = []
+        self._last_list = (list_id, lfo)
+        # 浅い階層の項目が現れたら、それより深い階層の番号を振り直す
+        del self._counters[level + 1 :]
+        while len(self._counters) <= level:
+            self._counters.append(0)
+        if _ORDERED_MARKER_RE.match(marker.split()[0] if marker else ""):
+            self._counters[level] += 1
+            self._items.append(text, "ordered", level, self._counters[level])
+        else:
+            self._items.append(text, "bullet", level, 1)
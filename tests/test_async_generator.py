@@ -0,0 +1,195 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from src.async_generator import AsyncSlackListGenerator
+from src.conversion_cache import ConversionCache
+from src.slack_list_generator import SlackListGenerator
+
+HTML = "<ul><li>a<ul><li>b</li></ul></li></ul>"
+
+
+class SlowGenerator(SlackListGenerator):
+    """変換に時間がかかり、同時実行数を記録するジェネレータ"""
+
+    def __init__(self, delay: float = 0.02) -> None:
+        super().__init__()
+        self.delay = delay
+        self.calls: list[str] = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def generate_uncached(self, html_content):
+        with self._lock:
+            self.calls.append(html_content)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return super().generate_uncached(html_content)
+
+
+def test_agenerate_matches_generate():
+    """agenerateがgenerateと同じ結果を返すことをテスト"""
+    result = asyncio.run(AsyncSlackListGenerator().agenerate(HTML))
+    assert result == SlackListGenerator().generate(HTML)
+
+
+def test_agenerate_batch_preserves_order_and_bounds_concurrency():
+    """バッチ変換が入力順に結果を返し、同時実行数が上限を超えないことをテスト"""
+    generator = SlowGenerator()
+    htmls = [f"<ul><li>{i}</li></ul>" for i in range(10)]
+
+    async def run():
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            async_generator = AsyncSlackListGenerator(
+                generator, executor=executor, max_concurrency=3
+            )
+            return await async_generator.agenerate_batch(htmls)
+
+    results = asyncio.run(run())
+
+    assert [r.plain_text for r in results] == [f"- {i}" for i in range(10)]
+    assert generator.max_active == 3
+
+
+def test_agenerate_does_not_block_event_loop():
+    """変換中も他のコルーチンが進むことをテスト"""
+    ticks = 0
+
+    async def ticker(stop: asyncio.Event):
+        nonlocal ticks
+        while not stop.is_set():
+            ticks += 1
+            await asyncio.sleep(0.001)
+
+    async def run():
+        stop = asyncio.Event()
+        task = asyncio.create_task(ticker(stop))
+        await AsyncSlackListGenerator(SlowGenerator(delay=0.1)).agenerate(HTML)
+        stop.set()
+        await task
+
+    asyncio.run(run())
+    assert ticks > 10
+
+
+def test_cancel_waiting_conversion():
+    """空きを待っている変換をキャンセルすると実行されないことをテスト"""
+    generator = SlowGenerator(delay=0.1)
+
+    async def run():
+        async_generator = AsyncSlackListGenerator(generator, max_concurrency=1)
+        first = asyncio.create_task(async_generator.agenerate("<p>first</p>"))
+        second = asyncio.create_task(async_generator.agenerate("<p>second</p>"))
+        await asyncio.sleep(0.01)
+        second.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await second
+        return await first
+
+    result = asyncio.run(run())
+
+    assert result.plain_text == "first"
+    assert generator.calls == ["<p>first</p>"]
+
+
+def test_cancel_running_conversion_keeps_limit():
+    """実行中の変換をキャンセルしても、変換が終わるまで次の変換が始まらないことをテスト"""
+    generator = SlowGenerator(delay=0.1)
+
+    async def run():
+        async_generator = AsyncSlackListGenerator(generator, max_concurrency=1)
+        first = asyncio.create_task(async_generator.agenerate("<p>first</p>"))
+        await asyncio.sleep(0.02)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await async_generator.agenerate("<p>second</p>")
+
+    result = asyncio.run(run())
+
+    assert result.plain_text == "second"
+    assert generator.calls == ["<p>first</p>", "<p>second</p>"]
+    assert generator.max_active == 1
+
+
+def test_stopping_iteration_cancels_pending_conversions():
+    """agenerate_iterを途中で止めると未開始の変換が実行されないことをテスト"""
+    generator = SlowGenerator()
+    htmls = [f"<p>{i}</p>" for i in range(20)]
+
+    async def run():
+        async_generator = AsyncSlackListGenerator(generator, max_concurrency=2)
+        results = async_generator.agenerate_iter(htmls)
+        first = await anext(results)
+        await results.aclose()
+        return first
+
+    first = asyncio.run(run())
+
+    assert first.plain_text == "0"
+    assert len(generator.calls) <= 3
+
+
+def test_agenerate_with_process_pool():
+    """ProcessPoolExecutorでも同じ結果を返すことをテスト"""
+
+    async def run():
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            async_generator = AsyncSlackListGenerator(executor=executor)
+            return await async_generator.agenerate_batch([HTML, "<p>x</p>"])
+
+    results = asyncio.run(run())
+
+    generator = SlackListGenerator()
+    assert results == [generator.generate(HTML), generator.generate("<p>x</p>")]
+
+
+def test_cache_with_process_pool():
+    """キャッシュを持つジェネレータでも、ProcessPoolExecutorで変換してキャッシュを使うことをテスト"""
+    cache = ConversionCache()
+
+    async def run():
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            async_generator = AsyncSlackListGenerator(
+                SlackListGenerator(cache=cache), executor=executor
+            )
+            first = await async_generator.agenerate(HTML)
+            second = await async_generator.agenerate(HTML)
+            return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first == SlackListGenerator().generate(HTML)
+    assert second is first
+    assert cache.stats.misses == 1
+    assert cache.stats.memory_hits == 1
+
+
+def test_aclose_shuts_down_own_executor():
+    """async withの終わりで、executorを省略した場合に作成したスレッドが終了することをテスト"""
+
+    async def run():
+        async with AsyncSlackListGenerator() as async_generator:
+            result = await async_generator.agenerate(HTML)
+            executor = async_generator._own_executor
+            assert executor is not None
+        assert async_generator._own_executor is None
+        return result, executor
+
+    result, executor = asyncio.run(run())
+
+    assert result.plain_text == "- a\n    - b"
+    with pytest.raises(RuntimeError):
+        executor.submit(int)
+
+
+def test_invalid_max_concurrency():
+    with pytest.raises(ValueError):
+        AsyncSlackListGenerator(max_concurrency=0)
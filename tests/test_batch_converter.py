@@ -0,0 +1,123 @@
+import json
+import struct
+
+import pytest
+
+from src.batch_converter import (
+    BatchSummary,
+    collect_inputs,
+    convert_files,
+    find_output_conflicts,
+    output_paths,
+    verify_file,
+)
+
+HTML = "<ul><li>Item 1</li><li>Item 2<ul><li>Nested</li></ul></li></ul>"
+
+
+def write_inputs(tmp_path, count):
+    paths = []
+    for i in range(count):
+        sub = tmp_path / f"dir{i % 2}"
+        sub.mkdir(exist_ok=True)
+        path = sub / f"doc{i}.html"
+        path.write_text(HTML, encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def test_collect_inputs(tmp_path):
+    """ファイル・glob・ディレクトリから重複なくHTMLを列挙することをテスト"""
+    paths = write_inputs(tmp_path, 4)
+    (tmp_path / "dir0" / "note.txt").write_text("x")
+
+    found = collect_inputs(
+        [str(tmp_path / "dir0"), str(tmp_path / "dir1" / "*.html"), str(paths[0])]
+    )
+
+    assert sorted(found) == sorted(paths)
+
+
+def test_collect_missing_inputs(tmp_path):
+    """存在しないファイルや何にも一致しないglobをエラーにすることをテスト"""
+    (path,) = write_inputs(tmp_path, 1)
+
+    with pytest.raises(FileNotFoundError, match="missing.html"):
+        collect_inputs([str(path), str(tmp_path / "missing.html")])
+    with pytest.raises(FileNotFoundError, match="nothing"):
+        collect_inputs([str(tmp_path / "nothing" / "*.html")])
+
+
+def test_find_output_conflicts(tmp_path):
+    """出力ファイルが入力ファイルや他の入力の出力と重なる組を返すことをテスト"""
+    html, htm, notes, other = (
+        tmp_path / name for name in ("a.html", "a.htm", "notes.txt", "b.html")
+    )
+
+    assert find_output_conflicts([html, other]) == []
+    assert find_output_conflicts([html, htm, notes, other]) == [
+        (htm, html),
+        (notes, notes),
+    ]
+    assert find_output_conflicts([tmp_path / "a.txt", html]) == [
+        (tmp_path / "a.txt", tmp_path / "a.txt"),
+        (html, tmp_path / "a.txt"),
+    ]
+
+
+def test_invalid_chunksize(tmp_path):
+    """1未満のchunksizeはエラーにすることをテスト"""
+    with pytest.raises(ValueError):
+        convert_files(write_inputs(tmp_path, 1), workers=1, chunksize=0)
+
+
+def test_convert_files_in_process(tmp_path):
+    """変換結果が入力ファイルの隣に書き出されることをテスト"""
+    paths = write_inputs(tmp_path, 3)
+
+    summary = convert_files(paths, workers=1)
+
+    assert summary.files == 3
+    assert summary.input_bytes == 3 * len(HTML.encode("utf-8"))
+    assert summary.errors == []
+    text_path, texty_path, binary_path = output_paths(paths[0])
+    assert text_path.read_text(encoding="utf-8") == ("- Item 1\n- Item 2\n    - Nested")
+    texty = json.loads(texty_path.read_text(encoding="utf-8"))
+    assert texty["ops"][0] == {"insert": "Item 1"}
+    data = binary_path.read_bytes()
+    assert struct.unpack("<I", data[:4])[0] == len(data) - 4
+
+
+def test_convert_files_with_pool(tmp_path):
+    """プロセスプールでも同じ結果になり、エラーが集計されることをテスト"""
+    paths = write_inputs(tmp_path, 6)
+    broken = tmp_path / "broken.html"
+    broken.write_bytes(b"\xff\xfe<ul>")
+
+    summary = convert_files([*paths, broken], workers=2, chunksize=2)
+
+    assert summary.files == 6
+    assert [path for path, _ in summary.errors] == [str(broken)]
+    for path in paths:
+        assert output_paths(path)[0].read_text(encoding="utf-8").startswith("- ")
+
+
+def test_summary_format():
+    """スループットの表示をテスト"""
+    summary = BatchSummary(files=10, input_bytes=2 * 1024 * 1024, seconds=2.0)
+
+    assert summary.files_per_second == 5.0
+    assert summary.megabytes_per_second == 1.0
+    assert "5.0 files/s" in summary.format()
+    assert "1.00 MB/s" in summary.format()
+
+
+def test_verify_file(tmp_path):
+    """出力された .bin が .txt / .texty.json と一致するか検証できることをテスト"""
+    (path,) = write_inputs(tmp_path, 1)
+    convert_files([path], workers=1)
+
+    assert verify_file(path) is None
+
+    output_paths(path)[0].write_text("changed", encoding="utf-8")
+    assert verify_file(path) is not None
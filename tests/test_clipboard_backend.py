@@ -0,0 +1,133 @@
+import subprocess
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.clipboard_backend import (
+    CHROMIUM_WEB_CUSTOM_DATA_TYPE,
+    HTML_TYPE,
+    PLAIN_TEXT_TYPE,
+    AppKitClipboardBackend,
+    ClipboardBackend,
+    MemoryClipboardBackend,
+    SubprocessClipboardBackend,
+    TextClipboardBackend,
+    create_backend,
+)
+
+
+class TestMemoryClipboardBackend(unittest.TestCase):
+    def test_copy_html(self):
+        """copy_htmlでHTMLが設定され、変更カウンタが増えることをテスト"""
+        backend = MemoryClipboardBackend()
+        self.assertIsNone(backend.read_html())
+
+        backend.copy_html("<ul><li>a</li></ul>")
+
+        self.assertEqual(backend.change_count(), 1)
+        self.assertEqual(backend.read_html(), "<ul><li>a</li></ul>")
+
+    def test_write_rich_text(self):
+        """write_rich_textでHTMLが置き換えられることをテスト"""
+        backend = MemoryClipboardBackend()
+        backend.copy_html("<ul><li>a</li></ul>")
+
+        backend.write_rich_text(b"\x00\x01", "- a")
+
+        self.assertEqual(backend.change_count(), 2)
+        self.assertIsNone(backend.read_html())
+        self.assertEqual(
+            backend.contents,
+            {PLAIN_TEXT_TYPE: "- a", CHROMIUM_WEB_CUSTOM_DATA_TYPE: b"\x00\x01"},
+        )
+
+    def test_write_text(self):
+        """write_textでプレーンテキストのみが設定されることをテスト"""
+        backend = MemoryClipboardBackend()
+        backend.write_text("- a")
+
+        self.assertEqual(backend.contents, {PLAIN_TEXT_TYPE: "- a"})
+        self.assertNotIn(HTML_TYPE, backend.contents)
+
+    def test_read_bytes(self):
+        """read_bytesがデコード前のバイト列を返すことをテスト"""
+        backend = MemoryClipboardBackend()
+        backend.copy_html("<p>é</p>", "é")
+        backend.write_rich_text(b"\x00\x01", "- a")
+
+        self.assertEqual(backend.read_bytes(CHROMIUM_WEB_CUSTOM_DATA_TYPE), b"\x00\x01")
+        self.assertEqual(backend.read_bytes(PLAIN_TEXT_TYPE), b"- a")
+        self.assertIsNone(backend.read_bytes(HTML_TYPE))
+
+        backend.copy_html("<p>é</p>", "é")
+        self.assertEqual(backend.read_bytes(), "<p>é</p>".encode("utf-8"))
+
+
+class TestSubprocessClipboardBackend(unittest.TestCase):
+    @patch("subprocess.run")
+    def test_read_text(self, mock_run):
+        """read_textがpbpasteのプレーンテキストを返し、テキストが無い場合はNoneを返すことをテスト"""
+        mock_run.return_value = MagicMock(stdout="- é".encode("utf-8"))
+        backend = SubprocessClipboardBackend()
+
+        self.assertEqual(backend.read_text(), "- é")
+        mock_run.assert_called_once_with(
+            ["pbpaste", "-Prefer", "txt"], stdout=subprocess.PIPE, check=True
+        )
+
+        mock_run.return_value = MagicMock(stdout=b"")
+        self.assertIsNone(backend.read_text())
+
+    @patch("subprocess.run")
+    def test_write_text(self, mock_run):
+        """write_textがpbcopyにUTF-8で書き込むことをテスト"""
+        SubprocessClipboardBackend().write_text("- é")
+
+        mock_run.assert_called_once_with(
+            ["pbcopy"], input="- é".encode("utf-8"), check=True
+        )
+
+    def test_text_only(self):
+        """HTMLや変更カウンタを扱うインターフェースを実装していないことをテスト"""
+        backend = SubprocessClipboardBackend()
+        self.assertIsInstance(backend, TextClipboardBackend)
+        self.assertNotIsInstance(backend, ClipboardBackend)
+
+
+class TestAppKitClipboardBackend(unittest.TestCase):
+    @patch("AppKit.NSPasteboard")
+    def test_read_missing_type(self, mock_nspasteboard):
+        """指定したタイプが無い場合はプレーンテキストではなくNoneを返すことをテスト"""
+        mock_pb = MagicMock()
+        mock_pb.dataForType_.side_effect = lambda type_: (
+            b"text" if type_ == PLAIN_TEXT_TYPE else None
+        )
+        mock_nspasteboard.generalPasteboard.return_value = mock_pb
+        backend = AppKitClipboardBackend()
+
+        self.assertIsNone(backend.read_html())
+        self.assertEqual(backend.read_text(), "text")
+
+
+class TestClipboardBackend(unittest.TestCase):
+    def test_abstract(self):
+        """抽象メソッドを実装していないバックエンドは作成できないことをテスト"""
+
+        class TextOnly(ClipboardBackend):
+            def read_text(self):
+                return None
+
+            def write_text(self, plain_text):
+                pass
+
+        with self.assertRaises(TypeError):
+            TextOnly()
+
+
+class TestCreateBackend(unittest.TestCase):
+    def test_create_backend(self):
+        self.assertIsInstance(create_backend("memory"), MemoryClipboardBackend)
+        self.assertIsInstance(create_backend("subprocess"), SubprocessClipboardBackend)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            create_backend("x11")
@@ -1,33 +1,51 @@
 import unittest
 from unittest.mock import patch, MagicMock
-import subprocess
 from src.clipboard_util import (
     ClipboardUtil,
     CHROMIUM_WEB_CUSTOM_DATA_TYPE,
 )
-from AppKit import NSPasteboardTypeString  # type: ignore
+from src.clipboard_backend import PLAIN_TEXT_TYPE as NSPasteboardTypeString
 
 
 class TestClipboardUtil(unittest.TestCase):
-    @patch("subprocess.Popen")
-    def test_get_clipboard_html(self, mock_popen):
-        """get_clipboard_htmlがpbpasteを呼び出して結果を返すことをテスト"""
+    @patch("AppKit.NSPasteboard")
+    def test_get_clipboard_html(self, mock_nspasteboard):
+        """get_clipboard_htmlがNSPasteboardからHTMLを読み込んで返すことをテスト"""
         # Setup mock
-        process_mock = MagicMock()
-        # communicate returns (stdout, stderr)
-        process_mock.communicate.return_value = (b"<html></html>", b"")
-        mock_popen.return_value = process_mock
+        mock_pb = MagicMock()
+        mock_pb.dataForType_.return_value = b"<html></html>"
+        mock_nspasteboard.generalPasteboard.return_value = mock_pb
 
         # Execute
         result = ClipboardUtil.get_clipboard_html()
 
         # Verify
         self.assertEqual(result, "<html></html>")
-        mock_popen.assert_called_with(
-            ["pbpaste", "-prefer", "public.html"], stdout=subprocess.PIPE
+        mock_pb.dataForType_.assert_called_once_with("public.html")
+
+    @patch("AppKit.NSPasteboard")
+    def test_get_clipboard_bytes_falls_back_to_text(self, mock_nspasteboard):
+        """HTMLが無い場合はプレーンテキストを返すことをテスト"""
+        # Setup mock
+        mock_pb = MagicMock()
+        mock_pb.dataForType_.side_effect = lambda type_: (
+            b"text" if type_ == NSPasteboardTypeString else None
         )
+        mock_nspasteboard.generalPasteboard.return_value = mock_pb
+
+        # Execute & Verify
+        self.assertEqual(ClipboardUtil.get_clipboard_bytes(), b"text")
+
+    @patch("AppKit.NSPasteboard")
+    def test_get_clipboard_bytes_empty(self, mock_nspasteboard):
+        """HTMLもプレーンテキストも無い場合は空のバイト列を返すことをテスト"""
+        mock_pb = MagicMock()
+        mock_pb.dataForType_.return_value = None
+        mock_nspasteboard.generalPasteboard.return_value = mock_pb
+
+        self.assertEqual(ClipboardUtil.get_clipboard_bytes(), b"")
 
-    @patch("src.clipboard_util.NSPasteboard")
+    @patch("AppKit.NSPasteboard")
     def test_set_rich_text(self, mock_nspasteboard):
         """set_rich_textがNSPasteboardを正しく呼び出すことをテスト"""
         # Setup mock
@@ -44,7 +62,7 @@ class TestClipboardUtil(unittest.TestCase):
         mock_pb.setString_forType_.assert_any_call(plain_text, NSPasteboardTypeString)
         mock_pb.setData_forType_.assert_any_call(data, CHROMIUM_WEB_CUSTOM_DATA_TYPE)
 
-    @patch("src.clipboard_util.NSPasteboard")
+    @patch("AppKit.NSPasteboard")
     def test_set_text(self, mock_nspasteboard):
         """set_textがNSPasteboardを正しく呼び出すことをテスト"""
         # Setup mock
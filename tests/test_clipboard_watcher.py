@@ -0,0 +1,73 @@
+import unittest
+
+from src.clipboard_backend import (
+    CHROMIUM_WEB_CUSTOM_DATA_TYPE,
+    PLAIN_TEXT_TYPE,
+    MemoryClipboardBackend,
+)
+from src.clipboard_watcher import ClipboardWatcher
+
+GOOGLE_DOCS_HTML = (
+    '<meta charset="utf-8"><b id="docs-internal-guid-abc">'
+    '<ul><li aria-level="1">A</li><ul><li aria-level="2">B</li></ul></ul></b>'
+)
+
+
+class TestClipboardWatcher(unittest.TestCase):
+    def test_convert_on_change(self):
+        """Google DocsのHTMLがコピーされたら変換して書き戻すことをテスト"""
+        backend = MemoryClipboardBackend()
+        converted = []
+        watcher = ClipboardWatcher(backend, on_convert=converted.append)
+
+        self.assertFalse(watcher.poll_once())
+
+        backend.copy_html(GOOGLE_DOCS_HTML)
+        self.assertTrue(watcher.poll_once())
+
+        self.assertEqual(backend.contents[PLAIN_TEXT_TYPE], "- A\n    - B")
+        self.assertIn(CHROMIUM_WEB_CUSTOM_DATA_TYPE, backend.contents)
+        self.assertEqual(converted, ["- A\n    - B"])
+        self.assertEqual(watcher.conversions, 1)
+
+    def test_skip_own_write(self):
+        """自分自身の書き込みで再度変換しないことをテスト"""
+        backend = MemoryClipboardBackend()
+        watcher = ClipboardWatcher(backend)
+
+        backend.copy_html(GOOGLE_DOCS_HTML)
+        self.assertTrue(watcher.poll_once())
+        self.assertFalse(watcher.poll_once())
+        self.assertEqual(watcher.conversions, 1)
+
+    def test_ignore_existing_and_other_html(self):
+        """起動前の内容とGoogle Docs以外のHTMLは変換しないことをテスト"""
+        backend = MemoryClipboardBackend()
+        backend.copy_html(GOOGLE_DOCS_HTML)
+        watcher = ClipboardWatcher(backend)
+
+        self.assertFalse(watcher.poll_once())
+
+        backend.copy_html("<ul><li>from another site</li></ul>")
+        self.assertFalse(watcher.poll_once())
+        self.assertEqual(watcher.conversions, 0)
+
+    def test_text_mode(self):
+        """text=Trueの場合はプレーンテキストのみを書き込むことをテスト"""
+        backend = MemoryClipboardBackend()
+        watcher = ClipboardWatcher(backend, text=True)
+
+        backend.copy_html(GOOGLE_DOCS_HTML)
+        watcher.poll_once()
+
+        self.assertEqual(backend.contents, {PLAIN_TEXT_TYPE: "- A\n    - B"})
+
+    def test_run_with_max_polls(self):
+        """runがmax_polls回で終了することをテスト"""
+        backend = MemoryClipboardBackend()
+        watcher = ClipboardWatcher(backend, interval=0)
+        backend.copy_html(GOOGLE_DOCS_HTML)
+
+        watcher.run(max_polls=3)
+
+        self.assertEqual(watcher.conversions, 1)
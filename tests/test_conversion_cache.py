@@ -0,0 +1,144 @@
+import sys
+import threading
+
+import pytest
+
+from src.conversion_cache import ConversionCache, cache_key
+from src.generate_result import GenerateResult
+from src.slack_list_generator import SlackListGenerator
+
+HTML = "<ul><li>Item 1</li><li>Item 2</li></ul>"
+
+
+def make_result(i):
+    return GenerateResult(
+        binary_data=bytes([i]) * 100,
+        plain_text=f"- {i}",
+        texty_json={"ops": [{"insert": str(i)}]},
+    )
+
+
+def test_cache_key_depends_on_html_and_options():
+    """キャッシュのキーがHTMLとオプションの両方に依存することをテスト"""
+    key = cache_key(HTML, engine="stream")
+
+    assert key == cache_key(HTML, engine="stream")
+    assert key != cache_key(HTML, engine="bs4")
+    assert key != cache_key(HTML + " ", engine="stream")
+
+
+def test_cache_key_depends_on_format_version(monkeypatch):
+    """変換結果の形式のバージョンを上げると以前のキーと一致しなくなることをテスト"""
+    import src.conversion_cache
+
+    key = cache_key(HTML, engine="stream")
+    monkeypatch.setattr(
+        src.conversion_cache,
+        "CACHE_FORMAT_VERSION",
+        src.conversion_cache.CACHE_FORMAT_VERSION + 1,
+    )
+
+    assert key != cache_key(HTML, engine="stream")
+
+
+def test_memory_lru_eviction():
+    """メモリ上のエントリが古い順に追い出されることをテスト"""
+    cache = ConversionCache(max_entries=2)
+    cache.put("a", make_result(1))
+    cache.put("b", make_result(2))
+    # aを参照してbを最も古いエントリにする
+    assert cache.get("a") is not None
+    cache.put("c", make_result(3))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats.evictions == 1
+    assert cache.stats.memory_hits == 3
+    assert cache.stats.misses == 1
+
+
+def test_disk_tier(tmp_path):
+    """ディスクキャッシュが別のインスタンスから読めることをテスト"""
+    ConversionCache(directory=tmp_path).put("a", make_result(1))
+
+    cache = ConversionCache(directory=tmp_path)
+    result = cache.get("a")
+
+    assert result == make_result(1)
+    assert cache.stats.disk_hits == 1
+    # 2回目はメモリから返す
+    cache.get("a")
+    assert cache.stats.memory_hits == 1
+
+
+def test_disk_size_bound(tmp_path):
+    """ディスクキャッシュの合計サイズが上限を超えないことをテスト"""
+    cache = ConversionCache(max_entries=1, directory=tmp_path, max_disk_bytes=400)
+    for i, key in enumerate("abcde"):
+        cache.put(key, make_result(i))
+
+    total = sum(p.stat().st_size for p in tmp_path.iterdir())
+    assert total <= 400
+    assert ConversionCache(directory=tmp_path).get("a") is None
+    assert ConversionCache(directory=tmp_path).get("e") == make_result(4)
+
+
+def test_corrupted_entry_is_a_miss(tmp_path):
+    """壊れたディスクエントリはミスとして扱うことをテスト"""
+    ConversionCache(directory=tmp_path).put("a", make_result(1))
+    next(tmp_path.iterdir()).write_bytes(b"\xff")
+
+    cache = ConversionCache(directory=tmp_path)
+
+    assert cache.get("a") is None
+    assert cache.stats.misses == 1
+
+
+def test_shared_between_threads(tmp_path):
+    """複数のスレッドから同時に読み書きしても、エントリと統計が壊れないことをテスト"""
+    cache = ConversionCache(max_entries=4, directory=tmp_path, max_disk_bytes=2000)
+    errors = []
+
+    def work(offset):
+        try:
+            for i in range(300):
+                key = "abcdefgh"[(i + offset) % 8]
+                if cache.get(key) is None:
+                    cache.put(key, make_result(ord(key)))
+        except Exception as e:
+            errors.append(e)
+
+    # スレッドの切り替えを頻繁にして、LRUの更新と追い出しが交互に実行されるようにする
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert errors == []
+    stats = cache.stats
+    assert stats.memory_hits + stats.disk_hits + stats.misses == 8 * 300
+    assert len(cache._memory) <= 4
+    assert sum(p.stat().st_size for p in tmp_path.glob("*.cache")) <= 2000
+    assert sum(cache._disk.values()) <= 2000
+
+
+@pytest.mark.parametrize("engine", ["stream", "bs4"])
+def test_generator_uses_cache(engine):
+    """キャッシュを指定したジェネレータが同じ結果を再利用することをテスト"""
+    cache = ConversionCache()
+    generator = SlackListGenerator(engine=engine, cache=cache)
+
+    first = generator.generate(HTML)
+    second = generator.generate(HTML)
+
+    assert second is first
+    assert first == SlackListGenerator(engine=engine).generate(HTML)
+    assert cache.stats.misses == 1
+    assert cache.stats.hits == 1
@@ -0,0 +1,439 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from benchmarks.google_docs_html import generate_google_docs_html
+from src.conversion_cache import ConversionCache
+from src.dialects import (
+    GENERIC,
+    GOOGLE_DOCS,
+    SNIFF_CHARS,
+    WORD,
+    has_word_lists,
+    parse_dialect_items,
+    resolve_dialect,
+    sniff_dialect,
+)
+from src.google_docs_parser import GoogleDocsListParser, ItemMemo
+from src.slack_list_generator import SlackListGenerator
+from src.stream_list_parser import StreamListParser
+from src.word_list_parser import WordListParser
+
+FIXTURES = Path(__file__).parent
+# 各エディタで同じ内容を作成してコピーしたHTML
+DIALECT_FIXTURES = {
+    GOOGLE_DOCS: "google_docs_list.html",
+    WORD: "word_list.html",
+}
+EXPECTED_TEXT = """議事録
+- リリースの確認 & 対応
+    - Slackに共有
+- レビュー
+1. Deploy
+    1. staging
+    2. production
+2. Monitor"""
+
+
+def read_fixture(dialect):
+    return (FIXTURES / DIALECT_FIXTURES[dialect]).read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("dialect", list(DIALECT_FIXTURES))
+def test_sniff_fixture(dialect):
+    """各エディタのHTMLから生成元を判定できることをテスト"""
+    assert sniff_dialect(read_fixture(dialect)) == dialect
+
+
+def test_sniff_generic():
+    """生成元の目印がないHTMLや、目印が先頭から離れている場合は汎用として扱うことをテスト"""
+    assert sniff_dialect((FIXTURES / "sample_list.html").read_text()) == GENERIC
+    assert sniff_dialect("") == GENERIC
+    padding = "<p>x</p>" * (SNIFF_CHARS // 8)
+    assert sniff_dialect(padding + '<b id="docs-internal-guid-1">') == GENERIC
+    assert sniff_dialect("<p>Microsoft Wordで作成</p>") == GENERIC
+
+
+@pytest.mark.parametrize("dialect", list(DIALECT_FIXTURES))
+def test_fixture_conversion(dialect):
+    """どのエディタからコピーしても同じ階層と番号に変換されることをテスト"""
+    result = SlackListGenerator().generate(read_fixture(dialect))
+    assert result.plain_text == EXPECTED_TEXT
+    indents = [
+        op["attributes"].get("indent", 0)
+        for op in result.texty_json["ops"]
+        if "attributes" in op
+    ]
+    assert indents == [0, 1, 0, 0, 1, 1, 0]
+
+
+def test_generic_parser_flattens_dialect():
+    """汎用の解析ではWordのリストの階層が失われることをテスト (専用のパーサーが必要な理由)"""
+    html = read_fixture(WORD)
+    generic = SlackListGenerator(dialect=GENERIC).generate(html)
+    assert generic.plain_text != EXPECTED_TEXT
+    assert all(list_type is None for _, list_type, _, _ in generic._items)
+
+
+@pytest.mark.parametrize("engine", ["stream", "bs4"])
+def test_dialect_parser_used_for_every_engine(engine):
+    """Wordはエンジンに関わらず専用のパーサーで解析されることをテスト"""
+    result = SlackListGenerator(engine=engine).generate(read_fixture(WORD))
+    assert result.plain_text == EXPECTED_TEXT
+
+
+@pytest.mark.parametrize("engine", ["stream", "bs4"])
+@pytest.mark.parametrize("dialect", ["auto", WORD])
+def test_word_native_lists(engine, dialect):
+    """<ul>/<ol> で書き出されたWordのリストは汎用のパーサーで階層を保って変換されることをテスト"""
+    html = (FIXTURES / "word_native_list.html").read_text(encoding="utf-8")
+    assert sniff_dialect(html) == WORD
+    assert not has_word_lists(html)
+    assert has_word_lists(read_fixture(WORD))
+
+    result = SlackListGenerator(engine=engine, dialect=dialect).generate(html)
+    assert result.plain_text == EXPECTED_TEXT
+    assert resolve_dialect(html) == resolve_dialect(html, WORD) == GENERIC
+    assert resolve_dialect(read_fixture(WORD)) == WORD
+
+
+def test_word_lists_checked_once(monkeypatch):
+    """Wordの文書で mso-list の段落の有無を1回だけ調べることをテスト"""
+    import src.dialects
+
+    calls = []
+    original = src.dialects.has_word_lists
+
+    def counting(html_content):
+        calls.append(html_content)
+        return original(html_content)
+
+    monkeypatch.setattr(src.dialects, "has_word_lists", counting)
+    html = read_fixture(WORD)
+    assert SlackListGenerator().generate(html).plain_text == EXPECTED_TEXT
+    assert len(calls) == 1
+
+
+def test_notion_export_uses_generic_parser():
+    """<ul>/<li> でリストを書き出すNotionのHTMLは、汎用のパーサーで階層を保って変換されることをテスト"""
+    html = (
+        '<ul id="a" class="bulleted-list"><li style="list-style-type:disc">親'
+        '<ul id="b" class="bulleted-list"><li style="list-style-type:circle">子</li>'
+        "</ul></li></ul>"
+        '<ol type="1" id="c" class="numbered-list" start="1"><li>一</li></ol>'
+    )
+    assert resolve_dialect(html) == GENERIC
+    assert SlackListGenerator().generate(html).plain_text == "- 親\n    - 子\n1. 一"
+
+
+def test_unknown_dialect():
+    """未対応のdialectを指定するとエラーになることをテスト"""
+    with pytest.raises(ValueError):
+        SlackListGenerator(dialect="pages")
+    with pytest.raises(ValueError):
+        parse_dialect_items("", "pages")
+
+
+def test_cache_key_includes_forced_dialect():
+    """dialectを指定した場合は自動判定の結果とキャッシュを共有しないことをテスト"""
+    cache = ConversionCache()
+    html = read_fixture(WORD)
+    assert SlackListGenerator(cache=cache).generate(html).plain_text == EXPECTED_TEXT
+    forced = SlackListGenerator(cache=cache, dialect=GENERIC).generate(html)
+    assert forced.plain_text != EXPECTED_TEXT
+    assert cache.stats.misses == 2
+
+
+# --- Google Docs ---
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_google_docs_matches_stream_parser(seed):
+    """Google Docs向けの経路が汎用のパーサーと同じ結果を返すことをテスト"""
+    html = generate_google_docs_html(300, max_depth=5, seed=seed, ordered_ratio=0.5)
+    assert GoogleDocsListParser().parse_items(html) == StreamListParser().parse_items(
+        html
+    )
+
+
+@pytest.mark.parametrize(
+    "html",
+    [
+        # まとめて処理できない <li> (ネストしたリスト・ブロック要素・対応しない終了タグ)
+        "<ul><li>a<ul><li>b</li></ul></li><li>c</li></ul>",
+        "<ul><li><div>a</div>b</li></ul>",
+        "<b><ul><li>a</b>b</li><li>c</li></ul>",
+        "<ul><li>a</span>b</li></ul>",
+        # 空要素タグと、後から現れるその終了タグ
+        "<ul><li>a<br>b<br/>c<img src=x></li></ul></br>d",
+        # aria-levelの書き方
+        "<ul><li aria-level='2'>a</li><li ARIA-LEVEL=\"3\">b</li>"
+        '<li aria-level="2" aria-level="x">c</li><li aria-level="0x">d</li></ul>',
+        # 参照と空白
+        "<ul><li><span>a</span>  \n <span>&amp; b</span> &#39;c&#39;</li></ul>",
+        "<pre><ul><li>  a  </li></ul></pre>",
+        "<ul><li>a &amp b</li></ul>",
+    ],
+)
+def test_google_docs_fallback_matches_stream_parser(html):
+    """Google Docs向けの経路の条件を満たさない <li> でも汎用のパーサーと同じ結果になることをテスト"""
+    assert GoogleDocsListParser().parse(html) == StreamListParser().parse(html)
+
+
+def test_google_docs_random_markup_matches_stream_parser():
+    """崩れたタグを含むランダムなHTMLで、汎用のパーサーと同じ結果になることをテスト"""
+    rng = random.Random(2)
+    pieces = [
+        "<ul>",
+        "</ul>",
+        "<ol>",
+        "</ol>",
+        "<li>",
+        "</li>",
+        '<li aria-level="2">',
+        "<li aria-level='3' class=x>",
+        "<LI Aria-Level=1/>",
+        "</LI>",
+        '<span style="a:b">',
+        "</span>",
+        "<p>",
+        "</p>",
+        "<b>",
+        "</b>",
+        "<div>",
+        "</div>",
+        "<pre>",
+        "</pre>",
+        "<br>",
+        "</br>",
+        "<br/>",
+        "text",
+        " ",
+        "\n",
+        "&amp;",
+        "&amp",
+        "&",
+        "<",
+        '"',
+        "<!-- c -->",
+    ]
+    for _ in range(3000):
+        html = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 25)))
+        assert GoogleDocsListParser().parse(html) == StreamListParser().parse(html), (
+            html
+        )
+
+
+class CountingParser(GoogleDocsListParser):
+    """<li> の中身を切り出した回数を数えるパーサー"""
+
+    scans = 0
+
+    def _scan_item(self, attrs, inner):
+        CountingParser.scans += 1
+        return super()._scan_item(attrs, inner)
+
+
+def test_incremental_reuses_unchanged_items():
+    """前回と同じ <li> は切り出しを省略し、編集後の文書を通常の解析と同じ結果に変換することをテスト"""
+    html = generate_google_docs_html(300, max_depth=5, ordered_ratio=0.5)
+    memo = ItemMemo()
+    CountingParser(memo).parse_items(html)
+    CountingParser.scans = 0
+
+    # 1つの項目を編集し、番号付きリストの項目を1つ削除する
+    edited = html.replace("review", "reviewed", 1)
+    start = edited.index("<li", edited.index("<ol"))
+    edited = edited[:start] + edited[edited.index("</li>", start) + 5 :]
+    items = CountingParser(memo).parse_items(edited)
+
+    assert items == StreamListParser().parse_items(edited)
+    assert CountingParser.scans == 1
+    assert items == CountingParser(memo).parse_items(edited)
+
+
+def test_incremental_random_markup_matches_stream_parser():
+    """前回の結果を引き継ぎながらランダムなHTMLを解析しても、通常の解析と同じ結果になることをテスト"""
+    rng = random.Random(4)
+    pieces = [
+        "<ul>",
+        "</ul>",
+        "<ol>",
+        "</ol>",
+        "<li>a</li>",
+        '<li aria-level="2">b <span>c</span></li>',
+        "<li>a<br>b</li>",
+        "<li>&amp; d</li>",
+        "<li>  </li>",
+        "<li>",
+        "</li>",
+        "<pre>",
+        "</pre>",
+        "<div>",
+        "</div>",
+        "<p>x</p>",
+    ]
+    memo = ItemMemo()
+    for _ in range(1000):
+        html = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 25)))
+        assert GoogleDocsListParser(memo).parse(html) == StreamListParser().parse(
+            html
+        ), html
+
+
+@pytest.mark.parametrize(
+    "html",
+    [
+        read_fixture(GOOGLE_DOCS),
+        "<p>x</p><ol><li>a</li><li>b<ul><li>c</li></ul></li><li>d</li></ol>",
+    ],
+)
+def test_incremental_generator(html):
+    """incremental=Trueのジェネレータが同じ文書と編集後の文書を通常と同じ結果に変換することをテスト"""
+    generator = SlackListGenerator(incremental=True)
+    for _ in range(2):
+        assert generator.generate(html) == SlackListGenerator().generate(html)
+    assert generator.item_memo.entries
+    with pytest.raises(ValueError):
+        SlackListGenerator(engine="bs4", incremental=True)
+    with pytest.raises(ValueError):
+        SlackListGenerator(incremental=True, parallel=True)
+
+
+# --- Word ---
+
+
+def word_paragraph(text, level=1, marker="·", list_id=0, lfo=1):
+    return (
+        f"<p class=MsoListParagraph style='mso-list:l{list_id} level{level} lfo{lfo}'>"
+        f"<![if !supportLists]><span style='font-family:Symbol'>{marker}"
+        f"<span style='font:7.0pt \"Times New Roman\"'>&nbsp;&nbsp; </span></span>"
+        f"<![endif]>{text}<o:p></o:p></p>"
+    )
+
+
+def word_items(html):
+    return list(WordListParser().parse_items(html))
+
+
+def test_word_markers():
+    """行頭記号から箇条書きと番号付きリストを判別することをテスト"""
+    html = "".join(
+        word_paragraph(f"item{i}", marker=marker)
+        for i, marker in enumerate(["1.", "2)", "iv.", "(3)", "·", "o", "§", "-", "•"])
+    )
+    types = [list_type for _, list_type, _, _ in word_items(html)]
+    assert types == ["ordered"] * 4 + ["bullet"] * 5
+
+
+def test_word_mso_list_ignore():
+    """<![if !supportLists]> のない mso-list:Ignore の行頭記号を除外することをテスト"""
+    html = (
+        "<p style='mso-list:l0 level2 lfo1'><span style='mso-list:Ignore'>1."
+        "<br><span>&nbsp;</span></span>Text <b>bold</b></p>"
+    )
+    assert word_items(html) == [("Text bold", "ordered", 1, 1)]
+
+
+def test_word_numbering():
+    """番号が階層ごとに数えられ、リストの切り替えや段落で振り直されることをテスト"""
+    html = (
+        word_paragraph("a", marker="1.")
+        + word_paragraph("b", level=2, marker="a.")
+        + word_paragraph("c", marker="2.")
+        + word_paragraph("d", level=2, marker="a.")
+        + word_paragraph("e", marker="1.", lfo=2)
+        + "<p class=MsoNormal>段落</p>"
+        + word_paragraph("f", marker="1.", lfo=2)
+        + word_paragraph("g", marker="·")
+    )
+    assert word_items(html) == [
+        ("a", "ordered", 0, 1),
+        ("b", "ordered", 1, 1),
+        ("c", "ordered", 0, 2),
+        ("d", "ordered", 1, 1),
+        ("e", "ordered", 0, 1),
+        ("段落", None, 0, 0),
+        ("f", "ordered", 0, 1),
+        ("g", "bullet", 0, 1),
+    ]
+
+
+def test_word_skips_head_and_empty_paragraphs():
+    """head・style・コメントと空の段落を出力しないことをテスト"""
+    html = (
+        "<html><head><title>T</title><style><!-- p {} --></style></head><body>"
+        "<!--StartFragment--><p class=MsoNormal><o:p>&nbsp;</o:p></p>"
+        "<p class=MsoNormal>a\r\nb</p>" + word_paragraph("") + "</body></html>"
+    )
+    assert word_items(html) == [("a b", None, 0, 0)]
+    assert word_items("") == [("", None, 0, 0)]
+
+
+# --- 正規表現による字句解析 ---
+
+
+class WordHTMLParserOnly(WordListParser):
+    """字句解析の高速な経路を使わないパーサー"""
+
+    def _feed_fast(self, html_content):
+        return False
+
+
+def test_fixture_uses_fast_path():
+    """コピーしたHTMLがhtml.parserを通さずに、html.parserと同じ結果に解析されることをテスト"""
+    html = read_fixture(WORD)
+    parser = WordListParser()
+    parser._begin()
+    assert parser._feed_fast(html)
+    assert WordListParser().parse_items(html) == WordHTMLParserOnly().parse_items(html)
+
+
+def test_random_markup_matches_html_parser():
+    """崩れたタグやコメントを含むランダムなHTMLで、html.parserと同じ結果になることをテスト"""
+    rng = random.Random(3)
+    pieces = [
+        "<p style='mso-list:l0 level1 lfo1'>",
+        '<p style="mso-list:l1 level2 lfo2">',
+        "<p class=MsoNormal>",
+        "</p>",
+        "<span style='mso-list:Ignore'>",
+        "<span>",
+        "</span>",
+        "<![if !supportLists]>",
+        "<![endif]>",
+        "<![if a]b]>",
+        "<div class='pseudoBefore'>",
+        "<div>",
+        "</div>",
+        "<br>",
+        "<br/>",
+        "<o:p>",
+        "</o:p>",
+        "<style>p{}</style>",
+        "<style><!-- a -->",
+        "</style>",
+        "<title>t</title>",
+        "<head>",
+        "</head>",
+        "<!-- c -->",
+        "<!-- a -- b -->",
+        "<!--->",
+        "1.",
+        "·",
+        "text",
+        " ",
+        "\n",
+        "&nbsp;",
+        "&amp",
+        "&",
+        "<",
+        ">",
+        "'",
+    ]
+    for _ in range(3000):
+        html = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 25)))
+        assert WordListParser().parse_items(html) == WordHTMLParserOnly().parse_items(
+            html
+        ), html
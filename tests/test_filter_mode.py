@@ -0,0 +1,88 @@
+import io
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.filter_mode import read_html_file, read_html_stream, write_result
+from src.pickle_reader import PickleReader
+from src.slack_list_generator import SlackListGenerator
+
+HTML = (
+    '<p>前</p><ol><li>a &amp; b</li><li>😀<ul><li aria-level="2">c</li></ul></li></ol>'
+)
+MAIN = Path(__file__).resolve().parent.parent / "main.py"
+
+
+def test_read_html_file(tmp_path):
+    """メモリマップしたファイルを読み込めることをテスト (空のファイルを含む)"""
+    path = tmp_path / "a.html"
+    path.write_text(HTML, encoding="utf-8")
+    empty = tmp_path / "empty.html"
+    empty.write_bytes(b"")
+
+    assert read_html_file(str(path)) == HTML
+    assert read_html_file(str(empty)) == ""
+
+
+def test_read_html_stream(tmp_path):
+    """パイプ相当のストリームと、リダイレクトされたファイルの両方から読み込めることをテスト"""
+    path = tmp_path / "a.html"
+    path.write_text(HTML, encoding="utf-8")
+
+    assert read_html_stream(io.BytesIO(HTML.encode("utf-8"))) == HTML
+    with open(path, "rb") as f:
+        assert read_html_stream(f) == HTML
+
+
+def test_invalid_utf8_is_decoded_once(tmp_path):
+    """メモリマップしたファイルのデコードに失敗した場合は読み直さずにエラーにすることをテスト"""
+    path = tmp_path / "invalid.html"
+    path.write_bytes(b"<p>\xff</p>")
+
+    with pytest.raises(UnicodeDecodeError):
+        read_html_file(str(path))
+    with open(path, "rb") as f:
+        with pytest.raises(UnicodeDecodeError):
+            read_html_stream(f)
+        # マップした内容だけをデコードし、ストリームからは読み込んでいない
+        assert f.tell() == 0
+
+
+@pytest.mark.parametrize("output_format", ["text", "texty", "chromium"])
+def test_write_result(output_format, tmp_path):
+    """シークできない出力とファイルのどちらにも同じ内容を書き出すことをテスト"""
+    generator = SlackListGenerator()
+    expected = generator.generate(HTML)
+    pipe = io.BufferedWriter(io.BytesIO())
+    pipe.seekable = lambda: False  # type: ignore
+
+    with open(tmp_path / "out", "wb") as f:
+        size = write_result(generator.generate(HTML), output_format, f)
+    output = (tmp_path / "out").read_bytes()
+
+    assert size == len(output)
+    if output_format == "text":
+        assert output == expected.plain_text.encode("utf-8") + b"\n"
+    elif output_format == "chromium":
+        assert output == expected.binary_data
+        assert PickleReader(output).plain_text() == expected.plain_text
+    assert write_result(generator.generate(HTML), output_format, pipe) == size
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        write_result(SlackListGenerator().generate(HTML), "html", io.BytesIO())
+
+
+def test_pipeline(tmp_path):
+    """標準入力と標準出力をパイプにして実行できることをテスト"""
+    completed = subprocess.run(
+        [sys.executable, str(MAIN), "convert", "-f", "chromium"],
+        input=HTML.encode("utf-8"),
+        stdout=subprocess.PIPE,
+        check=True,
+    )
+
+    assert completed.stdout == SlackListGenerator().generate(HTML).binary_data
@@ -1,5 +1,9 @@
+import io
 import unittest
+
 from src.generate_result import GenerateResult
+from src.stream_list_parser import StreamListParser
+from src.tracer import Tracer, use_tracer
 
 
 class TestGenerateResult(unittest.TestCase):
@@ -16,3 +20,79 @@ class TestGenerateResult(unittest.TestCase):
         self.assertEqual(result.binary_data, binary_data)
         self.assertEqual(result.plain_text, plain_text)
         self.assertEqual(result.texty_json, texty_json)
+
+    def test_lazy_fields(self):
+        """各表現が最初にアクセスされたときにだけ生成されることをテスト"""
+        items = StreamListParser().parse_items("<ul><li>a</li></ul>")
+        result = GenerateResult(items=items)
+
+        tracer = Tracer()
+        with use_tracer(tracer):
+            self.assertEqual(result.plain_text, "- a")
+            self.assertEqual(result.plain_text, "- a")
+        self.assertEqual([r.name for r in tracer.records], ["ops_build"])
+
+        with use_tracer(tracer):
+            binary_data = result.binary_data
+            self.assertIs(result.binary_data, binary_data)
+        self.assertEqual(
+            [r.name for r in tracer.records],
+            ["ops_build", "json_serialize", "pickle_write"],
+        )
+
+    def test_lazy_matches_eager(self):
+        """項目から生成した結果が、各表現を渡した結果と一致することをテスト"""
+        items = StreamListParser().parse_items("<p>x</p><ol><li>a</li></ol>")
+        lazy = GenerateResult(items=items)
+        eager = GenerateResult(plain_text=lazy.plain_text, texty_json=lazy.texty_json)
+
+        self.assertEqual(lazy, eager)
+        self.assertEqual(lazy.binary_data, eager.binary_data)
+
+    def test_write_binary(self):
+        """sinkに書き込んだバイト列がbinary_dataと一致し、binary_dataを生成しないことをテスト"""
+        html = "<p>x</p><ol><li>a</li><li>b<ul><li>c</li></ul></li></ol>"
+        expected = GenerateResult(
+            items=StreamListParser().parse_items(html)
+        ).binary_data
+
+        result = GenerateResult(items=StreamListParser().parse_items(html))
+        sink = io.BytesIO()
+        self.assertEqual(result.write_binary(sink), len(expected))
+        self.assertEqual(sink.getvalue(), expected)
+        self.assertIsNone(result._binary_data)
+
+        # 生成済みの表現はそのまま使う
+        eager = GenerateResult(
+            plain_text=result.plain_text, texty_json=result.texty_json
+        )
+        sink = io.BytesIO()
+        eager.write_binary(sink)
+        self.assertEqual(sink.getvalue(), expected)
+
+    def test_requires_items_or_fields(self):
+        """itemsもplain_text・texty_jsonも無い場合はエラーになることをテスト"""
+        with self.assertRaises(ValueError):
+            GenerateResult(binary_data=b"")
+
+    def test_plain_text_path_skips_rich_text_modules(self):
+        """プレーンテキストだけを生成する場合はリッチテキスト用のモジュールを読み込まないことをテスト"""
+        import subprocess
+        import sys
+        from pathlib import Path
+
+        code = (
+            "import sys\n"
+            "from src.slack_list_generator import SlackListGenerator\n"
+            "SlackListGenerator().generate_plain_text('<ul><li>a</li></ul>')\n"
+            "print(sorted({'src.texty_encoder', 'src.pickle_writer', 'json'}"
+            " & set(sys.modules)))\n"
+        )
+        process = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=Path(__file__).resolve().parent.parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(process.stdout.strip(), "[]")
@@ -0,0 +1,87 @@
+from benchmarks.google_docs_html import generate_google_docs_html
+from src.slack_list_generator import SlackListGenerator
+
+
+def test_generated_html_structure():
+    """ベンチマーク用のHTMLがGoogle Docsの構造を持ち、全項目が変換されることをテスト"""
+    html = generate_google_docs_html(200, max_depth=5, seed=1)
+
+    assert html.startswith('<meta charset="utf-8"><b style="font-weight:normal;"')
+    assert "docs-internal-guid-" in html
+    assert html.count("<li ") == 200
+
+    plain_text, texty_json = SlackListGenerator()._parse_html(html)
+    lines = plain_text.split("\n")
+    assert len(lines) == 200
+    indents = [op["attributes"].get("indent", 0) for op in texty_json["ops"][1::2]]
+    assert max(indents) == 4
+    assert min(indents) == 0
+
+
+def test_generated_html_is_deterministic():
+    """同じシードからは同じHTMLが生成されることをテスト"""
+    assert generate_google_docs_html(50, seed=3) == generate_google_docs_html(
+        50, seed=3
+    )
+
+
+def test_clipboard_latency_benchmark():
+    """クリップボードのレイテンシ計測がメモリ上のバックエンドで動くことをテスト"""
+    from benchmarks.clipboard_latency import measure_backend
+    from src.clipboard_backend import MemoryClipboardBackend
+
+    results = measure_backend(MemoryClipboardBackend(), items=10, repeat=3)
+
+    assert set(results) == {
+        "read_bytes",
+        "read_html",
+        "read_text",
+        "write_text",
+        "write_rich_text",
+    }
+    assert all(stats["min"] <= stats["p99"] for stats in results.values())
+
+
+def test_benchmark_compare():
+    """ベンチマークの比較がマシンの速さの比で換算し、小さな差を無視することをテスト"""
+    from benchmarks.run_benchmarks import compare
+
+    def run(calibration, **results):
+        return {
+            "calibration_seconds": calibration,
+            "results": {
+                key.replace("_", "/"): {"seconds": seconds, "peak_bytes": peak}
+                for key, (seconds, peak) in results.items()
+            },
+        }
+
+    baseline = run(0.01, stream_10_parse=(0.0001, 1000), stream_1000_parse=(0.02, 1000))
+
+    # 2倍遅いマシンでの2倍の実行時間は回帰とみなさない
+    slow = run(0.02, stream_1000_parse=(0.04, 2000))
+    assert compare(slow, baseline, 0.25, 0.001) == [
+        "stream/1000/parse peak_bytes: 2.00x of baseline"
+    ]
+    # 差がmin_seconds未満の短い計測は、比が大きくても回帰とみなさない
+    same = run(0.01, stream_10_parse=(0.0009, 1000), stream_1000_parse=(0.04, 1000))
+    assert compare(same, baseline, 0.25, 0.001) == [
+        "stream/1000/parse seconds: 2.00x of baseline"
+    ]
+    assert compare(same, baseline, 0.25, 0)[0] == (
+        "stream/10/parse seconds: 9.00x of baseline"
+    )
+
+
+def test_dialect_html_structure():
+    """ベンチマーク用のWordのHTMLが判定され、全項目が階層付きで変換されることをテスト"""
+    from benchmarks.dialect_html import generate_word_html
+    from src.dialects import WORD, sniff_dialect
+
+    html = generate_word_html(200, max_depth=5, seed=1)
+    assert sniff_dialect(html) == WORD
+    assert generate_word_html(200, max_depth=5, seed=1) == html
+
+    items = SlackListGenerator()._parse_items(html)
+    list_items = [item for item in items if item[1] is not None]
+    assert len(list_items) == 200
+    assert max(level for _, _, level, _ in list_items) == 4
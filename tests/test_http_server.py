@@ -0,0 +1,145 @@
+import http.client
+import json
+import socket
+import threading
+
+import pytest
+
+from src.http_server import (
+    CHROMIUM_MEDIA_TYPE,
+    PLAIN_TEXT_MEDIA_TYPE,
+    TEXTY_MEDIA_TYPE,
+    ConversionHTTPServer,
+    negotiate,
+)
+from src.pickle_reader import PickleReader
+from src.slack_list_generator import SlackListGenerator
+
+HTML = "<ul><li>a<ul><li>b</li></ul></li></ul>"
+
+
+@pytest.fixture
+def start_server():
+    servers = []
+
+    def start(**options):
+        server = ConversionHTTPServer(("127.0.0.1", 0), **options)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        servers.append((server, thread))
+        return server
+
+    yield start
+    for server, thread in servers:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def connect(server) -> http.client.HTTPConnection:
+    return http.client.HTTPConnection(*server.server_address, timeout=5)
+
+
+def convert(connection, body: bytes, accept: str | None = None):
+    headers = {"Content-Type": "text/html; charset=utf-8"}
+    if accept is not None:
+        headers["Accept"] = accept
+    connection.request("POST", "/convert", body=body, headers=headers)
+    response = connection.getresponse()
+    return response, response.read()
+
+
+@pytest.mark.parametrize(
+    "accept, expected",
+    [
+        (None, TEXTY_MEDIA_TYPE),
+        ("text/plain", PLAIN_TEXT_MEDIA_TYPE),
+        ("text/html, text/*;q=0.5", PLAIN_TEXT_MEDIA_TYPE),
+        ("application/octet-stream", CHROMIUM_MEDIA_TYPE),
+        ("text/plain;q=0.5, application/json", TEXTY_MEDIA_TYPE),
+        ("text/plain;q=0, */*", TEXTY_MEDIA_TYPE),
+        ("image/png", None),
+    ],
+)
+def test_negotiate(accept, expected):
+    """Acceptヘッダから返すメディアタイプが選ばれることをテスト"""
+    assert negotiate(accept) == expected
+
+
+def test_convert_content_negotiation(start_server):
+    """Acceptヘッダに応じてテキスト・texty JSON・Chromium形式を返すことをテスト"""
+    server = start_server()
+    expected = SlackListGenerator().generate(HTML)
+    connection = connect(server)
+
+    response, body = convert(connection, HTML.encode(), "text/plain")
+    assert response.status == 200
+    assert response.getheader("Content-Type") == "text/plain; charset=utf-8"
+    assert body.decode() == expected.plain_text
+
+    response, body = convert(connection, HTML.encode(), "application/json")
+    assert response.status == 200
+    assert json.loads(body) == expected.texty_json
+
+    response, body = convert(connection, HTML.encode(), CHROMIUM_MEDIA_TYPE)
+    assert response.status == 200
+    assert body == expected.binary_data
+    assert PickleReader(body).plain_text() == expected.plain_text
+
+
+def test_keep_alive_reuses_connection(start_server):
+    """1つの接続で複数のリクエストを処理することをテスト"""
+    server = start_server(workers=1)
+    connection = connect(server)
+
+    for _ in range(3):
+        response, _ = convert(connection, HTML.encode())
+        assert response.status == 200
+        assert not response.will_close
+    sock = connection.sock
+    convert(connection, HTML.encode())
+    assert connection.sock is sock
+
+
+def test_request_errors(start_server):
+    """不正なリクエストにエラーを返すことをテスト"""
+    server = start_server(max_body_bytes=100)
+
+    connection = connect(server)
+    response, _ = convert(connection, b"<p>" + b"x" * 200 + b"</p>")
+    assert response.status == 413
+    assert response.will_close
+
+    connection = connect(server)
+    response, _ = convert(connection, HTML.encode(), "image/png")
+    assert response.status == 406
+
+    connection.request("POST", "/other", body=b"")
+    response = connection.getresponse()
+    response.read()
+    assert response.status == 404
+
+    connection.request("GET", "/healthz")
+    response = connection.getresponse()
+    assert (response.status, response.read()) == (200, b"ok\n")
+
+
+def test_queue_depth_limit(start_server):
+    """ワーカーとキューが埋まっている場合に503を返すことをテスト"""
+    server = start_server(workers=1, queue_depth=1, keep_alive_timeout=2)
+
+    # 1つ目の接続がkeep-aliveでワーカーを占有し、2つ目の接続はキューで待つ
+    busy = connect(server)
+    response, _ = convert(busy, HTML.encode())
+    assert response.status == 200
+    waiting = socket.create_connection(server.server_address)
+
+    rejected = socket.create_connection(server.server_address)
+    rejected.settimeout(5)
+    response = rejected.recv(1024)
+
+    assert response.startswith(b"HTTP/1.1 503 ")
+    assert server.rejected == 1
+    rejected.close()
+    waiting.close()
+    busy.close()
@@ -0,0 +1,70 @@
+import pickle
+
+import pytest
+
+from src.list_items import ListItems
+from src.slack_list_generator import SlackListGenerator
+
+TUPLES = [
+    ("前", None, 0, 0),
+    ("a", "bullet", 0, 1),
+    ("", "ordered", 1, 1),
+    ("😀 b", "ordered", 1, 2),
+]
+
+
+def test_round_trip():
+    """追加した項目が同じ順序・内容で取り出せることをテスト"""
+    items = ListItems.from_tuples(TUPLES)
+
+    assert len(items) == 4
+    assert list(items) == TUPLES
+    assert items == TUPLES
+    assert items[3] == ("😀 b", "ordered", 1, 2)
+    assert items[-2] == ("", "ordered", 1, 1)
+    assert items.text == "前a😀 b"
+    assert list(items.ends) == [1, 2, 2, 5]
+
+
+def test_append_after_read():
+    """テキストを参照した後に項目を追加できることをテスト"""
+    items = ListItems.from_tuples(TUPLES[:2])
+    assert items.text == "前a"
+
+    items.append("c", "bullet", 2, 1)
+
+    assert items.text == "前ac"
+    assert items[-1] == ("c", "bullet", 2, 1)
+
+
+def test_extend():
+    """別のListItemsの項目を、テキストの位置をずらして連結できることをテスト"""
+    items = ListItems.from_tuples(TUPLES[:2])
+
+    items.extend(ListItems.from_tuples(TUPLES[2:]))
+
+    assert items == ListItems.from_tuples(TUPLES)
+    assert list(items.ends) == [1, 2, 2, 5]
+
+
+def test_pickle():
+    """プロセス間で受け渡せることをテスト"""
+    items = ListItems.from_tuples(TUPLES)
+
+    assert pickle.loads(pickle.dumps(items)) == items
+
+
+@pytest.mark.parametrize("engine", ["stream", "bs4"])
+def test_engines_share_representation(engine):
+    """どちらのエンジンも同じ中間表現を返すことをテスト"""
+    html = "<p>前</p><ol><li>a<ul><li>b</li></ul></li><li>c</li></ol>"
+
+    items = SlackListGenerator(engine=engine)._parse_items(html)
+
+    assert isinstance(items, ListItems)
+    assert items == [
+        ("前", None, 0, 0),
+        ("a", "ordered", 0, 1),
+        ("b", "bullet", 1, 1),
+        ("c", "ordered", 0, 2),
+    ]
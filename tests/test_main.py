@@ -1,7 +1,9 @@
+import json
 import unittest
 from unittest.mock import patch, MagicMock
 import sys
 import os
+import tempfile
 from click.testing import CliRunner
 
 # srcディレクトリをパスに追加して、スクリプト内のインポート(from slack_list_generator import ...)が解決できるようにする
@@ -10,12 +12,19 @@ sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
 from main import main as docs_main  # noqa: E402
+from src.clipboard_backend import (  # noqa: E402
+    CHROMIUM_WEB_CUSTOM_DATA_TYPE,
+    HTML_TYPE,
+    PLAIN_TEXT_TYPE,
+)
+from src.slack_list_generator import SlackListGenerator  # noqa: E402
+from src.socket_server import ConversionSocketServer  # noqa: E402
 
 
 class TestMain(unittest.TestCase):
-    @patch("main.ClipboardUtil.get_clipboard_html")
-    @patch("main.ClipboardUtil.set_rich_text")
-    @patch("main.SlackListGenerator")
+    @patch("src.clipboard_util.ClipboardUtil.get_clipboard_html")
+    @patch("src.clipboard_util.ClipboardUtil.set_rich_text")
+    @patch("src.slack_list_generator.SlackListGenerator")
     def test_main_success(
         self, mock_generator_class, mock_set_rich_text, mock_get_clipboard
     ):
@@ -40,9 +49,9 @@ class TestMain(unittest.TestCase):
         mock_instance.generate.assert_called_with("<html></html>")
         mock_set_rich_text.assert_called_with(b"binary", "plain")
 
-    @patch("main.ClipboardUtil.get_clipboard_html")
-    @patch("main.ClipboardUtil.set_text")
-    @patch("main.SlackListGenerator")
+    @patch("src.clipboard_util.ClipboardUtil.get_clipboard_html")
+    @patch("src.clipboard_util.ClipboardUtil.set_text")
+    @patch("src.slack_list_generator.SlackListGenerator")
     def test_main_text_option(
         self, mock_generator_class, mock_set_text, mock_get_clipboard
     ):
@@ -51,10 +60,7 @@ class TestMain(unittest.TestCase):
         mock_get_clipboard.return_value = "<html></html>"
 
         mock_instance = MagicMock()
-        mock_result = MagicMock()
-        mock_result.plain_text = "plain text output"
-        mock_result.binary_data = b"binary"
-        mock_instance.generate.return_value = mock_result
+        mock_instance.generate_plain_text.return_value = "plain text output"
         mock_generator_class.return_value = mock_instance
 
         # Execute
@@ -67,3 +73,110 @@ class TestMain(unittest.TestCase):
         self.assertEqual(result.output, "")
         # set_textが呼ばれていることを確認
         mock_set_text.assert_called_with("plain text output")
+        # リッチテキストは生成しない
+        mock_instance.generate.assert_not_called()
+
+    @patch("src.clipboard_util.ClipboardUtil.get_clipboard_html")
+    @patch("src.clipboard_util.ClipboardUtil.set_rich_text")
+    @patch("src.slack_list_generator.SlackListGenerator")
+    def test_main_timing_option(
+        self, mock_generator_class, mock_set_rich_text, mock_get_clipboard
+    ):
+        """--timingオプション指定時に起動時間の内訳が表示されることをテスト"""
+        mock_get_clipboard.return_value = "<html></html>"
+        mock_instance = MagicMock()
+        mock_generator_class.return_value = mock_instance
+
+        runner = CliRunner()
+        result = runner.invoke(docs_main, ["--timing"])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("import total", result.output)
+        self.assertIn("convert total", result.output)
+
+    @patch("src.clipboard_util.ClipboardUtil.get_clipboard_html")
+    @patch("src.clipboard_util.ClipboardUtil.set_rich_text")
+    def test_main_trace_option(self, mock_set_rich_text, mock_get_clipboard):
+        """--traceオプション指定時にフェーズのトレースがJSONで書き出されることをテスト"""
+        mock_get_clipboard.return_value = "<ul><li>a</li></ul>"
+
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            result = runner.invoke(docs_main, ["--trace", "trace.json"])
+            with open("trace.json", encoding="utf-8") as f:
+                trace = json.load(f)
+
+        self.assertEqual(result.exit_code, 0)
+        names = [phase["name"] for phase in trace["phases"]]
+        self.assertIn("parse", names)
+        self.assertIn("pickle_write", names)
+
+    def test_convert_command(self):
+        """convertサブコマンドがファイルと標準入力のHTMLを変換して標準出力に書き出すことをテスト"""
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            with open("a.html", "w", encoding="utf-8") as f:
+                f.write("<ul><li>a</li></ul>")
+            result = runner.invoke(
+                docs_main, ["convert", "a.html", "-"], input="<p>b</p>"
+            )
+            missing = runner.invoke(docs_main, ["convert", "missing.html"])
+            texty = runner.invoke(docs_main, ["convert", "-f", "texty", "a.html"])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(result.output, "- a\nb\n")
+        self.assertEqual(missing.exit_code, 1)
+        self.assertEqual(json.loads(texty.output)["ops"][0], {"insert": "a"})
+
+    def test_batch_command_rejects_invalid_inputs(self):
+        """batchサブコマンドが出力の重なり・存在しない入力・不正なchunksizeを変換前にエラーにすることをテスト"""
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            for name in ("a.html", "a.htm", "notes.txt"):
+                with open(name, "w", encoding="utf-8") as f:
+                    f.write("<ul><li>a</li></ul>")
+            conflict = runner.invoke(docs_main, ["batch", "a.html", "a.htm"])
+            own_output = runner.invoke(docs_main, ["batch", "notes.txt"])
+            missing = runner.invoke(docs_main, ["batch", "a.html", "missing.html"])
+            chunksize = runner.invoke(
+                docs_main, ["batch", "a.html", "--chunksize", "0"]
+            )
+            with open("notes.txt", encoding="utf-8") as f:
+                notes = f.read()
+            converted = os.path.exists("a.txt")
+
+        self.assertEqual(conflict.exit_code, 1)
+        self.assertIn("a.htm の出力が a.html と重なります", conflict.output)
+        self.assertEqual(own_output.exit_code, 1)
+        self.assertEqual(notes, "<ul><li>a</li></ul>")
+        self.assertEqual(missing.exit_code, 1)
+        self.assertIn("missing.html", missing.output)
+        self.assertEqual(chunksize.exit_code, 2)
+        self.assertFalse(converted)
+
+    @patch("AppKit.NSPasteboard")
+    def test_serve_socket_writes_rich_text(self, mock_nspasteboard):
+        """serve-socketがクリップボードのHTMLを変換し、Chromium形式でNSPasteboardに書き込むことをテスト"""
+        mock_pb = MagicMock()
+        mock_pb.dataForType_.side_effect = lambda type_: (
+            b"<ul><li>a</li></ul>" if type_ == HTML_TYPE else None
+        )
+        mock_nspasteboard.generalPasteboard.return_value = mock_pb
+
+        def serve_once(server):
+            server.convert_clipboard(text=False)
+
+        runner = CliRunner()
+        with (
+            tempfile.TemporaryDirectory(prefix="d2s-") as directory,
+            patch.object(ConversionSocketServer, "serve_forever", serve_once),
+        ):
+            path = os.path.join(directory, "server.sock")
+            result = runner.invoke(docs_main, ["serve-socket", "--socket", path])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        expected = SlackListGenerator().generate("<ul><li>a</li></ul>")
+        mock_pb.setString_forType_.assert_called_once_with("- a", PLAIN_TEXT_TYPE)
+        mock_pb.setData_forType_.assert_called_once_with(
+            expected.binary_data, CHROMIUM_WEB_CUSTOM_DATA_TYPE
+        )
@@ -0,0 +1,302 @@
+import http.client
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.clipboard_backend import AppKitClipboardBackend
+from src.clipboard_watcher import ClipboardWatcher
+from src.conversion_cache import ConversionCache
+from src.http_server import ConversionHTTPServer
+from src.metrics import (
+    CONTENT_TYPE,
+    MetricsFileWriter,
+    MetricsRegistry,
+    MetricsTracer,
+    start_metrics_server,
+)
+from src.slack_list_generator import SlackListGenerator
+from src.tracer import (
+    CACHE_LOOKUP,
+    CLIPBOARD_READ,
+    CLIPBOARD_WRITE,
+    NULL_TRACER,
+    PARSE,
+    use_tracer,
+)
+
+HTML = "<ul><li>a<ul><li>b</li></ul></li></ul>"
+GOOGLE_DOCS_HTML = (
+    '<meta charset="utf-8"><b id="docs-internal-guid-abc">'
+    '<ul><li aria-level="1">A</li><ul><li aria-level="2">B</li></ul></ul></b>'
+)
+
+
+def sample_lines(text: str) -> set[str]:
+    return {line for line in text.splitlines() if not line.startswith("#")}
+
+
+def fake_clock(*times: float):
+    values = iter(times)
+    return lambda: next(values)
+
+
+def test_counter_and_histogram_exposition():
+    """カウンタとヒストグラムがPrometheusのテキスト形式で出力されることをテスト"""
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requests.", ("path",))
+    histogram = registry.histogram("latency_seconds", "Latency.", (0.1, 1.0))
+    counter.inc(labels=("/a",))
+    counter.inc(2, labels=('say "hi"\n',))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value)
+
+    text = registry.render()
+    assert "# HELP requests_total Requests.\n# TYPE requests_total counter\n" in text
+    assert "# TYPE latency_seconds histogram" in text
+    assert sample_lines(text) == {
+        'requests_total{path="/a"} 1',
+        'requests_total{path="say \\"hi\\"\\n"} 2',
+        'latency_seconds_bucket{le="0.1"} 1',
+        'latency_seconds_bucket{le="1"} 3',
+        'latency_seconds_bucket{le="+Inf"} 4',
+        "latency_seconds_sum 4.05",
+        "latency_seconds_count 4",
+    }
+    assert histogram.count() == 4
+
+
+def test_duplicate_metric_name():
+    """同じ名前のメトリクスを登録できないことをテスト"""
+    registry = MetricsRegistry()
+    registry.counter("a_total", "A.")
+    with pytest.raises(ValueError):
+        registry.counter("a_total", "A.")
+
+
+def test_tracer_records_conversions():
+    """変換の件数・文字数・項目数・フェーズの時間が集計されることをテスト"""
+    metrics = MetricsTracer()
+    generator = SlackListGenerator()
+    with use_tracer(metrics):
+        result = generator.generate(HTML)
+        # シリアライズは結果を参照したときに行われる
+        result.texty_json
+        result.binary_data
+        generator.generate_plain_text(HTML)
+
+    assert metrics.conversions.value() == 2
+    assert metrics.input_chars.value() == 2 * len(HTML)
+    assert metrics.items.count() == 2
+    assert metrics.phase_seconds.count((PARSE,)) == 2
+    text = metrics.registry.render()
+    assert "slack_list_conversions_total 2" in text
+    assert 'slack_list_items_per_document_bucket{le="5"} 2' in text
+    for phase in ("parse", "ops_build", "json_serialize", "pickle_write"):
+        assert f'slack_list_phase_duration_seconds_count{{phase="{phase}"}}' in text
+
+
+def test_tracer_phase_counts_and_errors():
+    """クリップボードのバイト数と、例外で終わったフェーズが集計されることをテスト"""
+    metrics = MetricsTracer(clock=fake_clock(1.0, 1.002, 2.0, 2.5, 3.0, 3.1))
+    with metrics.phase(CLIPBOARD_READ) as record:
+        record.count(bytes=100)
+    with metrics.phase(CLIPBOARD_WRITE) as record:
+        record.count(bytes=40)
+    with pytest.raises(RuntimeError):
+        with metrics.phase(PARSE) as record:
+            raise RuntimeError
+
+    assert metrics.clipboard_bytes.value(("read",)) == 100
+    assert metrics.clipboard_bytes.value(("write",)) == 40
+    assert metrics.phase_errors.value((PARSE,)) == 1
+    # 例外で終わった解析は変換の件数に含めない
+    assert metrics.conversions.value() == 0
+    text = metrics.registry.render()
+    assert (
+        'slack_list_phase_duration_seconds_bucket{phase="clipboard_read",le="0.0025"} 1'
+        in text
+    )
+    assert (
+        'slack_list_phase_duration_seconds_bucket{phase="clipboard_write",le="0.25"} 0'
+        in text
+    )
+
+
+def test_tracer_is_thread_safe():
+    """複数のスレッドから同時に記録しても件数が失われないことをテスト"""
+    metrics = MetricsTracer()
+
+    def work():
+        for _ in range(1000):
+            with metrics.phase(PARSE) as record:
+                record.count(input_chars=1, items=1)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert metrics.conversions.value() == 4000
+    assert metrics.input_chars.value() == 4000
+    assert metrics.items.count() == 4000
+
+
+def test_watch_cache():
+    """キャッシュの統計が出力時に読み取られることをテスト"""
+    metrics = MetricsTracer()
+    cache = ConversionCache()
+    metrics.watch_cache(cache)
+    generator = SlackListGenerator(cache=cache)
+    with use_tracer(metrics):
+        generator.generate(HTML)
+        generator.generate(HTML)
+
+    lines = sample_lines(metrics.registry.render())
+    assert 'slack_list_cache_requests_total{result="memory_hit"} 1' in lines
+    assert 'slack_list_cache_requests_total{result="miss"} 1' in lines
+    assert "slack_list_cache_evictions_total 0" in lines
+    # キャッシュから返した変換も変換の件数に含めるが、解析はしない
+    assert metrics.conversions.value() == 2
+    assert metrics.phase_seconds.count((PARSE,)) == 1
+    assert metrics.phase_seconds.count((CACHE_LOOKUP,)) == 2
+
+
+def test_watcher_records_clipboard_io():
+    """クリップボードの監視で読み書きが1回ずつ記録されることをテスト"""
+    pasteboard = MagicMock()
+    pasteboard.changeCount.side_effect = [1, 2, 3]
+    pasteboard.dataForType_.return_value = GOOGLE_DOCS_HTML.encode("utf-8")
+    with patch("AppKit.NSPasteboard") as appkit_pasteboard:
+        appkit_pasteboard.generalPasteboard.return_value = pasteboard
+        watcher = ClipboardWatcher(AppKitClipboardBackend())
+        metrics = MetricsTracer()
+        with use_tracer(metrics):
+            assert watcher.poll_once()
+
+    data = pasteboard.setData_forType_.call_args[0][0]
+    assert metrics.phase_seconds.count((CLIPBOARD_READ,)) == 1
+    assert metrics.phase_seconds.count((CLIPBOARD_WRITE,)) == 1
+    assert metrics.clipboard_bytes.value(("read",)) == len(
+        GOOGLE_DOCS_HTML.encode("utf-8")
+    )
+    assert metrics.clipboard_bytes.value(("write",)) == len(data)
+    assert metrics.conversions.value() == 1
+
+
+def test_disabled_by_default():
+    """メトリクスを有効にしない限りNullTracerが使われることをテスト"""
+    from src.tracer import get_tracer
+
+    assert get_tracer() is NULL_TRACER
+
+
+def test_write_file(tmp_path):
+    """メトリクスがファイルに書き出され、一時ファイルが残らないことをテスト"""
+    metrics = MetricsTracer()
+    with use_tracer(metrics):
+        SlackListGenerator().generate(HTML)
+    path = tmp_path / "slack_list.prom"
+
+    writer = MetricsFileWriter(metrics.registry, str(path), interval=60).start()
+    writer.stop()
+
+    assert "slack_list_conversions_total 1" in path.read_text(encoding="utf-8")
+    assert [p.name for p in tmp_path.iterdir()] == ["slack_list.prom"]
+
+
+def test_write_file_error_keeps_writer_alive(tmp_path, capsys):
+    """書き出しに失敗してもスレッドが止まらず、出力先ができると書き出し直すことをテスト"""
+    directory = tmp_path / "textfile"
+    path = directory / "slack_list.prom"
+    writer = MetricsFileWriter(MetricsRegistry(), str(path), interval=0.01).start()
+    deadline = time.monotonic() + 5
+    while writer.errors < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert writer.errors >= 2
+    assert writer._thread.is_alive()
+
+    directory.mkdir()
+    while not path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    writer.stop()
+
+    assert path.exists()
+    assert "Error while writing metrics" in capsys.readouterr().err
+
+
+def test_stop_does_not_raise_on_write_error(tmp_path, capsys):
+    """stop()の最後の書き出しに失敗しても例外を送出しないことをテスト"""
+    path = tmp_path / "missing" / "slack_list.prom"
+    writer = MetricsFileWriter(MetricsRegistry(), str(path), interval=60).start()
+    writer.stop()
+
+    assert writer.errors == 1
+    assert not writer._thread.is_alive()
+    assert "Error while writing metrics" in capsys.readouterr().err
+
+
+def test_metrics_server():
+    """/metrics でメトリクスが返されることをテスト"""
+    metrics = MetricsTracer()
+    server = start_metrics_server(metrics.registry, port=0)
+    try:
+        connection = http.client.HTTPConnection(*server.server_address, timeout=5)
+        connection.request("GET", "/metrics")
+        response = connection.getresponse()
+        assert response.status == 200
+        assert response.getheader("Content-Type") == CONTENT_TYPE
+        assert b"slack_list_conversions_total" in response.read()
+
+        connection.request("GET", "/other")
+        response = connection.getresponse()
+        response.read()
+        assert response.status == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_http_server_metrics():
+    """変換サーバーの /metrics で変換と拒否した接続の数が返されることをテスト"""
+    metrics = MetricsTracer()
+    server = ConversionHTTPServer(("127.0.0.1", 0), metrics=metrics.registry)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        connection = http.client.HTTPConnection(*server.server_address, timeout=5)
+        with use_tracer(metrics):
+            connection.request("POST", "/convert", body=HTML.encode("utf-8"))
+            response = connection.getresponse()
+            response.read()
+            assert response.status == 200
+
+        connection.request("GET", "/metrics")
+        response = connection.getresponse()
+        body = response.read().decode("utf-8")
+        assert response.status == 200
+        assert "slack_list_conversions_total 1" in body
+        assert "slack_list_http_rejected_total 0" in body
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def test_http_server_without_metrics():
+    """メトリクスを指定しない場合は /metrics が404になることをテスト"""
+    server = ConversionHTTPServer(("127.0.0.1", 0))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        connection = http.client.HTTPConnection(*server.server_address, timeout=5)
+        connection.request("GET", "/metrics")
+        response = connection.getresponse()
+        response.read()
+        assert response.status == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
@@ -0,0 +1,145 @@
+import random
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.google_docs_html import generate_google_docs_html
+from src.parallel_parser import ParallelListParser, iter_chunks
+from src.slack_list_generator import SlackListGenerator
+from src.stream_list_parser import StreamListParser
+
+# トップレベルのリストの途中で分割される番号付きリスト
+ORDERED_HTML = (
+    "<b><p>head</p><ol>"
+    + "".join(f'<li aria-level="1">item {i}</li>' for i in range(1, 21))
+    + '<ul><li aria-level="2">nested</li></ul><li>   </li><li>last</li></ol>'
+    + "<p>between</p><ol><li>again</li></ol></b>"
+)
+
+
+def _random_html(rng, depth=0):
+    parts = []
+    for _ in range(rng.randint(0, 4)):
+        choice = rng.random()
+        if choice < 0.3 and depth < 4:
+            tag = rng.choice(["ul", "ol"])
+            parts.append(f"<{tag}>{_random_html(rng, depth + 1)}</{tag}>")
+        elif choice < 0.6 and depth < 4:
+            attr = rng.choice(["", ' aria-level="2"'])
+            close = rng.choice(["</li>", ""])
+            parts.append(f"<li{attr}>{_random_html(rng, depth + 1)}{close}")
+        elif choice < 0.75 and depth < 4:
+            tag = rng.choice(["span", "p", "pre"])
+            parts.append(f"<{tag}>{_random_html(rng, depth + 1)}</{tag}>")
+        else:
+            parts.append(
+                rng.choice(["text", " ", "\n", "&amp;", "&amp", "R&D", "&nbsp", "<br>"])
+            )
+    return "".join(parts)
+
+
+def parse_parallel(html, workers):
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        parser = ParallelListParser(
+            workers=workers, executor=executor, min_chunk_chars=1
+        )
+        return parser.parse_items(html)
+
+
+def test_chunks_carry_context():
+    """分割位置で開いている要素が断片の先頭で開き直されることをテスト"""
+    chunks = list(iter_chunks(ORDERED_HTML, 4))
+
+    assert len(chunks) == 4
+    assert [continued for _, continued in chunks] == [False, True, True, True]
+    assert all(chunk.startswith("<b><ol>") for chunk, _ in chunks[1:])
+
+
+@pytest.mark.parametrize("workers", [2, 3, 8])
+def test_numbering_continues_across_chunks(workers):
+    """リストの途中で分割しても番号とレベルが1プロセスでの解析と一致することをテスト"""
+    items = parse_parallel(ORDERED_HTML, workers)
+
+    assert items == StreamListParser().parse_items(ORDERED_HTML)
+    assert items[-3] == ("last", "ordered", 0, 21)
+
+
+def test_random_documents():
+    """ランダムに生成したHTMLで1プロセスでの解析と同じ結果になることをテスト"""
+    rng = random.Random(0)
+    separators = ["", "<p>x</p>", "<div>", "</div>", "<b>", "</b>", "<br>", "</br>"]
+    for _ in range(300):
+        html = "".join(_random_html(rng) + rng.choice(separators) for _ in range(4))
+        for workers in (2, 5):
+            assert parse_parallel(html, workers) == StreamListParser().parse_items(
+                html
+            ), html
+
+
+@pytest.mark.parametrize(
+    "html",
+    [
+        "a&b<ol></ol>",
+        "&nbsp<ol></ol>",
+        "x&amp<ul><li>a</li></ul>y&#3<ol><li>b</li></ol>",
+        "<div>" + ("<ul>" + "<li>item</li>" * 20 + "</ul>R&D") * 8 + "</div>",
+    ],
+)
+def test_unterminated_reference_before_split_point(html):
+    """終わっていない文字参照の直後では分割せず、1プロセスでの解析と同じ結果になることをテスト"""
+    for workers in (2, 4, 8):
+        assert parse_parallel(html, workers) == StreamListParser().parse_items(html)
+
+
+@pytest.mark.parametrize(
+    "html",
+    ["<ul><li>a</li></ul><!-- c --><ul><li>b</li></ul>", "<ul><li>a</li></ul><script>"],
+)
+def test_unsplittable_documents(html):
+    """分割できない文書は1プロセスで解析することをテスト"""
+    with pytest.raises(ValueError):
+        list(iter_chunks(html, 2))
+    assert parse_parallel(html, 2) == StreamListParser().parse_items(html)
+
+
+def test_process_pool():
+    """プロセスプールで解析した結果が1プロセスでの解析と一致することをテスト"""
+    html = generate_google_docs_html(200)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        parser = ParallelListParser(workers=4, executor=executor, min_chunk_chars=1)
+        assert parser.parse_items(html) == StreamListParser().parse_items(html)
+
+
+def test_small_documents_are_not_split():
+    """min_chunk_charsより小さい文書はexecutorを使わずに解析することをテスト"""
+    parser = ParallelListParser(workers=4)
+
+    assert parser.parse_items(ORDERED_HTML) == StreamListParser().parse_items(
+        ORDERED_HTML
+    )
+    assert parser._executor is None
+
+
+def test_generator_option():
+    """parallel=Trueのジェネレータが同じ結果を返すことをテスト"""
+    with SlackListGenerator(parallel=True) as generator:
+        assert generator.generate(ORDERED_HTML) == (
+            SlackListGenerator().generate(ORDERED_HTML)
+        )
+    with pytest.raises(ValueError):
+        SlackListGenerator(engine="bs4", parallel=True)
+
+
+def test_generator_close_shuts_down_pool():
+    """ジェネレータのclose()で、並列解析のために作成したプロセスプールが終了することをテスト"""
+    html = "<ol>" + "<li>item</li>" * 100 + "</ol>"
+    with SlackListGenerator(parallel=True) as generator:
+        generator.parallel.workers = 2
+        generator.parallel.min_chunk_chars = 1
+        assert generator.generate(html) == SlackListGenerator().generate(html)
+        executor = generator.parallel._executor
+        assert executor is not None
+
+    assert generator.parallel._executor is None
+    with pytest.raises(RuntimeError):
+        executor.submit(int)
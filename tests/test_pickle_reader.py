@@ -0,0 +1,42 @@
+import unittest
+
+from src.pickle_reader import PickleReader
+from src.slack_list_generator import SlackListGenerator
+
+
+class TestPickleReader(unittest.TestCase):
+    def setUp(self):
+        html = "<ul><li>Item 1</li><li>日本語<ul><li>Nested</li></ul></li></ul>"
+        self.result = SlackListGenerator().generate(html)
+
+    def test_read_generated_data(self):
+        """生成したバイナリデータを読み戻せることをテスト"""
+        reader = PickleReader(self.result.binary_data)
+
+        self.assertEqual(reader.payload_size, len(self.result.binary_data) - 4)
+        self.assertEqual(reader.entry_count, 2)
+        self.assertEqual(reader.keys(), ["public.utf8-plain-text", "slack/texty"])
+        self.assertEqual(reader.plain_text(), self.result.plain_text)
+        self.assertEqual(reader.texty_json(), self.result.texty_json)
+
+    def test_values_are_views(self):
+        """値がコピーではなく元のバッファのビューとして返されることをテスト"""
+        data = bytearray(self.result.binary_data)
+        reader = PickleReader(data)
+
+        value = reader.get_raw("public.utf8-plain-text")
+        self.assertIsInstance(value, memoryview)
+        self.assertIs(value.obj, data)
+        self.assertIsNone(reader.get("missing"))
+
+    def test_invalid_data(self):
+        """サイズが不正なデータはエラーになることをテスト"""
+        with self.assertRaises(ValueError):
+            PickleReader(b"\x00")
+        with self.assertRaises(ValueError):
+            PickleReader(self.result.binary_data[:-4])
+
+        # エントリの長さがデータを超えている
+        truncated = b"\x0c\x00\x00\x00\x01\x00\x00\x00\xff\x00\x00\x00\x41\x00\x00\x00"
+        with self.assertRaises(ValueError):
+            PickleReader(truncated).keys()
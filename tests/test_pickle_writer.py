@@ -1,3 +1,7 @@
+import io
+import mmap
+import struct
+import tempfile
 import unittest
 from src.pickle_writer import PickleWriter
 
@@ -27,3 +31,49 @@ class TestPickleWriter(unittest.TestCase):
         )
 
         self.assertEqual(payload, expected)
+
+    def test_streaming_to_sink(self):
+        """sinkに少しずつ書き込んだ結果がメモリ上に蓄積した結果と一致することを確認する"""
+        values = ["A", "日本語😀" * 5, "", "xyz" * 7]
+        memory = PickleWriter()
+        for value in values:
+            memory.write_string16(value)
+        payload = memory.get_payload()
+        expected = struct.pack("<I", len(payload)) + payload
+
+        sink = io.BytesIO()
+        # 断片のイテラブルと、chunk_charsより長い文字列の両方を分割して書き込む
+        writer = PickleWriter(sink, chunk_chars=3)
+        writer.write_string16(values[0])
+        writer.write_string16(iter(["日本", "語😀" + "日本語😀" * 4]))
+        writer.write_string16(iter([]))
+        writer.write_string16(values[3])
+
+        self.assertEqual(writer.finish(), len(expected))
+        self.assertEqual(sink.getvalue(), expected)
+
+    def test_streaming_to_file_and_mmap(self):
+        """ファイルとmmapに書き込めることを確認する"""
+        writer = PickleWriter()
+        writer.write_uint32(2)
+        writer.write_string16("slack/texty")
+        expected = struct.pack("<I", len(writer.get_payload())) + writer.get_payload()
+
+        with tempfile.TemporaryFile() as f:
+            writer = PickleWriter(f)
+            writer.write_uint32(2)
+            writer.write_string16("slack/texty")
+            writer.finish()
+            f.seek(0)
+            self.assertEqual(f.read(), expected)
+
+        with mmap.mmap(-1, len(expected)) as sink:
+            writer = PickleWriter(sink)
+            writer.write_uint32(2)
+            writer.write_string16(iter(["slack", "/", "texty"]))
+            self.assertEqual(writer.finish(), len(expected))
+            self.assertEqual(sink[:], expected)
+
+    def test_finish_requires_sink(self):
+        with self.assertRaises(ValueError):
+            PickleWriter().finish()
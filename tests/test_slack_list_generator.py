@@ -1,13 +1,14 @@
 import pytest
 import struct
+import sys
 import json
 import textwrap
 from src.slack_list_generator import SlackListGenerator
 
 
-@pytest.fixture
-def generator():
-    return SlackListGenerator()
+@pytest.fixture(params=["stream", "bs4"])
+def generator(request):
+    return SlackListGenerator(engine=request.param)
 
 
 def test_parse_html_nested_list(generator):
@@ -156,8 +157,7 @@ def test_fallback_text(generator):
     expected_plain_text = "Just some text"
     expected_texty_json = {
         "ops": [
-            {"insert": "Just some text"},
-            {"insert": "\n"},
+            {"insert": "Just some text\n"},
         ]
     }
 
@@ -283,3 +283,109 @@ def test_binary_structure(generator):
     assert json_data["ops"][0]["insert"] == "Test"
     # リスト属性が正しく設定されているか確認
     assert json_data["ops"][1]["attributes"]["list"] == "bullet"
+
+
+def test_multiple_lists_with_paragraphs(generator):
+    """複数のリストとその間の段落が文書の順に変換されることをテスト"""
+    input_html = """
+    <meta charset="utf-8">
+    <b id="docs-internal-guid-1">
+        <p dir="ltr"><span>Intro</span></p>
+        <ul>
+            <li aria-level="1">A</li>
+            <ul><li aria-level="2">A-1</li></ul>
+        </ul>
+        <p dir="ltr"><span>Between</span></p>
+        <br>
+        <ol>
+            <li aria-level="1">One</li>
+            <li aria-level="1">Two</li>
+        </ol>
+        <p dir="ltr"><span>Outro</span></p>
+    </b>
+    """
+
+    expected_plain_text = textwrap.dedent("""
+        Intro
+        - A
+            - A-1
+        Between
+        1. One
+        2. Two
+        Outro
+    """).strip()
+    expected_texty_json = {
+        "ops": [
+            {"insert": "Intro\nA"},
+            {"attributes": {"list": "bullet"}, "insert": "\n"},
+            {"insert": "A-1"},
+            {"attributes": {"list": "bullet", "indent": 1}, "insert": "\n"},
+            {"insert": "Between\nOne"},
+            {"attributes": {"list": "ordered"}, "insert": "\n"},
+            {"insert": "Two"},
+            {"attributes": {"list": "ordered"}, "insert": "\n"},
+            {"insert": "Outro\n"},
+        ]
+    }
+
+    actual_plain_text, actual_texty_json = generator._parse_html(input_html)
+
+    assert actual_plain_text == expected_plain_text
+    assert actual_texty_json == expected_texty_json
+
+
+def test_head_is_not_converted(generator):
+    """head内のタイトルなどは段落として出力されないことをテスト"""
+    input_html = (
+        "<html><head><title>Title</title><style>p{}</style></head>"
+        "<body><ul><li>Item</li></ul></body></html>"
+    )
+
+    actual_plain_text, _ = generator._parse_html(input_html)
+
+    assert actual_plain_text == "- Item"
+
+
+@pytest.mark.parametrize("nested_in_item", [True, False])
+def test_deep_nesting_without_recursion(generator, nested_in_item):
+    """再帰の上限を超える深さのネストでも変換できることをテスト"""
+    depth = sys.getrecursionlimit() * 3
+    if nested_in_item:
+        # <li>の中に<ul>がある構造
+        input_html = "<ul><li>x" * depth + "</li></ul>" * depth
+    else:
+        # <ul>の直下に<ul>がある構造 (Google Docs)
+        input_html = "<ul><li>x</li>" * depth + "</ul>" * depth
+
+    actual_plain_text, actual_texty_json = generator._parse_html(input_html)
+
+    lines = actual_plain_text.split("\n")
+    assert len(lines) == depth
+    assert lines[-1] == "    " * (depth - 1) + "- x"
+    assert actual_texty_json["ops"][-1]["attributes"]["indent"] == depth - 1
+
+
+@pytest.mark.parametrize(
+    "wrapper",
+    ["{}", '<b id="docs-internal-guid-abc">{}</b>'],
+    ids=["generic", "google_docs"],
+)
+@pytest.mark.parametrize(
+    "options",
+    [{}, {"parallel": True}],
+    ids=["default", "parallel"],
+)
+def test_aria_level_below_one(generator, wrapper, options):
+    """aria-levelが1未満の場合も最上位の階層として変換できることをテスト"""
+    if options and generator.engine != "stream":
+        pytest.skip("parallelはstreamエンジンのみ")
+    generator = SlackListGenerator(engine=generator.engine, **options)
+    html = wrapper.format(
+        '<ul><li aria-level="0">zero</li><li aria-level="1">one</li>'
+        '<li aria-level="2">two</li></ul>'
+    )
+
+    result = generator.generate(html)
+
+    assert result.plain_text == "- zero\n- one\n    - two"
+    assert result.binary_data
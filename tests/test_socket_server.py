@@ -0,0 +1,253 @@
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from src.clipboard_backend import (
+    CHROMIUM_WEB_CUSTOM_DATA_TYPE,
+    PLAIN_TEXT_TYPE,
+    MemoryClipboardBackend,
+)
+from src.pickle_reader import PickleReader
+from src.slack_list_generator import SlackListGenerator
+from src.socket_client import (
+    COMMAND_CONVERT_CLIPBOARD,
+    REQUEST_HEADER,
+    RESPONSE_HEADER,
+    SOCKET_ENV,
+    STATUS_OK,
+    convert_clipboard,
+    convert_html,
+    default_socket_path,
+    request,
+)
+from src.socket_server import ConversionSocketServer
+
+ROOT = Path(__file__).resolve().parent.parent
+HTML = "<ul><li>a<ul><li>b</li></ul></li></ul>"
+
+
+@pytest.fixture
+def socket_path():
+    # macOSではソケットのパスの長さが104バイトに制限されるため、短いパスを使う
+    with tempfile.TemporaryDirectory(prefix="d2s-") as directory:
+        yield os.path.join(directory, "server.sock")
+
+
+@pytest.fixture
+def start_server(socket_path):
+    servers = []
+
+    def start(**options):
+        server = ConversionSocketServer(socket_path, **options)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        servers.append((server, thread))
+        return server
+
+    yield start
+    for server, thread in servers:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def test_convert_html(start_server, socket_path):
+    """HTMLを送ると変換結果が返されることをテスト"""
+    start_server()
+    expected = SlackListGenerator().generate(HTML)
+
+    plain_text, data = convert_html(HTML, path=socket_path)
+    assert plain_text == expected.plain_text
+    assert data == expected.binary_data
+    assert PickleReader(data).plain_text() == expected.plain_text
+
+    plain_text, data = convert_html(HTML, text=True, path=socket_path)
+    assert plain_text == expected.plain_text
+    assert data == b""
+
+
+def test_convert_large_html(start_server, socket_path):
+    """1回のrecvに収まらないサイズの入出力を扱えることをテスト"""
+    start_server()
+    html = "<ul>" + "".join(f"<li>item {i}</li>" for i in range(50000)) + "</ul>"
+
+    plain_text, _ = convert_html(html, text=True, path=socket_path)
+    assert plain_text == SlackListGenerator().generate_plain_text(html)
+
+
+def test_convert_clipboard(start_server, socket_path):
+    """サーバーのクリップボードのHTMLを変換して書き戻すことをテスト"""
+    backend = MemoryClipboardBackend()
+    start_server(backend=backend)
+
+    backend.copy_html(HTML)
+    assert convert_clipboard(path=socket_path) == "- a\n    - b"
+    assert backend.contents[PLAIN_TEXT_TYPE] == "- a\n    - b"
+    assert CHROMIUM_WEB_CUSTOM_DATA_TYPE in backend.contents
+
+    backend.copy_html(HTML)
+    assert convert_clipboard(text=True, path=socket_path) == "- a\n    - b"
+    assert backend.contents == {PLAIN_TEXT_TYPE: "- a\n    - b"}
+
+
+def test_errors(start_server, socket_path):
+    """変換できないリクエストでRuntimeErrorになることをテスト"""
+    start_server(max_body_bytes=10)
+
+    # クリップボードを使わないサーバー
+    with pytest.raises(RuntimeError, match="クリップボード"):
+        convert_clipboard(path=socket_path)
+    with pytest.raises(RuntimeError, match="exceeds 10 bytes"):
+        convert_html(HTML, path=socket_path)
+
+
+def test_no_server(socket_path):
+    """サーバーが起動していない場合はNoneを返すことをテスト"""
+    assert convert_html(HTML, path=socket_path) is None
+
+    # 停止したサーバーのソケットが残っている場合
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(socket_path)
+    sock.close()
+    assert convert_clipboard(path=socket_path) is None
+
+
+def test_unreachable_server(socket_path):
+    """接続できないパスではNoneを返し、応答しないサーバーではこのプロセスで変換せずにエラーにすることをテスト"""
+    # 接続は受け付けるが応答しないサーバー
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(socket_path)
+    sock.listen()
+    try:
+        start = time.perf_counter()
+        with pytest.raises(RuntimeError, match="応答"):
+            request(COMMAND_CONVERT_CLIPBOARD, path=socket_path, timeout=0.2)
+        assert time.perf_counter() - start < 5
+    finally:
+        sock.close()
+
+    # ソケットの親がディレクトリでない (NotADirectoryError)
+    assert convert_clipboard(path=os.path.join(socket_path, "x.sock")) is None
+
+
+def test_invalid_response(socket_path):
+    """UTF-8でないレスポンスはエラーとして報告することをテスト"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(socket_path)
+    sock.listen()
+
+    def respond():
+        conn, _ = sock.accept()
+        with conn:
+            conn.recv(REQUEST_HEADER.size)
+            conn.sendall(RESPONSE_HEADER.pack(STATUS_OK, 2, 0) + b"\xff\xfe")
+
+    thread = threading.Thread(target=respond)
+    thread.start()
+    try:
+        with pytest.raises(RuntimeError, match="応答"):
+            convert_clipboard(path=socket_path)
+    finally:
+        thread.join()
+        sock.close()
+
+
+def test_stale_socket_and_running_server(start_server, socket_path):
+    """残ったソケットは置き換え、起動中のサーバーのソケットは置き換えないことをテスト"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(socket_path)
+    sock.close()
+
+    start_server()
+    assert oct(os.stat(socket_path).st_mode & 0o777) == oct(0o600)
+    with pytest.raises(OSError, match="既に起動"):
+        ConversionSocketServer(socket_path)
+    assert convert_html(HTML, path=socket_path) is not None
+
+
+def test_refuse_non_socket_file(socket_path):
+    """ソケット以外のファイルは削除しないことをテスト"""
+    Path(socket_path).write_text("data")
+    with pytest.raises(OSError, match="ソケット以外"):
+        ConversionSocketServer(socket_path)
+    assert Path(socket_path).read_text() == "data"
+
+
+def test_socket_removed_on_close(socket_path):
+    """server_closeでソケットが削除されることをテスト"""
+    server = ConversionSocketServer(socket_path)
+    server.warm_up()
+    server.server_close()
+    assert not os.path.exists(socket_path)
+
+
+def test_default_socket_path(monkeypatch):
+    """環境変数でソケットのパスを変更できることをテスト"""
+    monkeypatch.setenv(SOCKET_ENV, "/tmp/other.sock")
+    assert default_socket_path() == "/tmp/other.sock"
+    monkeypatch.delenv(SOCKET_ENV)
+    assert default_socket_path().endswith(os.path.join("docs_to_slack", "server.sock"))
+
+
+def run_main(socket_path: str, *args: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, **{SOCKET_ENV: socket_path})
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "main.py", *args],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+
+def test_main_uses_server(start_server, socket_path):
+    """サーバーが起動していれば、main.pyがclickや変換のモジュールを読み込まずに変換を依頼することをテスト"""
+    backend = MemoryClipboardBackend()
+    start_server(backend=backend)
+    backend.copy_html(HTML)
+
+    process = run_main(socket_path, "-t")
+
+    assert process.returncode == 0, process.stderr
+    assert backend.contents == {PLAIN_TEXT_TYPE: "- a\n    - b"}
+    imported = {
+        line.rsplit("|", 1)[-1].strip()
+        for line in process.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+    assert "src.socket_client" in imported
+    assert not imported & {"click", "bs4", "AppKit", "src.slack_list_generator"}
+
+
+def test_main_falls_back_without_server(socket_path):
+    """サーバーに接続できない場合は、エラーで終了せずにこのプロセスで変換することをテスト"""
+    Path(socket_path).write_text("data")
+
+    process = run_main(os.path.join(socket_path, "x.sock"), "-t")
+
+    # 以前は接続のエラー ("Error: [Errno 20] Not a directory") で終了していた
+    assert "Errno" not in process.stderr
+    imported = {
+        line.rsplit("|", 1)[-1].strip()
+        for line in process.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+    assert "click" in imported
+
+
+def test_main_reports_server_error(start_server, socket_path):
+    """サーバーで変換に失敗した場合はエラーで終了することをテスト"""
+    start_server()
+
+    process = run_main(socket_path)
+
+    assert process.returncode == 1
+    assert "Error: Conversion failed" in process.stderr
@@ -0,0 +1,199 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from src.google_docs_parser import GoogleDocsListParser
+from src.parallel_parser import ParallelListParser
+from src.slack_list_generator import SlackListGenerator
+from src.stream_list_parser import StreamListParser
+
+
+def parse_bs4(html):
+    return SlackListGenerator(engine="bs4")._parse_html(html)
+
+
+@pytest.mark.parametrize(
+    "html",
+    [
+        # Google Docsの構造 (ulの直下にul、aria-level付き)
+        '<meta charset="utf-8"><b id="docs-internal-guid-1"><ul>'
+        '<li aria-level="1"><p><span style="font-weight:700">太字</span> と通常</p></li>'
+        '<ul><li aria-level="2"><p><span>子</span></p></li></ul></ul></b>',
+        # 順序付きリストと空の項目
+        "<ol><li>One</li><li>   </li><li>Two<ol><li>A</li><li>B</li></ol></li></ol>",
+        # 閉じられていないli
+        "<ul><li>A<li>B<li>C</ul><p>after</p>",
+        # 文字参照・実体参照
+        "<ul><li>a &amp; b &lt;c&gt; &#169; &#x263A; &#150; &unknown; &nbsp;x</li></ul>",
+        # 空白だけの文字列の正規化
+        "<ul><li><span>a</span>   <span>b</span>\n<span>c</span></li></ul>",
+        # pre内の空白は保持される
+        "<ul><li><pre>  </pre>x</li></ul>",
+        # コメント・script・style
+        "<ul><li>a<!-- c -->b<span><!-- d -->e<style>p{}</style></span></li></ul>",
+        "<ul><li><style>p{}</style>t</li></ul>",
+        # 空要素タグ
+        "<ul><li>a<br>b<br/>c</br>d<img src=x></li></ul>",
+        # リスト直下の不要な要素は無視される
+        "<ul><div><li>hidden</li></div><li>shown</li>text</ul>",
+        # li内の入れ子リストの後のテキスト
+        "<ul><li>before<ul><li>inner</li></ul>after</li></ul>",
+        # 複数のリストと段落
+        "<p>head</p><ul><li>first</li></ul><ul><li>second</li></ul>",
+        "<div>a<br>b<div>c</div>d</div><ol><li>x</li></ol>tail<script>s</script>",
+        # 不正なaria-level
+        '<ul><li aria-level="x">a</li><li aria-level>b</li><li aria-level="3">c</li></ul>',
+        # リストが無い場合のフォールバック
+        "<!DOCTYPE html><html><head><title>T</title></head><body><p>x<!-- y --></p></body></html>",
+        "",
+        # 閉じられていない文書
+        "<ul><li>open<ul><li>deep",
+    ],
+)
+def test_same_result_as_bs4(html):
+    """ストリームパーサーの結果がBeautifulSoupによる変換と同一であることをテスト"""
+    assert StreamListParser().parse(html) == parse_bs4(html)
+
+
+@pytest.mark.parametrize(
+    "reference",
+    ["&#0;", "&#x0;", "&#xD800;", "&#57343;", "&#x110000;", "&#99999999999;"],
+)
+def test_invalid_charref_matches_bs4_on_every_engine(reference):
+    """NUL・サロゲート・範囲外の文字参照が、どのエンジンでもBeautifulSoupと同じU+FFFDになることをテスト"""
+    html = f"<ul><li>a{reference}b</li></ul><ol><li>c</li></ol>"
+    expected = parse_bs4(html)
+    assert expected[0] == "- a\ufffdb\n1. c"
+
+    assert StreamListParser().parse(html) == expected
+    assert GoogleDocsListParser().parse(html) == expected
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        parallel = ParallelListParser(workers=2, executor=executor, min_chunk_chars=1)
+        assert parallel.parse_items(html) == StreamListParser().parse_items(html)
+
+
+def _random_html(rng, depth=0):
+    parts = []
+    for _ in range(rng.randint(0, 4)):
+        choice = rng.random()
+        if choice < 0.3 and depth < 5:
+            tag = rng.choice(["ul", "ol"])
+            parts.append(f"<{tag}>{_random_html(rng, depth + 1)}</{tag}>")
+        elif choice < 0.6 and depth < 5:
+            attr = rng.choice(["", ' aria-level="1"', ' aria-level="3"'])
+            close = rng.choice(["</li>", "</li>", ""])
+            parts.append(f"<li{attr}>{_random_html(rng, depth + 1)}{close}")
+        elif choice < 0.75 and depth < 5:
+            tag = rng.choice(["span", "p", "b", "pre"])
+            parts.append(f"<{tag}>{_random_html(rng, depth + 1)}</{tag}>")
+        else:
+            parts.append(rng.choice(["text", " ", "\n  ", "&amp;", "<br>", "日本語"]))
+    return "".join(parts)
+
+
+def test_random_documents_match_bs4():
+    """ランダムに生成したHTMLでBeautifulSoupと同じ結果になることをテスト"""
+    rng = random.Random(0)
+    for _ in range(300):
+        html = _random_html(rng)
+        assert StreamListParser().parse(html) == parse_bs4(html), html
+
+
+class HTMLParserOnly(StreamListParser):
+    """字句解析の高速な経路を使わないパーサー"""
+
+    def _feed_fast(self, html_content):
+        return False
+
+
+def uses_fast_path(html):
+    parser = StreamListParser()
+    parser._begin()
+    return parser._feed_fast(html)
+
+
+@pytest.mark.parametrize(
+    "html",
+    [
+        "<UL><LI ARIA-LEVEL=2>a</LI><Li aria-level='3' >b</li></UL>",
+        '<ul><li aria-level="&#50;">a</li><li aria-level="">b</li></ul>',
+        '<ul><li title="x > y" aria-level="2" aria-level="1">a</li></ul>',
+        '<ul><li data-x="a&amp;b" hidden>a &amp; b &#39;c&#x27; &nbsp;</li></ul>',
+        "<ul><li>a<br/>b<img src=x />c</br></li></ul>text",
+        "<p>no list</p><div>a<br>b</div>&lt;tail&gt;",
+        '<ul><li>a<span style="x:1;y:2;">b</span></li><ul/><ol><li/>c</ol></ul>',
+    ],
+)
+def test_fast_path_matches_html_parser(html):
+    """正規表現による字句解析がhtml.parserと同じ結果になることをテスト"""
+    assert uses_fast_path(html)
+    assert StreamListParser().parse(html) == HTMLParserOnly().parse(html)
+
+
+@pytest.mark.parametrize(
+    "html",
+    [
+        "<ul><li>a<!-- c --></li></ul>",
+        "<!DOCTYPE html><ul><li>a</li></ul>",
+        "<ul><li>a < b</li></ul>",
+        "<ul><li>a &amp b</li></ul>",
+        "<ul><li>a &a.b; &#39a;</li></ul>",
+        '<ul><li aria-level="2"x>a</li></ul>',
+        '<ul><li a=b"c>a</li></ul>',
+        "<ul><li>a<style>p{}</style></li></ul>",
+        "<ul><li>a</ul>&",
+    ],
+)
+def test_fast_path_falls_back(html):
+    """html.parserと同じ結果を保証できない構文ではhtml.parserで解析することをテスト"""
+    assert not uses_fast_path(html)
+    assert StreamListParser().parse(html) == HTMLParserOnly().parse(html)
+
+
+def test_random_markup_matches_html_parser():
+    """崩れたタグや参照を含むランダムなHTMLで、html.parserと同じ結果になることをテスト"""
+    rng = random.Random(1)
+    pieces = [
+        "<ul>",
+        "</ul>",
+        "<ol>",
+        "</ol>",
+        "<li>",
+        "</li>",
+        '<li aria-level="2">',
+        "<li aria-level='3' class=x>",
+        "<LI Aria-Level=1/>",
+        '<span style="a:b">',
+        "</span>",
+        "<p>",
+        "</p>",
+        "<br>",
+        "text",
+        " ",
+        "\n",
+        "&amp;",
+        "&amp",
+        "&#39;",
+        "&",
+        "<",
+        ">",
+        '"',
+        "=",
+        "<!-- c -->",
+    ]
+    for _ in range(2000):
+        html = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 20)))
+        assert StreamListParser().parse(html) == HTMLParserOnly().parse(html), html
+
+
+def test_parser_is_reusable():
+    """同じパーサーインスタンスで複数の文書を変換できることをテスト"""
+    parser = StreamListParser()
+    assert parser.parse("<ul><li>a</li></ul>")[0] == "- a"
+    assert parser.parse("<ol><li>b</li></ol>")[0] == "1. b"
+
+
+def test_unknown_engine():
+    """未対応のエンジン名はエラーになることをテスト"""
+    with pytest.raises(ValueError):
+        SlackListGenerator(engine="lxml")
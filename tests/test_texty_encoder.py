@@ -0,0 +1,78 @@
+import io
+import json
+import struct
+
+import pytest
+
+from src.pickle_writer import PickleWriter
+from src.stream_list_parser import (
+    StreamListParser,
+    iter_plain_text,
+    render_plain_text,
+    render_texty_json,
+)
+from src.texty_encoder import (
+    encode_chromium_data,
+    encode_texty_items,
+    iter_texty_items,
+    write_chromium_data,
+)
+
+
+def reference_chromium_data(plain_text, texty_json):
+    """PickleWriterとjson.dumpsを使った従来の実装"""
+    writer = PickleWriter()
+    writer.write_uint32(2)
+    writer.write_string16("public.utf8-plain-text")
+    writer.write_string16(plain_text)
+    writer.write_string16("slack/texty")
+    writer.write_string16(json.dumps(texty_json, separators=(",", ":")))
+    payload = writer.get_payload()
+    return struct.pack("<I", len(payload)) + payload
+
+
+HTML_CASES = [
+    "",
+    "<p>Just some text</p>",
+    "<ul><li>a</li><li>bb</li></ul>",
+    '<p>前</p><ol><li>"quoted" \\ 😀\t</li><ul><li aria-level="3">深い</li></ul></ol>'
+    "<p>後</p>",
+]
+
+
+@pytest.mark.parametrize("html", HTML_CASES)
+def test_items_encoding_matches_json_dumps(html):
+    """項目から組み立てたJSONがjson.dumpsの結果と一致することをテスト"""
+    items = StreamListParser().parse_items(html)
+
+    assert encode_texty_items(items) == json.dumps(
+        render_texty_json(items), separators=(",", ":")
+    )
+
+
+@pytest.mark.parametrize("html", HTML_CASES)
+def test_same_bytes_as_pickle_writer(html):
+    """従来のPickleWriterによる実装とバイト単位で一致することをテスト"""
+    items = StreamListParser().parse_items(html)
+    plain_text = render_plain_text(items)
+    texty_json = render_texty_json(items)
+    expected = reference_chromium_data(plain_text, texty_json)
+
+    assert encode_chromium_data(plain_text, texty_json) == expected
+    assert encode_chromium_data(plain_text, encode_texty_items(items)) == expected
+
+
+@pytest.mark.parametrize("html", HTML_CASES)
+def test_streaming_matches_encode(html):
+    """断片を順に書き込んだ結果がencode_chromium_dataと一致することをテスト"""
+    items = StreamListParser().parse_items(html)
+    expected = encode_chromium_data(render_plain_text(items), encode_texty_items(items))
+    sink = io.BytesIO(b"prefix")
+    sink.seek(0, io.SEEK_END)
+
+    size = write_chromium_data(sink, iter_plain_text(items), iter_texty_items(items))
+
+    assert size == len(expected)
+    assert sink.getvalue() == b"prefix" + expected
+    assert "".join(iter_plain_text(items)) == render_plain_text(items)
+    assert "".join(iter_texty_items(items)) == encode_texty_items(items)
@@ -0,0 +1,94 @@
+import pytest
+
+from src.slack_list_generator import SlackListGenerator
+from src.stream_list_parser import StreamListParser, render_texty_json
+from src.texty_ops import normalize_ops
+
+
+def naive_ops(items):
+    """項目ごとにinsertと改行のopを作る、正規化前の形式"""
+    ops = []
+    for text, list_type, level, _ in items:
+        ops.append({"insert": text})
+        if list_type is None:
+            ops.append({"insert": "\n"})
+        else:
+            ops.append(
+                {"attributes": {"list": list_type, "indent": level}, "insert": "\n"}
+            )
+    return ops
+
+
+def test_normalize_ops():
+    """空のinsertの削除・属性の無いinsertの結合・何も変えない属性の削除をテスト"""
+    ops = [
+        {"insert": "Intro"},
+        {"insert": "\n"},
+        {"insert": ""},
+        {"insert": "A"},
+        {"attributes": {"list": "bullet", "indent": 0}, "insert": "\n"},
+        {"insert": "B", "attributes": {"bold": None}},
+        {"attributes": {"list": "bullet", "indent": 1}, "insert": "\n"},
+        {"insert": {"image": "x.png"}},
+        {"insert": "Outro"},
+        {"insert": "\n"},
+    ]
+
+    assert normalize_ops(ops) == [
+        {"insert": "Intro\nA"},
+        {"attributes": {"list": "bullet"}, "insert": "\n"},
+        {"insert": "B"},
+        {"attributes": {"list": "bullet", "indent": 1}, "insert": "\n"},
+        {"insert": {"image": "x.png"}},
+        {"insert": "Outro\n"},
+    ]
+    # 入力は変更しない
+    assert ops[0] == {"insert": "Intro"}
+    assert ops[4]["attributes"] == {"list": "bullet", "indent": 0}
+
+
+def test_normalize_ops_shares_attributes():
+    """同じ内容の属性が1つの辞書を共有することをテスト"""
+    ops = normalize_ops(
+        [
+            {"insert": "a"},
+            {"attributes": {"list": "bullet", "indent": 1}, "insert": "\n"},
+            {"insert": "b"},
+            {"attributes": {"indent": 1, "list": "bullet"}, "insert": "\n"},
+        ]
+    )
+
+    assert ops[1]["attributes"] is ops[3]["attributes"]
+
+
+@pytest.mark.parametrize(
+    "html",
+    [
+        "",
+        "<p>Just some text</p>",
+        "<ul><li></li><li>a</li></ul>",
+        "<p>前</p><ul><li>a<ol><li>b</li><li>c</li></ol></li></ul><p>後</p><p>x</p>",
+    ],
+)
+def test_render_texty_json_is_normalized(html):
+    """render_texty_jsonの結果が正規化済みのopsと一致することをテスト"""
+    items = StreamListParser().parse_items(html)
+
+    ops = render_texty_json(items)["ops"]
+
+    assert ops == normalize_ops(naive_ops(items))
+    attributes = [op["attributes"] for op in ops if "attributes" in op]
+    assert len({id(a) for a in attributes}) == len({repr(a) for a in attributes})
+
+
+def test_normalization_shrinks_blob():
+    """段落の多い文書でChromium形式のデータが小さくなることをテスト"""
+    html = "".join(f"<p>paragraph {i}</p><ul><li>item {i}</li></ul>" for i in range(50))
+    generator = SlackListGenerator()
+    plain_text, texty_json = generator._parse_html(html)
+    items = StreamListParser().parse_items(html)
+
+    normalized = generator._create_chromium_data(plain_text, texty_json)
+    naive = generator._create_chromium_data(plain_text, {"ops": naive_ops(items)})
+
+    assert len(normalized) < len(naive)
@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+from src.slack_list_generator import SlackListGenerator
+from src.tracer import (
+    NULL_TRACER,
+    DebugDump,
+    Tracer,
+    get_tracer,
+    use_tracer,
+)
+
+
+def test_tracer_records_phases():
+    """フェーズごとの時間・メモリ・件数が記録されることをテスト"""
+    tracer = Tracer(trace_memory=True)
+
+    with tracer.phase("parse") as record:
+        data = [0] * 10000
+        record.count(items=len(data))
+
+    (record,) = tracer.records
+    assert record.name == "parse"
+    assert record.seconds >= 0
+    assert record.allocated_bytes >= 10000 * 8
+    assert record.counts == {"items": 10000}
+
+    trace = json.loads(tracer.to_json())
+    assert trace["phases"][0]["counts"] == {"items": 10000}
+    assert "parse" in tracer.summary()
+
+
+def test_use_tracer_restores_previous():
+    """use_tracerのブロックを抜けると元のトレーサーに戻ることをテスト"""
+    tracer = Tracer()
+    assert get_tracer() is NULL_TRACER
+    with use_tracer(tracer):
+        assert get_tracer() is tracer
+    assert get_tracer() is NULL_TRACER
+
+
+@pytest.mark.parametrize("engine", ["stream", "bs4"])
+def test_generator_reports_phases(engine):
+    """SlackListGeneratorが各フェーズをトレーサーに記録することをテスト"""
+    html = "<ul><li>a</li><li>b</li></ul>"
+    tracer = Tracer()
+    with use_tracer(tracer):
+        SlackListGenerator(engine=engine).generate(html).binary_data
+
+    names = [record.name for record in tracer.records]
+    assert names[0] == "parse"
+    assert names[-2:] == ["json_serialize", "pickle_write"]
+    assert tracer.records[0].counts["input_chars"] == len(html)
+
+
+def test_debug_dump_truncates_lazily():
+    """DebugDumpが表示するときに長い文字列を切り詰めることをテスト"""
+    assert str(DebugDump("short")) == "short"
+
+    dump = str(DebugDump("a" * 50 + "b" * 50, limit=20))
+    assert dump.startswith("a" * 10 + "\n")
+    assert dump.endswith("\n" + "b" * 10)
+    assert "(80 chars omitted)" in dump
+
+
+def test_tracer_import_is_lightweight():
+    """トレーサーを読み込んでもjsonとtracemallocが読み込まれないことをテスト"""
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    code = (
+        "import sys, src.tracer; "
+        "print(sorted({'json', 'tracemalloc'} & set(sys.modules)))"
+    )
+    process = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).resolve().parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert process.stdout.strip() == "[]"